@@ -0,0 +1,189 @@
+"""Compares the throughput of the read endpoints under WSGI and ASGI.
+
+The sync DRF views are driven through the WSGI application by a pool of
+threads, like a threaded WSGI server, and the '/async/' views through the ASGI
+application by concurrent coroutines, like an ASGI server on one event loop.
+No HTTP server is involved so only the request path is measured. The caches
+are disabled so every request reaches PostgreSQL. Needs the PostgreSQL server
+of the settings, the benchmark runs in a throwaway test database.
+
+    python -m benchmarks.asgi_benchmark
+"""
+
+import asyncio
+import io
+import os
+import statistics
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "configs.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection, connections  # noqa: E402
+from django.test.utils import override_settings  # noqa: E402
+
+from configs.asgi import application as asgi_application  # noqa: E402
+from configs.wsgi import application as wsgi_application  # noqa: E402
+from trade_api.models import Action, Trade, TradeDirection  # noqa: E402
+from trade_api.services import TradeService  # noqa: E402
+
+TRADES = 1000
+REQUESTS = 2000
+CLIENTS = [1, 8, 32]
+# Threads of the simulated WSGI server, the clients beyond them wait in line
+WSGI_THREADS = 8
+
+
+def seed():
+    trades = Trade.objects.bulk_create(
+        [
+            Trade(
+                trading_entity="Trading entity",
+                counterparty="Counterpart",
+                direction=TradeDirection.SELL,
+                currency="CAD",
+                amount=10000,
+                underlying=["USD", "CAD"],
+            )
+            for _ in range(TRADES)
+        ]
+    )
+    user_id = uuid.uuid4()
+    for trade in trades[:100]:
+        TradeService.update_trade(trade.id, Action.SUBMIT, user_id, None)
+        TradeService.update_trade(trade.id, Action.APPROVE, user_id, None)
+    return [trade.id for trade in trades[:100]]
+
+
+def requests(prefix, trade_ids):
+    """Same mix of list, trade and log reads for both paths"""
+    paths = []
+    for i in range(REQUESTS):
+        trade_id = trade_ids[i % len(trade_ids)]
+        paths += [
+            (f"/{prefix}trades/", f"page={i % 20 + 1}"),
+            (f"/{prefix}trades/{trade_id}/", ""),
+            (f"/{prefix}trade_logs/{trade_id}/", ""),
+        ]
+    return paths[:REQUESTS]
+
+
+def wsgi_request(path, query_string):
+    environ = {
+        "REQUEST_METHOD": "GET",
+        "SCRIPT_NAME": "",
+        "PATH_INFO": path,
+        "QUERY_STRING": query_string,
+        "SERVER_NAME": "localhost",
+        "SERVER_PORT": "80",
+        "HTTP_HOST": "localhost",
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": "http",
+        "wsgi.input": io.BytesIO(),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    statuses = []
+    start = time.perf_counter()
+    response = wsgi_application(
+        environ, lambda status, headers: statuses.append(status)
+    )
+    b"".join(response)
+    response.close()
+    latency = time.perf_counter() - start
+    assert statuses[0].startswith("200"), statuses[0]
+    return latency
+
+
+def run_wsgi(paths, clients):
+    with ThreadPoolExecutor(max_workers=min(clients, WSGI_THREADS)) as pool:
+        start = time.perf_counter()
+        latencies = list(pool.map(lambda request: wsgi_request(*request), paths))
+        elapsed = time.perf_counter() - start
+    return elapsed, latencies
+
+
+async def asgi_request(path, query_string):
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query_string.encode(),
+        "root_path": "",
+        "headers": [(b"host", b"localhost")],
+        "client": ("127.0.0.1", 0),
+        "server": ("localhost", 80),
+    }
+    statuses = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    start = time.perf_counter()
+    await asgi_application(scope, receive, send)
+    latency = time.perf_counter() - start
+    assert statuses[0] == 200, statuses[0]
+    return latency
+
+
+async def run_asgi(paths, clients):
+    semaphore = asyncio.Semaphore(clients)
+
+    async def limited(request):
+        async with semaphore:
+            return await asgi_request(*request)
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(limited(request) for request in paths))
+    return time.perf_counter() - start, latencies
+
+
+def report(name, clients, elapsed, latencies):
+    latencies = sorted(latencies)
+    print(
+        f"{name:<5} clients {clients:3}"
+        f"  {len(latencies) / elapsed:8.0f} req/s"
+        f"  mean {statistics.mean(latencies) * 1e3:7.2f} ms"
+        f"  p50 {latencies[len(latencies) // 2] * 1e3:7.2f} ms"
+        f"  p95 {latencies[int(len(latencies) * 0.95)] * 1e3:7.2f} ms"
+    )
+
+
+def run():
+    trade_ids = seed()
+    wsgi_paths = requests("", trade_ids)
+    asgi_paths = requests("async/", trade_ids)
+    for clients in CLIENTS:
+        report("wsgi", clients, *run_wsgi(wsgi_paths, clients))
+        report("asgi", clients, *asyncio.run(run_asgi(asgi_paths, clients)))
+
+
+if __name__ == "__main__":
+    database_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        with override_settings(
+            CACHES={
+                "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+            }
+        ):
+            run()
+    finally:
+        connections.close_all()
+        connection.creation.destroy_test_db(database_name, verbosity=0)
@@ -0,0 +1,79 @@
+"""Compares N single trade creations with one bulk creation of N trades.
+
+Posts the same trades to POST /trades/ one at a time and to
+POST /trades/bulk/ at once, through the whole DRF stack, and prints the
+trades created per second of both. Needs the PostgreSQL server of the
+settings, the benchmark runs in a throwaway test database.
+
+    python -m benchmarks.bulk_create_benchmark
+"""
+
+import os
+import time
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "configs.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection, connections  # noqa: E402
+from django.test.utils import override_settings  # noqa: E402
+from django.urls import reverse  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+from trade_api.models import Trade  # noqa: E402
+
+SIZES = [100, 1000, 5000]
+
+
+def make_body(index):
+    return {
+        "trading_entity": "Trading entity",
+        "counterparty": f"Counterpart {index}",
+        "direction": "sell",
+        "currency": "CAD",
+        "amount": 10000 + index,
+        "underlying": ["USD", "EUR"],
+    }
+
+
+def post(client, url, body):
+    response = client.post(url, body, format="json")
+    assert response.status_code == 201, response.content[:500]
+
+
+def run(client, size):
+    bodies = [make_body(index) for index in range(size)]
+
+    start = time.perf_counter()
+    for body in bodies:
+        post(client, reverse("trade-list"), body)
+    single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    post(client, reverse("trade-bulk-create"), bodies)
+    bulk = time.perf_counter() - start
+
+    Trade.objects.all().delete()
+    print(
+        f"{size:5} trades  single {size / single:8.0f} trades/s"
+        f"  bulk {size / bulk:8.0f} trades/s  x{single / bulk:5.1f}"
+    )
+
+
+if __name__ == "__main__":
+    database_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        client = APIClient(HTTP_HOST="localhost")
+        with override_settings(
+            CACHES={
+                "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+            }
+        ):
+            for size in SIZES:
+                run(client, size)
+    finally:
+        connections.close_all()
+        connection.creation.destroy_test_db(database_name, verbosity=0)
@@ -0,0 +1,98 @@
+"""Compares the single-trade read with and without persistent connections.
+
+Drives GET /trades/<id>/ through the WSGI application, sequentially and from
+a pool of threads, with connections closed after every request
+(CONN_MAX_AGE=0) and kept by each thread (CONN_MAX_AGE=60). The caches are
+disabled so every request reaches PostgreSQL. Needs the PostgreSQL server of
+the settings, the benchmark runs in a throwaway test database.
+
+    python -m benchmarks.connection_benchmark
+"""
+
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "configs.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection, connections  # noqa: E402
+from django.test.utils import override_settings  # noqa: E402
+
+from benchmarks.asgi_benchmark import wsgi_request  # noqa: E402
+from trade_api.models import Trade, TradeDirection  # noqa: E402
+
+TRADES = 100
+REQUESTS = 2000
+THREADS = [1, 8]
+CONN_MAX_AGES = [0, 60]
+
+
+def seed():
+    trades = Trade.objects.bulk_create(
+        [
+            Trade(
+                trading_entity="Trading entity",
+                counterparty="Counterpart",
+                direction=TradeDirection.SELL,
+                currency="CAD",
+                amount=10000,
+                underlying=["USD", "CAD"],
+            )
+            for _ in range(TRADES)
+        ]
+    )
+    return [f"/trades/{trade.id}/" for trade in trades]
+
+
+def run(paths, threads, conn_max_age):
+    connections.settings["default"]["CONN_MAX_AGE"] = conn_max_age
+    requests = [paths[i % len(paths)] for i in range(REQUESTS)]
+    opened = connection.pool_stats()["opened"]
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        start = time.perf_counter()
+        latencies = list(pool.map(lambda path: wsgi_request(path, ""), requests))
+        elapsed = time.perf_counter() - start
+
+        # One close per thread, the barrier keeps a thread from taking two
+        barrier = threading.Barrier(threads)
+
+        def close(_):
+            barrier.wait()
+            connections.close_all()
+
+        list(pool.map(close, range(threads)))
+    latencies.sort()
+    opened = connection.pool_stats()["opened"] - opened
+    print(
+        f"CONN_MAX_AGE {conn_max_age:3}  threads {threads:2}"
+        f"  {len(latencies) / elapsed:7.0f} req/s"
+        f"  mean {statistics.mean(latencies) * 1e3:6.2f} ms"
+        f"  p50 {latencies[len(latencies) // 2] * 1e3:6.2f} ms"
+        f"  p95 {latencies[int(len(latencies) * 0.95)] * 1e3:6.2f} ms"
+        f"  connections opened {opened:5}"
+    )
+
+
+if __name__ == "__main__":
+    database_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        paths = seed()
+        connection.close()
+        with override_settings(
+            CACHES={
+                "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+            }
+        ):
+            for threads in THREADS:
+                for conn_max_age in CONN_MAX_AGES:
+                    run(paths, threads, conn_max_age)
+    finally:
+        connections.close_all()
+        connection.creation.destroy_test_db(database_name, verbosity=0)
@@ -0,0 +1,92 @@
+"""Compares the serializer-validated diff with the typed diff engine.
+
+Diffs batches of versions of a trade given as JSON (like POST /trades/diff/),
+each with the next one and pairwise: the former path validates every version
+with TradeSerializer (twice per pair) and compares with '!=', the typed one
+parses every version once and compares snapshots. Doesn't need a database.
+
+    python -m benchmarks.diff_benchmark
+"""
+
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from itertools import combinations
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "configs.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from trade_api.serializers import TradeSerializer  # noqa: E402
+from trade_api.services import TradeService  # noqa: E402
+
+# Versions per batch, the pairwise batches are smaller (n * (n - 1) / 2 pairs)
+CONSECUTIVE_SIZES = [100, 1000, 10000]
+PAIRWISE_SIZES = [10, 50, 100]
+
+
+def make_versions(count):
+    now = datetime(2025, 11, 25, tzinfo=timezone.utc)
+    underlyings = [["USD", "CAD"], ["CAD", "USD"], ["USD", "EUR", "CAD"]]
+    return [
+        {
+            "trading_entity": "Trading entity",
+            "counterparty": "Counterpart",
+            "direction": "sell",
+            "style": "forward",
+            "currency": "CAD",
+            "amount": str(10000 + index // 3),
+            "underlying": underlyings[index % 3],
+            "strike": "1.35",
+            "trade_date": (now + timedelta(days=index // 5)).isoformat(),
+            "state": "draft",
+        }
+        for index in range(count)
+    ]
+
+
+def serializer_diffs(versions, pairs):
+    diffs = []
+    for previous, new in pairs:
+        trade1 = TradeSerializer(data=versions[previous])
+        trade2 = TradeSerializer(data=versions[new])
+        trade1.is_valid(raise_exception=True)
+        trade2.is_valid(raise_exception=True)
+        diff = {}
+        for field in trade1.validated_data:
+            if trade1.validated_data[field] != trade2.validated_data[field]:
+                diff[field] = {
+                    "previous": str(trade1.validated_data[field]),
+                    "new": str(trade2.validated_data[field]),
+                }
+        diffs.append(diff)
+    return diffs
+
+
+def measure(function):
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def run(mode, sizes):
+    for size in sizes:
+        versions = make_versions(size)
+        if mode == "pairwise":
+            pairs = list(combinations(range(size), 2))
+        else:
+            pairs = [(index, index + 1) for index in range(size - 1)]
+        serializer = measure(lambda: serializer_diffs(versions, pairs))
+        typed = measure(lambda: TradeService.get_diff_between_trades(versions, mode))
+        print(
+            f"{mode:<11} {size:6} versions {len(pairs):6} diffs"
+            f"  serializer {len(pairs) / serializer:9.0f} diffs/s"
+            f"  typed {len(pairs) / typed:9.0f} diffs/s  x{serializer / typed:5.1f}"
+        )
+
+
+if __name__ == "__main__":
+    run("consecutive", CONSECUTIVE_SIZES)
+    run("pairwise", PAIRWISE_SIZES)
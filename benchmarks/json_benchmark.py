@@ -0,0 +1,135 @@
+"""Compares DRF's JSON renderer and parser with the fast ones.
+
+Renders a page of serialized trades, the logs of a trade and raw rows (with
+Decimal, UUID and datetime values), and parses a bulk creation and a change
+request. Doesn't need a database.
+
+    python -m benchmarks.json_benchmark
+"""
+
+import io
+import os
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "configs.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from rest_framework.parsers import JSONParser  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from trade_api.models import Trade, TradeLog  # noqa: E402
+from trade_api.parsers import FastJSONParser, fast_json_parser  # noqa: E402
+from trade_api.renderers import FastJSONRenderer, fast_json_renderer  # noqa: E402
+from trade_api.serializers import TradeLogSerializer, TradeSerializer  # noqa: E402
+from trade_api.utils import take_snapshot  # noqa: E402
+
+REPEAT = 200
+
+
+def make_trade(index):
+    now = datetime(2025, 11, 25, tzinfo=timezone.utc) + timedelta(seconds=index)
+    return Trade(
+        id=uuid.uuid4(),
+        trading_entity="Trading entity",
+        counterparty="Counterpart",
+        direction="sell",
+        currency="CAD",
+        amount=Decimal("10000.00"),
+        underlying=["USD", "EUR", "CAD"],
+        trade_date=now,
+        value_date=now + timedelta(minutes=1),
+        strike=Decimal("1.350000"),
+        state="sent",
+        created_at=now,
+        updated_at=now + timedelta(minutes=1),
+    )
+
+
+def make_log(trade, index):
+    previous = take_snapshot(trade)
+    new = dict(previous, amount=str(index))
+    return TradeLog(
+        id=uuid.uuid4(),
+        trade=trade,
+        user_id=uuid.uuid4(),
+        action="update",
+        previous_state=previous,
+        new_state=new,
+        diff={"amount": {"previous": previous["amount"], "new": new["amount"]}},
+        timestamp=trade.updated_at + timedelta(seconds=index),
+    )
+
+
+def payloads():
+    trades = [make_trade(index) for index in range(100)]
+    return {
+        "trade page (100)": {
+            "page": 1,
+            "total_pages": 10,
+            "trades": TradeSerializer(trades, many=True).data,
+        },
+        "trade logs (50)": TradeLogSerializer(
+            [make_log(trades[0], index) for index in range(50)], many=True
+        ).data,
+        "raw rows (100)": [
+            {
+                "id": trade.id,
+                "state": trade.state,
+                "counterparty": trade.counterparty,
+                "amount": trade.amount,
+                "updated_at": trade.updated_at,
+            }
+            for trade in trades
+        ],
+    }
+
+
+def bodies():
+    trade = {
+        "trading_entity": "Trading entity",
+        "counterparty": "Counterpart",
+        "direction": "sell",
+        "currency": "CAD",
+        "amount": 10000,
+        "underlying": ["USD"],
+    }
+    change = {
+        "user_id": str(uuid.uuid4()),
+        "action": "update",
+        "fields": {"amount": 12000.5, "underlying": ["USD", "EUR"]},
+    }
+    renderer = JSONRenderer()
+    return {
+        "bulk creation (1000)": renderer.render([trade] * 1000),
+        "change": renderer.render(change),
+    }
+
+
+def measure(function, repeat=REPEAT):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def run():
+    for name, data in payloads().items():
+        drf = measure(lambda: JSONRenderer().render(data))
+        fast = measure(lambda: FastJSONRenderer().render(data))
+        print(f"render {name:<22} drf {drf:9.1f} us  fast {fast:9.1f} us")
+    for name, body in bodies().items():
+        drf = measure(lambda: JSONParser().parse(io.BytesIO(body)))
+        fast = measure(lambda: FastJSONParser().parse(io.BytesIO(body)))
+        print(f"parse  {name:<22} drf {drf:9.1f} us  fast {fast:9.1f} us")
+
+
+if __name__ == "__main__":
+    if fast_json_renderer.orjson is None or fast_json_parser.orjson is None:
+        print("orjson isn't installed, the fast classes use the stdlib")
+    run()
@@ -0,0 +1,317 @@
+"""Load test of the trade workflow against a running server.
+
+Virtual users replay a weighted mix of scenarios for a duration:
+
+- workflow: POST /trades/ then PATCH it through submit, approve, send and book
+- list: GET /trades/ on a random state and page
+- logs: GET /trade_logs/<id>/ of a trade created by the run
+- csv: GET /trade_logs/csv/<id>/ of a trade created by the run
+
+Throughput and latency percentiles per endpoint are printed and written as
+JSON (sorted keys, one run per file) so releases can be diffed. Only uses the
+standard library.
+
+    python manage.py runserver --noreload
+    python -m benchmarks.load_test --url http://localhost:8000 --concurrency 16 \\
+        --duration 60 --mix workflow=1,list=4,logs=2,csv=1 --output load.json
+"""
+
+import argparse
+import http.client
+import json
+import random
+import statistics
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+from urllib.parse import urlencode, urlsplit
+
+DEFAULT_MIX = {"workflow": 1, "list": 4, "logs": 2, "csv": 1}
+WORKFLOW = [
+    ("submit", None),
+    ("approve", None),
+    ("send", None),
+    ("book", {"strike": 1.25}),
+]
+STATES = [None, "active", "draft", "approved", "executed"]
+# Trade ids kept for the log reads, the oldest are dropped
+KNOWN_TRADES_SIZE = 1000
+
+
+def parse_mix(value):
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(
+                f"Unknown scenario '{name}', should be one of {list(DEFAULT_MIX)}"
+            )
+        try:
+            mix[name] = float(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Invalid weight for '{name}'")
+    if not any(mix.values()):
+        raise argparse.ArgumentTypeError("At least one scenario needs a weight")
+    return mix
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of already sorted values"""
+    if not sorted_values:
+        return None
+    index = max(
+        0, min(len(sorted_values) - 1, round(fraction * len(sorted_values)) - 1)
+    )
+    return sorted_values[index]
+
+
+class Recorder:
+    """Latencies and errors per endpoint, shared by the virtual users"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.workflows = 0
+
+    def record(self, endpoint, status, latency):
+        with self._lock:
+            self.latencies[endpoint].append(latency)
+            self.statuses[endpoint][str(status)] += 1
+            if not isinstance(status, int) or status >= 400:
+                self.errors[endpoint] += 1
+
+    def workflow_completed(self):
+        with self._lock:
+            self.workflows += 1
+
+    def report(self, config, elapsed):
+        endpoints = {}
+        for endpoint, latencies in sorted(self.latencies.items()):
+            latencies = sorted(latencies)
+            endpoints[endpoint] = {
+                "requests": len(latencies),
+                "errors": self.errors[endpoint],
+                "statuses": dict(sorted(self.statuses[endpoint].items())),
+                "throughput_rps": round(len(latencies) / elapsed, 2),
+                "latency_ms": {
+                    "mean": round(statistics.mean(latencies) * 1e3, 3),
+                    "p50": round(percentile(latencies, 0.50) * 1e3, 3),
+                    "p95": round(percentile(latencies, 0.95) * 1e3, 3),
+                    "p99": round(percentile(latencies, 0.99) * 1e3, 3),
+                    "max": round(latencies[-1] * 1e3, 3),
+                },
+            }
+        requests = sum(len(latencies) for latencies in self.latencies.values())
+        return {
+            "config": config,
+            "elapsed_s": round(elapsed, 3),
+            "totals": {
+                "requests": requests,
+                "errors": sum(self.errors.values()),
+                "throughput_rps": round(requests / elapsed, 2),
+                "workflows": self.workflows,
+                "workflows_per_s": round(self.workflows / elapsed, 2),
+            },
+            "endpoints": endpoints,
+        }
+
+
+class VirtualUser(threading.Thread):
+    def __init__(self, url, mix, deadline, recorder, known_trades, seed):
+        super().__init__(daemon=True)
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.https = parts.scheme == "https"
+        self.mix = mix
+        self.deadline = deadline
+        self.recorder = recorder
+        self.known_trades = known_trades
+        self.random = random.Random(seed)
+        self.user_id = str(uuid.uuid4())
+        self.connection = None
+
+    def connect(self):
+        connection_class = (
+            http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+        )
+        self.connection = connection_class(self.host, self.port, timeout=30)
+
+    def request(self, endpoint, method, path, body=None):
+        """Response status and JSON body (None for other content), 'endpoint'
+        groups the path in the report"""
+        headers = {"Accept": "application/json"}
+        if body is not None:
+            body = json.dumps(body)
+            headers["Content-Type"] = "application/json"
+        if self.connection is None:
+            self.connect()
+        start = time.perf_counter()
+        try:
+            self.connection.request(method, path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            content = response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException) as error:
+            # Reconnects on the next request (keep-alive closed by the server, ...)
+            self.connection.close()
+            self.connection = None
+            self.recorder.record(
+                endpoint, type(error).__name__, time.perf_counter() - start
+            )
+            return None, None
+        self.recorder.record(endpoint, status, time.perf_counter() - start)
+        if "json" in (response.getheader("Content-Type") or ""):
+            return status, json.loads(content)
+        return status, None
+
+    def run(self):
+        scenarios = list(self.mix)
+        weights = [self.mix[scenario] for scenario in scenarios]
+        while time.monotonic() < self.deadline:
+            scenario = self.random.choices(scenarios, weights)[0]
+            getattr(self, f"run_{scenario}")()
+        if self.connection is not None:
+            self.connection.close()
+
+    def run_workflow(self):
+        status, trade = self.request(
+            "POST /trades/",
+            "POST",
+            "/trades/",
+            {
+                "trading_entity": "Load test entity",
+                "counterparty": "Load test counterparty",
+                "direction": self.random.choice(["buy", "sell"]),
+                "currency": "CAD",
+                "amount": self.random.randint(1000, 1000000),
+                "underlying": ["USD"],
+            },
+        )
+        if status != 201:
+            return
+        self.known_trades.add(trade["id"])
+        for action, fields in WORKFLOW:
+            body = {"user_id": self.user_id, "action": action}
+            if fields:
+                body["fields"] = fields
+            status, _ = self.request(
+                f"PATCH /trades/<id>/ ({action})",
+                "PATCH",
+                f"/trades/{trade['id']}/",
+                body,
+            )
+            if status != 200:
+                return
+        self.recorder.workflow_completed()
+
+    def run_list(self):
+        params = {"page": self.random.randint(1, 5)}
+        state = self.random.choice(STATES)
+        if state:
+            params["state"] = state
+        self.request("GET /trades/", "GET", f"/trades/?{urlencode(params)}")
+
+    def run_logs(self):
+        trade_id = self.known_trades.sample(self.random)
+        if trade_id is None:
+            return self.run_workflow()
+        self.request("GET /trade_logs/<id>/", "GET", f"/trade_logs/{trade_id}/")
+
+    def run_csv(self):
+        trade_id = self.known_trades.sample(self.random)
+        if trade_id is None:
+            return self.run_workflow()
+        self.request("GET /trade_logs/csv/<id>/", "GET", f"/trade_logs/csv/{trade_id}/")
+
+
+class KnownTrades:
+    def __init__(self, size=KNOWN_TRADES_SIZE):
+        self._lock = threading.Lock()
+        self._ids = []
+        self.size = size
+
+    def add(self, trade_id):
+        with self._lock:
+            self._ids.append(trade_id)
+            if len(self._ids) > self.size:
+                del self._ids[: len(self._ids) - self.size]
+
+    def sample(self, generator):
+        with self._lock:
+            return generator.choice(self._ids) if self._ids else None
+
+
+def run(url, concurrency, duration, mix, seed=None):
+    recorder = Recorder()
+    known_trades = KnownTrades()
+    seeds = random.Random(seed)
+    deadline = time.monotonic() + duration
+    users = [
+        VirtualUser(url, mix, deadline, recorder, known_trades, seeds.random())
+        for _ in range(concurrency)
+    ]
+    start = time.perf_counter()
+    for user in users:
+        user.start()
+    for user in users:
+        user.join()
+    elapsed = time.perf_counter() - start
+    config = {
+        "url": url,
+        "concurrency": concurrency,
+        "duration_s": duration,
+        "mix": mix,
+        "seed": seed,
+        "started_at": datetime.now(timezone.utc).isoformat(),
+    }
+    return recorder.report(config, elapsed)
+
+
+def print_report(report):
+    totals = report["totals"]
+    print(
+        f"{totals['requests']} requests, {totals['errors']} errors,"
+        f" {totals['throughput_rps']} req/s, {totals['workflows_per_s']} workflows/s"
+    )
+    for endpoint, stats in report["endpoints"].items():
+        latency = stats["latency_ms"]
+        print(
+            f"{endpoint:<32} {stats['requests']:7} req {stats['errors']:5} err"
+            f" {stats['throughput_rps']:8.1f} req/s  p50 {latency['p50']:8.2f} ms"
+            f"  p95 {latency['p95']:8.2f} ms  p99 {latency['p99']:8.2f} ms"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=30, help="seconds")
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        default=DEFAULT_MIX,
+        help="weights of the scenarios, e.g. workflow=1,list=4,logs=2,csv=1",
+    )
+    parser.add_argument(
+        "--seed", type=int, help="makes the scenario choices repeatable"
+    )
+    parser.add_argument("--output", default="load_test.json", help="JSON report file")
+    args = parser.parse_args(argv)
+
+    report = run(args.url, args.concurrency, args.duration, args.mix, args.seed)
+    print_report(report)
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2, sort_keys=True)
+        output.write("\n")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Compares the legacy str() snapshots with the typed snapshot engine.
+
+Measures the CPU of one transition (two snapshots and a diff) and the JSON
+size of the log row it produces, over distinct trades so memoized encodings
+only help within a transition. Doesn't need a database.
+
+    python -m benchmarks.snapshot_benchmark
+"""
+
+import json
+import os
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "configs.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from trade_api.models import Trade  # noqa: E402
+from trade_api.utils import snapshot_diff, take_snapshot  # noqa: E402
+
+TRANSITIONS = 20000
+
+
+def legacy_snapshot(trade):
+    return {field.name: str(getattr(trade, field.name)) for field in trade._meta.fields}
+
+
+def legacy_diff(snapshot_1, snapshot_2):
+    diff = {}
+    for field in snapshot_1:
+        if snapshot_1[field] != snapshot_2[field]:
+            diff[field] = {
+                "previous": str(snapshot_1[field]),
+                "new": str(snapshot_2[field]),
+            }
+    return diff
+
+
+def make_transition(index):
+    now = datetime(2025, 11, 25, tzinfo=timezone.utc) + timedelta(seconds=index)
+    trade = Trade(
+        id=uuid.uuid4(),
+        trading_entity="Trading entity",
+        counterparty="Counterpart",
+        direction="sell",
+        currency="CAD",
+        amount=Decimal("10000.00"),
+        underlying=["USD", "EUR", "CAD"],
+        trade_date=now,
+        value_date=now + timedelta(minutes=1),
+        strike=Decimal("1.350000"),
+        state="sent",
+        created_at=now,
+        updated_at=now + timedelta(minutes=1),
+    )
+    executed_trade = Trade(
+        **{f.attname: getattr(trade, f.attname) for f in Trade._meta.fields}
+    )
+    executed_trade.state = "executed"
+    executed_trade.delivery_date = now + timedelta(minutes=2)
+    executed_trade.updated_at = now + timedelta(minutes=2)
+    return trade, executed_trade
+
+
+def run(name, snapshot, diff, transitions):
+    start = time.perf_counter()
+    for trade, executed_trade in transitions:
+        previous = snapshot(trade)
+        new = snapshot(executed_trade)
+        changes = diff(previous, new)
+    seconds = time.perf_counter() - start
+    size = len(json.dumps([previous, new, changes]))
+    print(
+        f"{name:<8} {seconds / len(transitions) * 1e6:8.2f} us/transition {size:6d} bytes/log"
+    )
+
+
+if __name__ == "__main__":
+    transitions = [make_transition(index) for index in range(TRANSITIONS)]
+    for _ in range(3):
+        run("legacy", legacy_snapshot, legacy_diff, transitions)
+        run("typed", take_snapshot, snapshot_diff, transitions)
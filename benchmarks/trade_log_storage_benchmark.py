@@ -0,0 +1,84 @@
+"""Compares the full and compact trade log storages.
+
+Replays the same workflow with both and reports the size of the trade log
+table and the latency of the transitions writing it. Needs the PostgreSQL
+server of the settings, the benchmark runs in a throwaway test database.
+
+    python -m benchmarks.trade_log_storage_benchmark
+"""
+
+import os
+import statistics
+import time
+import uuid
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "configs.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test.utils import override_settings  # noqa: E402
+
+from trade_api.models import Action, Trade, TradeDirection  # noqa: E402
+from trade_api.services import TradeService  # noqa: E402
+
+TRADES = 200
+UPDATES_PER_TRADE = 20
+
+
+def replay_workflow():
+    trades = Trade.objects.bulk_create(
+        [
+            Trade(
+                trading_entity="Trading entity",
+                counterparty="Counterpart",
+                direction=TradeDirection.SELL,
+                currency="CAD",
+                amount=10000,
+                underlying=["USD", "CAD"],
+            )
+            for _ in range(TRADES)
+        ]
+    )
+    user_id = uuid.uuid4()
+    latencies = []
+    for trade in trades:
+        steps = [(Action.SUBMIT, None)]
+        steps += [(Action.UPDATE, {"amount": i}) for i in range(UPDATES_PER_TRADE)]
+        steps += [(Action.APPROVE, None), (Action.SEND, None)]
+        steps += [(Action.BOOK, {"strike": 1.25})]
+        for action, fields in steps:
+            start = time.perf_counter()
+            TradeService.update_trade(trade.id, action, user_id, fields)
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def run(name, compact):
+    with connection.cursor() as cursor:
+        cursor.execute("TRUNCATE trade_api_tradelog, trade_api_trade")
+    with override_settings(TRADE_LOG_COMPACT_STORAGE=compact):
+        latencies = replay_workflow()
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE trade_api_tradelog")
+        cursor.execute("SELECT pg_total_relation_size('trade_api_tradelog')")
+        size = cursor.fetchone()[0]
+    latencies.sort()
+    print(
+        f"{name:<8} table {size / 1024:8.0f} KiB"
+        f"  transition mean {statistics.mean(latencies) * 1e3:6.2f} ms"
+        f"  p50 {latencies[len(latencies) // 2] * 1e3:6.2f} ms"
+        f"  p95 {latencies[int(len(latencies) * 0.95)] * 1e3:6.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    database_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        run("full", compact=False)
+        run("compact", compact=True)
+    finally:
+        connection.creation.destroy_test_db(database_name, verbosity=0)
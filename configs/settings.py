@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -18,11 +19,47 @@ INSTALLED_APPS = [
     "drf_spectacular",
 ]
 
+# Trade logs storing only the diff, with the full states every N events and
+# on terminal states
+TRADE_LOG_COMPACT_STORAGE = False
+TRADE_LOG_CHECKPOINT_INTERVAL = 10
+
+# Single trades are cached on reads and dropped on writes, a shared backend
+# (e.g. Redis or Memcached) is needed when running several processes
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+TRADE_CACHE_TIMEOUT = 300
+# Rendered pages of the trade list, outdated by any change to their states
+TRADE_LIST_CACHE_TIMEOUT = 30
+
+# Rows each state's trade counter is split over, concurrent transitions
+# update one of them at random so they rarely wait for each other
+TRADE_STATE_COUNT_SHARDS = 8
+
+# Request metrics are served by /metrics (per process), the breakdown of each
+# response (database, serializer, render, ...) is also sent in Server-Timing
+TRADE_SERVER_TIMING = True
+
+# The fast JSON renderer and parser use orjson when it's installed and the
+# stdlib otherwise
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_RENDERER_CLASSES": [
+        "trade_api.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "trade_api.parsers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
 
 MIDDLEWARE = [
+    "trade_api.middleware.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -52,14 +89,25 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "configs.wsgi.application"
 
+# Read from the environment, the defaults match docker-compose.database.yml.
+# Each worker thread keeps its connection DB_CONN_MAX_AGE seconds (0 closes it
+# after every request) and checks it before reusing it, the process keeps at
+# most DB_POOL_MAX_SIZE open and waits DB_POOL_TIMEOUT seconds for a free one.
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.postgresql",
-        "NAME": "trades",
-        "USER": "postgres",
-        "PASSWORD": "password",
-        "HOST": "localhost",
-        "PORT": "5432",
+        "ENGINE": "trade_api.backends.postgresql",
+        "NAME": os.environ.get("DB_NAME", "trades"),
+        "USER": os.environ.get("DB_USER", "postgres"),
+        "PASSWORD": os.environ.get("DB_PASSWORD", "password"),
+        "HOST": os.environ.get("DB_HOST", "localhost"),
+        "PORT": os.environ.get("DB_PORT", "5432"),
+        "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", "60")),
+        "CONN_HEALTH_CHECKS": os.environ.get("DB_CONN_HEALTH_CHECKS", "true") == "true",
+        "POOL_MAX_SIZE": int(os.environ.get("DB_POOL_MAX_SIZE", "20")),
+        "POOL_TIMEOUT": float(os.environ.get("DB_POOL_TIMEOUT", "10")),
+        "OPTIONS": {
+            "connect_timeout": int(os.environ.get("DB_CONNECT_TIMEOUT", "5")),
+        },
     }
 }
 
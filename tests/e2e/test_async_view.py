@@ -0,0 +1,134 @@
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from trade_api.models import Action, Trade, TradeDirection, TradeState
+from trade_api.services import TradeService
+
+
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user_id = uuid.uuid4()
+        self.trade = Trade.objects.create(
+            trading_entity="test entity",
+            counterparty="test Counterpart",
+            direction=TradeDirection.SELL,
+            currency="CAD",
+            amount=2000,
+        )
+        Trade.objects.create(
+            trading_entity="other entity",
+            counterparty="test Counterpart",
+            direction=TradeDirection.BUY,
+            currency="CAD",
+            amount=1000,
+        )
+        TradeService.update_trade(self.trade.id, Action.SUBMIT, self.user_id, None)
+
+    async def test_list_same_as_sync(self):
+        for params in (
+            {},
+            {"state": TradeState.PENDING_APPROVAL},
+            {"pagination": "cursor", "per_page": 1, "with_total": "true"},
+        ):
+            cache.clear()
+            response = await self.async_client.get(reverse("async-trade-list"), params)
+            self.assertEqual(response.status_code, 200)
+            cache.clear()
+            expected = await self.sync_get(reverse("trade-list"), params)
+            self.assertEqual(response.json(), expected.json())
+
+    async def test_list_invalid_per_page(self):
+        response = await self.async_client.get(
+            reverse("async-trade-list"), {"per_page": 0}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("error", response.json())
+
+    async def test_list_unknown_state(self):
+        response = await self.async_client.get(
+            reverse("async-trade-list"), {"state": "unknown"}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("error", response.json())
+
+    async def test_get_same_as_sync(self):
+        url = reverse("async-trade-detail", kwargs={"trade_id": self.trade.id})
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["ETag"], '"2"')
+        expected = await self.sync_get(
+            reverse("trade-modify", kwargs={"trade_id": self.trade.id})
+        )
+        self.assertEqual(response.json(), expected.json())
+
+        response = await self.async_client.get(url, headers={"If-None-Match": '"2"'})
+        self.assertEqual(response.status_code, 304)
+
+    async def test_get_not_found(self):
+        url = reverse("async-trade-detail", kwargs={"trade_id": uuid.uuid4()})
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 404)
+
+    async def test_logs_same_as_sync(self):
+        url = reverse("async-trade-log-by-trade", kwargs={"trade_id": self.trade.id})
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 200)
+        expected = await self.sync_get(
+            reverse("trade-log-by-trade", kwargs={"trade_id": self.trade.id})
+        )
+        self.assertEqual(response.json(), expected.json())
+        self.assertEqual(len(response.json()), 1)
+
+    async def test_logs_params_same_as_sync(self):
+        await sync_to_async(TradeService.update_trade)(
+            self.trade.id, Action.APPROVE, self.user_id, None
+        )
+        url = reverse("async-trade-log-by-trade", kwargs={"trade_id": self.trade.id})
+        sync_url = reverse("trade-log-by-trade", kwargs={"trade_id": self.trade.id})
+        for params in (
+            {"diff_only": "true"},
+            {"action": Action.APPROVE},
+            {"user_id": self.user_id},
+            {"pagination": "cursor", "per_page": 1},
+            {"pagination": "cursor", "per_page": 1, "diff_only": "true"},
+        ):
+            response = await self.async_client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            expected = await self.sync_get(sync_url, params)
+            self.assertEqual(response.json(), expected.json())
+
+        response = await self.async_client.get(
+            url, {"pagination": "cursor", "per_page": 1}
+        )
+        self.assertEqual(len(response.json()["logs"]), 1)
+        next_cursor = response.json()["next"]
+        response = await self.async_client.get(url, {"cursor": next_cursor})
+        expected = await self.sync_get(sync_url, {"cursor": next_cursor})
+        self.assertEqual(response.json(), expected.json())
+        self.assertEqual(response.json()["logs"][0]["action"], Action.SUBMIT)
+
+    async def test_logs_invalid_params(self):
+        url = reverse("async-trade-log-by-trade", kwargs={"trade_id": self.trade.id})
+        for params in ({"action": "unknown"}, {"since": "x"}, {"cursor": "x"}):
+            response = await self.async_client.get(url, params)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("error", response.json())
+
+    async def test_logs_not_found(self):
+        url = reverse("async-trade-log-by-trade", kwargs={"trade_id": uuid.uuid4()})
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 404)
+
+    async def test_method_not_allowed(self):
+        response = await self.async_client.post(reverse("async-trade-list"))
+        self.assertEqual(response.status_code, 405)
+
+    async def sync_get(self, url, params=None):
+        return await sync_to_async(self.client.get)(url, params)
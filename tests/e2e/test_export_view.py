@@ -0,0 +1,150 @@
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+import uuid
+from datetime import timedelta
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from trade_api.models import Action, Trade, TradeDirection, TradeLog
+from trade_api.serializers import TradeLogDiffSerializer, TradeSerializer
+from trade_api.services import ExportService, TradeService
+
+
+class ExportViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user_id = uuid.uuid4()
+        cls.trades = []
+        for index in range(5):
+            trade = Trade(
+                trading_entity="Trading entity",
+                counterparty=f"Counterpart {index}",
+                direction=TradeDirection.SELL,
+                currency="CAD",
+                amount=1000 + index,
+                underlying=["USD", "CAD"],
+            )
+            trade.save()
+            cls.trades.append(trade)
+        for trade in cls.trades[:2]:
+            TradeService.update_trade(trade.id, Action.SUBMIT, cls.user_id, None)
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def get(self, name, **params):
+        response = self.client.get(reverse(name), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, b"".join(response.streaming_content)
+
+    def test_trades_ndjson(self):
+        response, content = self.get("trade-bulk-export")
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertIn('filename="trades.ndjson"', response["Content-Disposition"])
+        rows = [json.loads(line) for line in content.splitlines()]
+        trades = Trade.objects.order_by("created_at", "id")
+        self.assertEqual(
+            rows,
+            json.loads(JSONRenderer().render(TradeSerializer(trades, many=True).data)),
+        )
+
+    def test_trades_csv(self):
+        response, content = self.get("trade-bulk-export", output="csv")
+        self.assertEqual(response["Content-Type"], "text/csv")
+        rows = list(csv.DictReader(io.StringIO(content.decode("utf-8"))))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]["counterparty"], "Counterpart 0")
+        self.assertEqual(rows[0]["underlying"], '["USD","CAD"]')
+        self.assertEqual(rows[0]["strike"], "")
+
+    def test_trades_gzip(self):
+        _, plain = self.get("trade-bulk-export", output="csv")
+        response, content = self.get("trade-bulk-export", output="csv", gzip="true")
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        self.assertIn('filename="trades.csv.gz"', response["Content-Disposition"])
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(gzip.decompress(content), plain)
+
+    def test_trades_state_filter(self):
+        _, content = self.get("trade-bulk-export", state="pending approval")
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(
+            {row["id"] for row in rows}, {str(trade.id) for trade in self.trades[:2]}
+        )
+
+    def test_trades_date_filter(self):
+        later = timezone.now() + timedelta(days=1)
+        _, content = self.get("trade-bulk-export", since=later.isoformat())
+        self.assertEqual(content, b"")
+        _, content = self.get(
+            "trade-bulk-export", output="csv", until=later.isoformat()
+        )
+        self.assertEqual(len(content.decode("utf-8").splitlines()), 6)
+
+    def test_logs_ndjson(self):
+        response, content = self.get("trade-log-bulk-export")
+        self.assertIn('filename="logs.ndjson"', response["Content-Disposition"])
+        rows = [json.loads(line) for line in content.splitlines()]
+        logs = TradeLog.objects.order_by("timestamp", "id")
+        self.assertEqual(
+            rows,
+            json.loads(
+                JSONRenderer().render(TradeLogDiffSerializer(logs, many=True).data)
+            ),
+        )
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0]["diff"]["state"]["new"], "pending approval")
+
+    def test_logs_state_filter(self):
+        _, content = self.get("trade-log-bulk-export", state="draft")
+        self.assertEqual(content, b"")
+
+    def test_invalid_parameters(self):
+        response = self.client.get(reverse("trade-bulk-export"), {"output": "xml"})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(reverse("trade-log-bulk-export"), {"since": "x"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json(), {"error": "'since' must be an ISO 8601 date and time"}
+        )
+        response = self.client.get(reverse("trade-bulk-export"), {"state": "x"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_chunks(self):
+        chunks = list(ExportService.export("trades", chunk_size=2))
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(sum(chunk.count(b"\n") for chunk in chunks), 5)
+
+    def test_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "trades.csv.gz")
+            call_command(
+                "export_trades",
+                "trades",
+                "--output-format=csv",
+                "--gzip",
+                "--state=active",
+                f"--file={path}",
+                stderr=io.StringIO(),
+            )
+            with gzip.open(path, "rt") as file:
+                rows = list(csv.DictReader(file))
+        self.assertEqual(
+            {row["id"] for row in rows}, {str(trade.id) for trade in self.trades}
+        )
+
+    def test_command_invalid_parameters(self):
+        with self.assertRaises(CommandError):
+            call_command("export_trades", "logs", "--since=yesterday")
+        with self.assertRaises(CommandError):
+            call_command("export_trades", "trades", "--state=unknown")
@@ -0,0 +1,31 @@
+from unittest import mock
+
+from django.db import DatabaseError, connection
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+
+class HealthViewTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_db_success(self):
+        response = self.client.get(reverse("health-db"))
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["status"], "ok")
+        self.assertEqual(data["vendor"], connection.vendor)
+        self.assertGreaterEqual(data["pool"]["open"], 1)
+        self.assertIn("latency_ms", data)
+        if connection.vendor == "postgresql":
+            self.assertGreaterEqual(data["server"]["connections"], 1)
+
+    def test_db_unavailable(self):
+        with mock.patch.object(
+            connection, "cursor", side_effect=DatabaseError("connection refused")
+        ):
+            response = self.client.get(reverse("health-db"))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()["status"], "unavailable")
+        self.assertEqual(response.json()["error"], "connection refused")
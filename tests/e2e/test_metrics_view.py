@@ -0,0 +1,80 @@
+import uuid
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from trade_api.models import Trade, TradeDirection
+from trade_api.utils.metrics import HISTOGRAMS
+
+
+class MetricsViewTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        for histogram in HISTOGRAMS:
+            histogram.clear()
+        self.trade = Trade.objects.create(
+            trading_entity="test entity",
+            counterparty="test Counterpart",
+            direction=TradeDirection.SELL,
+            currency="CAD",
+            amount=2000,
+        )
+
+    def test_server_timing(self):
+        response = self.client.get(reverse("trade-list"))
+        self.assertEqual(response.status_code, 200)
+        entries = [
+            entry.split(";")[0] for entry in response["Server-Timing"].split(", ")
+        ]
+        self.assertEqual(entries[:2], ["total", "db"])
+        self.assertIn("serializer", entries)
+        self.assertIn("render", entries)
+
+    def test_metrics(self):
+        self.client.patch(
+            reverse("trade-modify", args=[self.trade.id]),
+            {"user_id": str(uuid.uuid4()), "action": "submit"},
+            format="json",
+        )
+
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        content = response.content.decode()
+        labels = 'route="trade-modify",method="PATCH",action="submit"'
+        self.assertIn(
+            f"trade_api_request_duration_seconds_count{{{labels}}} 1", content
+        )
+        self.assertIn(f"trade_api_request_db_queries_count{{{labels}}} 1", content)
+        self.assertIn(
+            f'trade_api_request_stage_duration_seconds_count{{{labels},stage="diff"}} 1',
+            content,
+        )
+
+    def test_client_values_are_bounded(self):
+        for index in range(3):
+            self.client.patch(
+                reverse("trade-modify", args=[self.trade.id]),
+                {"user_id": str(uuid.uuid4()), "action": f"unknown-{index}"},
+                format="json",
+            )
+            self.client.generic(f"X{index}", reverse("trade-list"))
+
+        content = self.client.get(reverse("metrics")).content.decode()
+        self.assertIn(
+            'trade_api_request_duration_seconds_count{route="trade-modify",'
+            'method="PATCH",action="invalid"} 3',
+            content,
+        )
+        self.assertIn(
+            'trade_api_request_duration_seconds_count{route="trade-list",'
+            'method="other",action=""} 3',
+            content,
+        )
+        self.assertNotIn("unknown-", content)
+        self.assertNotIn('method="X', content)
+
+    def test_metrics_not_allowed(self):
+        response = self.client.post(reverse("metrics"))
+        self.assertEqual(response.status_code, 405)
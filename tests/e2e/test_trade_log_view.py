@@ -1,11 +1,14 @@
+import io
 import uuid
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.management import call_command
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from rest_framework.test import APIClient
 
 from trade_api.models import Action, Trade, TradeDirection, TradeLog
+from trade_api.services import TradeService
 
 User = get_user_model()
 
@@ -36,3 +39,226 @@ class TradeLogViewTests(TestCase):
         self.assertEqual(response.status_code, 200)
         data = response.json()
         self.assertTrue(any(trade_log["action"] == Action.SUBMIT for trade_log in data))
+
+    def test_export_csv(self):
+        TradeLog.objects.create(
+            trade=self.trade,
+            user_id=uuid.uuid4(),
+            action=Action.APPROVE,
+            previous_state={"state": "pending approval"},
+            new_state={"state": "approved"},
+        )
+        url = reverse("trade-log-csv", kwargs={"trade_id": self.trade.id})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        rows = b"".join(response.streaming_content).decode("utf-8").splitlines()
+        self.assertEqual(len(rows), 4)
+        self.assertTrue(rows[0].startswith("trading_entity,"))
+        self.assertTrue(rows[1].endswith(",approved"))
+        self.assertTrue(rows[2].endswith(","))
+
+    def test_export_csv_trade_not_found(self):
+        url = reverse("trade-log-csv", kwargs={"trade_id": uuid.uuid4()})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(TRADE_LOG_COMPACT_STORAGE=True, TRADE_LOG_CHECKPOINT_INTERVAL=3)
+    def test_compact_storage_output_unchanged(self):
+        trade = Trade.objects.create(
+            trading_entity="compact entity",
+            counterparty="test Counterpart",
+            direction=TradeDirection.BUY,
+            currency="CAD",
+            amount=1000,
+        )
+        user_id = uuid.uuid4()
+        TradeService.update_trade(trade.id, Action.SUBMIT, user_id, None)
+        for amount in range(5):
+            TradeService.update_trade(
+                trade.id, Action.UPDATE, user_id, {"amount": amount}
+            )
+        TradeService.update_trade(trade.id, Action.APPROVE, user_id, None)
+        TradeService.update_trade(trade.id, Action.CANCEL, user_id, None)
+
+        self.assertEqual(
+            list(
+                trade.log.order_by("timestamp").values_list("is_checkpoint", flat=True)
+            ),
+            [True, False, False, True, False, False, True, True],
+        )
+
+        logs_url = reverse("trade-log-by-trade", kwargs={"trade_id": trade.id})
+        csv_url = reverse("trade-log-csv", kwargs={"trade_id": trade.id})
+
+        def read():
+            logs = self.client.get(logs_url).json()
+            csv = b"".join(self.client.get(csv_url).streaming_content)
+            return logs, csv
+
+        compact_logs, compact_csv = read()
+        call_command("compact_trade_logs", "--expand", stdout=io.StringIO())
+        self.assertFalse(trade.log.filter(is_checkpoint=False).exists())
+        self.assertEqual(read(), (compact_logs, compact_csv))
+
+        self.assertEqual(compact_logs[0]["new_state"]["state"], "cancelled")
+        self.assertEqual(compact_logs[2]["new_state"]["amount"], "4.00")
+        self.assertEqual(compact_logs[2]["previous_state"]["amount"], "3.00")
+
+        call_command("compact_trade_logs", stdout=io.StringIO())
+        self.assertEqual(trade.log.filter(is_checkpoint=False).count(), 4)
+        self.assertEqual(read(), (compact_logs, compact_csv))
+
+    def make_history(self, updater_id):
+        """Trade with 8 logs: submit, 5 updates by 'updater_id', approve and cancel"""
+        trade = Trade.objects.create(
+            trading_entity="history entity",
+            counterparty="test Counterpart",
+            direction=TradeDirection.BUY,
+            currency="CAD",
+            amount=1000,
+        )
+        user_id = uuid.uuid4()
+        TradeService.update_trade(trade.id, Action.SUBMIT, user_id, None)
+        for amount in range(5):
+            TradeService.update_trade(
+                trade.id, Action.UPDATE, updater_id, {"amount": amount}
+            )
+        TradeService.update_trade(trade.id, Action.APPROVE, user_id, None)
+        TradeService.update_trade(trade.id, Action.CANCEL, user_id, None)
+        return trade
+
+    def read_pages(self, url, params):
+        logs = []
+        response = self.client.get(url, dict(params, pagination="cursor"))
+        while True:
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            logs += data["logs"]
+            if data["next"] is None:
+                return logs, data
+            response = self.client.get(url, dict(params, cursor=data["next"]))
+
+    def test_get_pages(self):
+        trade = self.make_history(uuid.uuid4())
+        url = reverse("trade-log-by-trade", kwargs={"trade_id": trade.id})
+        all_logs = self.client.get(url).json()
+
+        logs, last_page = self.read_pages(url, {"per_page": 3})
+        self.assertEqual(logs, all_logs)
+        self.assertEqual(len(last_page["logs"]), 2)
+
+        response = self.client.get(
+            url, {"cursor": last_page["previous"], "per_page": 3}
+        )
+        self.assertEqual(response.json()["logs"], all_logs[3:6])
+
+    @override_settings(TRADE_LOG_COMPACT_STORAGE=True, TRADE_LOG_CHECKPOINT_INTERVAL=3)
+    def test_get_pages_compact_storage(self):
+        trade = self.make_history(uuid.uuid4())
+        url = reverse("trade-log-by-trade", kwargs={"trade_id": trade.id})
+        all_logs = self.client.get(url).json()
+
+        self.assertEqual(self.read_pages(url, {"per_page": 2})[0], all_logs)
+        updates = [log for log in all_logs if log["action"] == Action.UPDATE]
+        self.assertEqual(
+            self.read_pages(url, {"per_page": 2, "action": "update"})[0], updates
+        )
+
+    def test_get_filters(self):
+        updater_id = uuid.uuid4()
+        trade = self.make_history(updater_id)
+        url = reverse("trade-log-by-trade", kwargs={"trade_id": trade.id})
+        all_logs = self.client.get(url).json()
+
+        response = self.client.get(url, {"action": "update"})
+        self.assertEqual(
+            response.json(), [log for log in all_logs if log["action"] == "update"]
+        )
+
+        response = self.client.get(url, {"user_id": str(updater_id)})
+        self.assertEqual(len(response.json()), 5)
+
+        response = self.client.get(
+            url, {"since": all_logs[5]["timestamp"], "until": all_logs[2]["timestamp"]}
+        )
+        self.assertEqual(response.json(), all_logs[2:6])
+
+    def test_get_diff_only(self):
+        trade = self.make_history(uuid.uuid4())
+        url = reverse("trade-log-by-trade", kwargs={"trade_id": trade.id})
+        all_logs = self.client.get(url).json()
+
+        response = self.client.get(url, {"diff_only": "true", "pagination": "cursor"})
+        logs = response.json()["logs"]
+        self.assertEqual(len(logs), 8)
+        for log, full_log in zip(logs, all_logs):
+            self.assertNotIn("previous_state", log)
+            self.assertNotIn("new_state", log)
+            self.assertEqual(log["diff"], full_log["diff"])
+
+    def test_get_invalid_filters(self):
+        url = reverse("trade-log-by-trade", kwargs={"trade_id": self.trade.id})
+        for params in (
+            {"action": "delete"},
+            {"user_id": "someone"},
+            {"since": "yesterday"},
+            {"cursor": "invalid"},
+        ):
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 400, params)
+
+    def test_get_trade_not_found(self):
+        url = reverse("trade-log-by-trade", kwargs={"trade_id": uuid.uuid4()})
+        response = self.client.get(url, {"pagination": "cursor"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_audit(self):
+        updater_id = uuid.uuid4()
+        trades = [self.make_history(updater_id) for _ in range(2)]
+        url = reverse("trade-log-list")
+
+        response = self.client.get(url, {"user_id": str(updater_id), "per_page": 4})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(len(data["logs"]), 4)
+        self.assertNotIn("new_state", data["logs"][0])
+
+        logs = data["logs"]
+        while data["next"]:
+            data = self.client.get(
+                url, {"user_id": str(updater_id), "per_page": 4, "cursor": data["next"]}
+            ).json()
+            logs += data["logs"]
+        self.assertEqual(len(logs), 10)
+        self.assertEqual({log["trade"] for log in logs}, {str(t.id) for t in trades})
+        self.assertTrue(all(log["action"] == "update" for log in logs))
+        timestamps = [log["timestamp"] for log in logs]
+        self.assertEqual(timestamps, sorted(timestamps, reverse=True))
+
+    def test_audit_action_and_time_window(self):
+        first = self.make_history(uuid.uuid4())
+        since = first.log.order_by("-timestamp").first().timestamp
+        self.make_history(uuid.uuid4())
+        url = reverse("trade-log-list")
+
+        response = self.client.get(url, {"action": "cancel"})
+        self.assertEqual(len(response.json()["logs"]), 2)
+
+        response = self.client.get(
+            url, {"action": "cancel", "since": since.isoformat()}
+        )
+        logs = response.json()["logs"]
+        self.assertEqual(len(logs), 2)
+
+        response = self.client.get(
+            url, {"action": "cancel", "until": since.isoformat()}
+        )
+        self.assertEqual(response.json()["logs"][0]["trade"], str(first.id))
+        self.assertEqual(len(response.json()["logs"]), 1)
+
+    def test_audit_invalid_filters(self):
+        url = reverse("trade-log-list")
+        for params in ({"action": "delete"}, {"until": "today"}, {"cursor": "x"}):
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 400, params)
@@ -1,17 +1,29 @@
+import io
 import uuid
+from unittest import mock
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
 from rest_framework.test import APIClient
 
 from trade_api.models import Action, Trade, TradeDirection, TradeState
+from trade_api.serializers import TradeSerializer
+from trade_api.services import TradeLogService, TradeService, TradeStatsService
+from trade_api.utils import snapshot_diff
 
 User = get_user_model()
 
 
 class TradeViewTests(TestCase):
     def setUp(self):
+        cache.clear()
         self.client = APIClient()
         self.user = User.objects.create_user(username="username", password="password")
         self.client.force_authenticate(user=self.user)
@@ -30,6 +42,287 @@ class TradeViewTests(TestCase):
         data = response.json()
         self.assertTrue(any(trade["trading_entity"] == "test entity" for trade in data))
 
+    def test_list_cursor_pagination(self):
+        for i in range(4):
+            Trade.objects.create(
+                trading_entity=f"entity {i}",
+                counterparty="test Counterpart",
+                direction=TradeDirection.BUY,
+                currency="CAD",
+                amount=1000,
+            )
+        url = reverse("trade-list")
+        response = self.client.get(url, {"pagination": "cursor", "per_page": 2})
+        self.assertEqual(response.status_code, 200)
+        first_page = response.json()
+        self.assertEqual(len(first_page["trades"]), 2)
+        self.assertIsNone(first_page["previous"])
+        self.assertNotIn("total", first_page)
+
+        response = self.client.get(
+            url, {"cursor": first_page["next"], "per_page": 2, "with_total": "true"}
+        )
+        second_page = response.json()
+        self.assertEqual(second_page["total"], 5)
+        self.assertEqual(len(second_page["trades"]), 2)
+        self.assertIsNotNone(second_page["next"])
+
+        response = self.client.get(url, {"cursor": second_page["next"], "per_page": 2})
+        last_page = response.json()
+        self.assertEqual(len(last_page["trades"]), 1)
+        self.assertIsNone(last_page["next"])
+
+        seen = [
+            trade["id"]
+            for page in (first_page, second_page, last_page)
+            for trade in page["trades"]
+        ]
+        self.assertEqual(len(set(seen)), 5)
+
+        response = self.client.get(
+            url, {"cursor": second_page["previous"], "per_page": 2}
+        )
+        self.assertEqual(response.json()["trades"], first_page["trades"])
+
+    def test_list_cursor_with_state(self):
+        Trade.objects.create(
+            trading_entity="approved entity",
+            counterparty="test Counterpart",
+            direction=TradeDirection.BUY,
+            currency="CAD",
+            amount=1000,
+            state=TradeState.APPROVED,
+        )
+        url = reverse("trade-list")
+        response = self.client.get(
+            url, {"pagination": "cursor", "state": TradeState.APPROVED}
+        )
+        data = response.json()
+        self.assertEqual(len(data["trades"]), 1)
+        self.assertEqual(data["trades"][0]["trading_entity"], "approved entity")
+        self.assertIsNone(data["next"])
+
+    def test_list_invalid_cursor(self):
+        url = reverse("trade-list")
+        response = self.client.get(url, {"cursor": "invalid"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_list_unknown_state(self):
+        url = reverse("trade-list")
+        for params in ({"state": "unknown"}, {"state": "unknown", "cursor": ""}):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("error", response.json())
+            self.assertEqual(len(queries), 0)
+        # Nothing was cached for the unknown value
+        self.assertEqual(TradeService.get_list_cache_stats()["misses"], 0)
+
+    def test_get_by_id_success(self):
+        url = reverse("trade-modify", kwargs={"trade_id": self.trade.id})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["id"], str(self.trade.id))
+        self.assertEqual(response["ETag"], '"1"')
+        self.assertEqual(
+            response["Last-Modified"],
+            http_date(int(self.trade.updated_at.timestamp())),
+        )
+
+    def test_get_by_id_cached(self):
+        url = reverse("trade-modify", kwargs={"trade_id": self.trade.id})
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["state"], TradeState.DRAFT)
+
+    def test_get_by_id_read_before_commit_not_cached(self):
+        get = Trade.objects.get
+        reads = []
+
+        def read_then_commit(*args, **kwargs):
+            trade = get(*args, **kwargs)
+            if not reads:
+                reads.append(trade)
+                # The update commits between the read and the fill of the cache
+                with self.captureOnCommitCallbacks(execute=True):
+                    TradeService.update_trade(
+                        self.trade.id, Action.SUBMIT, self.user.id, None
+                    )
+            return trade
+
+        with mock.patch.object(Trade.objects, "get", side_effect=read_then_commit):
+            stale = TradeService.get_by_id(self.trade.id)
+        self.assertEqual(stale.state, TradeState.DRAFT)
+
+        url = reverse("trade-modify", kwargs={"trade_id": self.trade.id})
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=f'"{stale.version}"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["state"], TradeState.PENDING_APPROVAL)
+
+    def test_get_by_id_not_modified(self):
+        url = reverse("trade-modify", kwargs={"trade_id": self.trade.id})
+        etag = self.client.get(url)["ETag"]
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["ETag"], etag)
+
+        last_modified = response["Last-Modified"]
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_get_by_id_after_modify(self):
+        url = reverse("trade-modify", kwargs={"trade_id": self.trade.id})
+        etag = self.client.get(url)["ETag"]
+        self.client.patch(
+            url,
+            data={"user_id": self.user.id, "action": Action.SUBMIT},
+            format="json",
+        )
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["ETag"], '"2"')
+        self.assertEqual(response.json()["state"], TradeState.PENDING_APPROVAL)
+
+    def test_get_by_id_after_modify_batch(self):
+        url = reverse("trade-modify", kwargs={"trade_id": self.trade.id})
+        self.client.get(url)
+        self.client.patch(
+            reverse("trade-modify-batch"),
+            data={
+                "user_id": self.user.id,
+                "action": Action.SUBMIT,
+                "ids": [str(self.trade.id)],
+            },
+            format="json",
+        )
+        response = self.client.get(url)
+        self.assertEqual(response.json()["state"], TradeState.PENDING_APPROVAL)
+
+    def test_get_by_id_not_found(self):
+        url = reverse("trade-modify", kwargs={"trade_id": uuid.uuid4()})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 404)
+
+    def test_list_cached(self):
+        url = reverse("trade-list")
+        first = self.client.get(url, {"state": TradeState.DRAFT})
+        with self.assertNumQueries(0):
+            second = self.client.get(url, {"state": TradeState.DRAFT})
+        self.assertEqual(second.json(), first.json())
+
+    def test_list_cache_outdated_by_create(self):
+        url = reverse("trade-list")
+        self.client.get(url)
+        self.client.post(
+            url,
+            data={
+                "trading_entity": "new entity",
+                "counterparty": "test Counterpart",
+                "direction": TradeDirection.BUY,
+                "currency": "CAD",
+                "amount": 1000,
+            },
+            format="json",
+        )
+        trades = self.client.get(url).json()["trades"]
+        self.assertEqual(trades[0]["trading_entity"], "new entity")
+        self.assertEqual(len(trades), 2)
+
+    def test_list_cache_outdated_by_transition(self):
+        url = reverse("trade-list")
+        self.client.get(url, {"state": TradeState.DRAFT})
+        pending = self.client.get(url, {"state": TradeState.PENDING_APPROVAL})
+        self.assertEqual(pending.json()["trades"], [])
+        approved = self.client.get(url, {"state": TradeState.APPROVED})
+
+        self.client.patch(
+            reverse("trade-modify", kwargs={"trade_id": self.trade.id}),
+            data={"user_id": self.user.id, "action": Action.SUBMIT},
+            format="json",
+        )
+        response = self.client.get(url, {"state": TradeState.DRAFT})
+        self.assertEqual(response.json()["trades"], [])
+        response = self.client.get(url, {"state": TradeState.PENDING_APPROVAL})
+        self.assertEqual(response.json()["trades"][0]["id"], str(self.trade.id))
+        # Pages of the states the trade didn't go through are still cached
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {"state": TradeState.APPROVED})
+        self.assertEqual(response.json(), approved.json())
+
+    def test_list_cache_stats(self):
+        url = reverse("trade-list")
+        self.client.get(url, {"per_page": 5})
+        self.client.get(url, {"per_page": 5})
+        self.client.get(url, {"pagination": "cursor", "per_page": 5})
+        response = self.client.get(reverse("trade-list-cache-stats"))
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["hits"], 1)
+        self.assertEqual(data["misses"], 2)
+        self.assertAlmostEqual(data["hit_ratio"], 1 / 3)
+
+    def test_list_same_output_as_serializer(self):
+        self.trade.strike = 1.25
+        self.trade.trade_date = timezone.now()
+        self.trade.save()
+        Trade.objects.create(
+            trading_entity="other entity",
+            counterparty="test Counterpart",
+            direction=TradeDirection.BUY,
+            currency="EUR",
+            amount=1000.5,
+            underlying=["USD"],
+        )
+        expected = TradeSerializer(
+            Trade.objects.order_by("-created_at", "-id"), many=True
+        ).data
+        url = reverse("trade-list")
+        self.assertEqual(self.client.get(url).json()["trades"], expected)
+        response = self.client.get(url, {"pagination": "cursor"})
+        self.assertEqual(response.json()["trades"], expected)
+
+    def test_list_fields(self):
+        url = reverse("trade-list")
+        response = self.client.get(url, {"fields": "id,state, counterparty,amount"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()["trades"],
+            [
+                {
+                    "id": str(self.trade.id),
+                    "state": TradeState.DRAFT,
+                    "counterparty": "test Counterpart",
+                    "amount": "2000.00",
+                }
+            ],
+        )
+
+    def test_list_cursor_fields(self):
+        Trade.objects.create(
+            trading_entity="other entity",
+            counterparty="test Counterpart",
+            direction=TradeDirection.BUY,
+            currency="CAD",
+            amount=1000,
+        )
+        url = reverse("trade-list")
+        first_page = self.client.get(
+            url, {"pagination": "cursor", "per_page": 1, "fields": "id"}
+        ).json()
+        second_page = self.client.get(
+            url, {"cursor": first_page["next"], "per_page": 1, "fields": "id"}
+        ).json()
+        self.assertEqual(second_page["trades"], [{"id": str(self.trade.id)}])
+        self.assertIsNone(second_page["next"])
+
+    def test_list_unknown_fields(self):
+        url = reverse("trade-list")
+        response = self.client.get(url, {"fields": "id,password"})
+        self.assertEqual(response.status_code, 400)
+
     def test_create_success(self):
         url = reverse("trade-list")
         response = self.client.post(
@@ -70,6 +363,54 @@ class TradeViewTests(TestCase):
         )
         self.assertEqual(response.status_code, 400)
 
+    def test_bulk_create_success(self):
+        url = reverse("trade-bulk-create")
+        payload = {
+            "trading_entity": "bulk entity",
+            "counterparty": "test Counterpart",
+            "direction": TradeDirection.BUY,
+            "currency": "USD",
+            "amount": 100,
+            "underlying": ["CAD"],
+        }
+        response = self.client.post(url, data=[payload] * 3, format="json")
+        self.assertEqual(response.status_code, 201)
+        data = response.json()
+        self.assertEqual(data["created"], 3)
+        trades = Trade.objects.filter(trading_entity="bulk entity")
+        self.assertEqual(trades.count(), 3)
+        for trade in trades:
+            self.assertEqual(trade.state, TradeState.DRAFT)
+            self.assertEqual(trade.underlying, ["CAD", "USD"])
+
+    def test_bulk_create_partial_failure(self):
+        url = reverse("trade-bulk-create")
+        valid = {
+            "trading_entity": "bulk entity",
+            "counterparty": "test Counterpart",
+            "direction": TradeDirection.BUY,
+            "currency": "USD",
+            "amount": 100,
+        }
+        response = self.client.post(
+            url, data=[valid, {"invalid": "invalid"}, valid], format="json"
+        )
+        self.assertEqual(response.status_code, 207)
+        data = response.json()
+        self.assertEqual(data["created"], 2)
+        self.assertEqual(data["failed"], 1)
+        self.assertEqual(
+            [result["status"] for result in data["results"]],
+            ["created", "error", "created"],
+        )
+        self.assertIn("amount", data["results"][1]["details"])
+        self.assertEqual(Trade.objects.filter(trading_entity="bulk entity").count(), 2)
+
+    def test_bulk_create_not_a_list(self):
+        url = reverse("trade-bulk-create")
+        response = self.client.post(url, data={"invalid": "invalid"}, format="json")
+        self.assertEqual(response.status_code, 400)
+
     def test_modify_success_submit(self):
         url = reverse("trade-modify", kwargs={"trade_id": self.trade.id})
         response = self.client.patch(
@@ -163,6 +504,398 @@ class TradeViewTests(TestCase):
         self.assertEqual(self.trade.state, TradeState.EXECUTED)
         self.assertNotEquals(self.trade.delivery_date, None)
 
+    def test_modify_approve_single_update(self):
+        self.trade.state = TradeState.PENDING_APPROVAL
+        self.trade.save()
+        url = reverse("trade-modify", kwargs={"trade_id": self.trade.id})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(
+                url,
+                data={"user_id": self.user.id, "action": Action.APPROVE},
+                format="json",
+            )
+        self.assertEqual(response.status_code, 200)
+        statements = [
+            query["sql"].split()[0]
+            for query in queries
+            if "SAVEPOINT" not in query["sql"]
+        ]
+        if connection.vendor == "postgresql":
+            # Transition, log and state counters
+            self.assertEqual(statements, ["WITH", "INSERT", "INSERT"])
+        log = self.trade.log.get()
+        self.assertEqual(log.previous_state["state"], TradeState.PENDING_APPROVAL)
+        self.assertIsNone(log.previous_state["trade_date"])
+        self.assertEqual(log.new_state["state"], TradeState.APPROVED)
+        self.assertEqual(log.new_state["amount"], "2000.00")
+        self.assertEqual(sorted(log.diff), ["state", "trade_date", "updated_at"])
+
+    def test_modify_if_match(self):
+        url = reverse("trade-modify", kwargs={"trade_id": self.trade.id})
+        response = self.client.patch(
+            url,
+            data={"user_id": self.user.id, "action": Action.SUBMIT},
+            format="json",
+            HTTP_IF_MATCH=f'"{self.trade.version}"',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["ETag"], '"2"')
+        self.assertEqual(response.json()["version"], 2)
+
+    def test_modify_if_match_conflict(self):
+        url = reverse("trade-modify", kwargs={"trade_id": self.trade.id})
+        self.client.patch(
+            url,
+            data={"user_id": self.user.id, "action": Action.SUBMIT},
+            format="json",
+        )
+        response = self.client.patch(
+            url,
+            data={"user_id": self.user.id, "action": Action.APPROVE},
+            format="json",
+            HTTP_IF_MATCH='"1"',
+        )
+        self.assertEqual(response.status_code, 409)
+        self.trade.refresh_from_db()
+        self.assertEqual(self.trade.state, TradeState.PENDING_APPROVAL)
+        self.assertEqual(self.trade.log.count(), 1)
+
+    def test_modify_invalid_if_match(self):
+        url = reverse("trade-modify", kwargs={"trade_id": self.trade.id})
+        response = self.client.patch(
+            url,
+            data={"user_id": self.user.id, "action": Action.SUBMIT},
+            format="json",
+            HTTP_IF_MATCH="invalid",
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_modify_batch_approve(self):
+        self.trade.state = TradeState.PENDING_APPROVAL
+        self.trade.save()
+        other = Trade.objects.create(
+            trading_entity="test entity",
+            counterparty="test Counterpart",
+            direction=TradeDirection.BUY,
+            currency="CAD",
+            amount=2000,
+            state=TradeState.NEEDS_REAPPROVAL,
+        )
+        url = reverse("trade-modify-batch")
+        response = self.client.patch(
+            url,
+            data={
+                "user_id": self.user.id,
+                "action": Action.APPROVE,
+                "ids": [str(self.trade.id), str(other.id)],
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["updated"], 2)
+        for trade in (self.trade, other):
+            trade.refresh_from_db()
+            self.assertEqual(trade.state, TradeState.APPROVED)
+            self.assertNotEqual(trade.trade_date, None)
+            log = trade.log.get()
+            self.assertEqual(log.action, Action.APPROVE)
+            self.assertEqual(log.diff["state"]["new"], TradeState.APPROVED)
+
+    def test_modify_batch_partial_failure(self):
+        url = reverse("trade-modify-batch")
+        missing_id = str(uuid.uuid4())
+        response = self.client.patch(
+            url,
+            data={
+                "user_id": self.user.id,
+                "action": Action.SUBMIT,
+                "ids": [str(self.trade.id), missing_id, "invalid"],
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 207)
+        results = response.json()["results"]
+        self.assertEqual(
+            [result["status"] for result in results],
+            ["updated", "rejected", "rejected"],
+        )
+        self.trade.refresh_from_db()
+        self.assertEqual(self.trade.state, TradeState.PENDING_APPROVAL)
+
+    def test_modify_batch_invalid_action_for_state(self):
+        url = reverse("trade-modify-batch")
+        response = self.client.patch(
+            url,
+            data={
+                "user_id": self.user.id,
+                "action": Action.SEND,
+                "ids": [str(self.trade.id)],
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["results"][0]["status"], "rejected")
+        self.trade.refresh_from_db()
+        self.assertEqual(self.trade.state, TradeState.DRAFT)
+
+    def test_modify_batch_action_with_fields(self):
+        url = reverse("trade-modify-batch")
+        response = self.client.patch(
+            url,
+            data={
+                "user_id": self.user.id,
+                "action": Action.UPDATE,
+                "ids": [str(self.trade.id)],
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def run_workflow(self):
+        times = [timezone.now()]
+        TradeService.update_trade(self.trade.id, Action.SUBMIT, self.user.id, None)
+        times.append(timezone.now())
+        for amount in (100, 200, 300):
+            TradeService.update_trade(
+                self.trade.id, Action.UPDATE, self.user.id, {"amount": amount}
+            )
+            times.append(timezone.now())
+        TradeService.update_trade(self.trade.id, Action.APPROVE, self.user.id, None)
+        times.append(timezone.now())
+        return times
+
+    def assert_as_of(self, times):
+        url = reverse("trade-as-of", kwargs={"trade_id": self.trade.id})
+        expected = [
+            ("draft", "2000.00"),
+            ("pending approval", "2000.00"),
+            ("needs reapproval", "100.00"),
+            ("needs reapproval", "200.00"),
+            ("needs reapproval", "300.00"),
+            ("approved", "300.00"),
+        ]
+        for time, (state, amount) in zip(times, expected):
+            response = self.client.get(url, {"ts": time.isoformat()})
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            self.assertEqual(data["state"]["state"], state)
+            self.assertEqual(data["state"]["amount"], amount)
+
+    def test_as_of(self):
+        self.assert_as_of(self.run_workflow())
+
+    @override_settings(TRADE_LOG_COMPACT_STORAGE=True, TRADE_LOG_CHECKPOINT_INTERVAL=2)
+    def test_as_of_compact_storage(self):
+        times = self.run_workflow()
+        self.assertTrue(self.trade.log.filter(is_checkpoint=False).exists())
+        self.assert_as_of(times)
+
+    def test_as_of_before_creation(self):
+        url = reverse("trade-as-of", kwargs={"trade_id": self.trade.id})
+        response = self.client.get(url, {"ts": "2000-01-01T00:00:00Z"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_as_of_invalid_timestamp(self):
+        url = reverse("trade-as-of", kwargs={"trade_id": self.trade.id})
+        response = self.client.get(url, {"ts": "invalid"})
+        self.assertEqual(response.status_code, 400)
+
+    def assert_version_diffs(self, times):
+        url = reverse("trade-version-diff", kwargs={"trade_id": self.trade.id})
+        states = [
+            TradeLogService.get_trades_as_of([self.trade.id], time)[self.trade.id][
+                "state"
+            ]
+            for time in times
+        ]
+        for start in range(len(times)):
+            for end in range(len(times)):
+                response = self.client.get(
+                    url,
+                    {"from": times[start].isoformat(), "to": times[end].isoformat()},
+                )
+                self.assertEqual(response.status_code, 200)
+                data = response.json()
+                self.assertEqual(data["events"], abs(end - start))
+                self.assertEqual(
+                    data["diff"], snapshot_diff(states[start], states[end])
+                )
+
+    def test_version_diff(self):
+        self.assert_version_diffs(self.run_workflow())
+
+    @override_settings(TRADE_LOG_COMPACT_STORAGE=True, TRADE_LOG_CHECKPOINT_INTERVAL=2)
+    def test_version_diff_compact_storage(self):
+        times = self.run_workflow()
+        self.assertTrue(self.trade.log.filter(is_checkpoint=False).exists())
+        self.assert_version_diffs(times)
+
+    def test_version_diff_log_ids(self):
+        self.run_workflow()
+        logs = list(self.trade.log.order_by("timestamp", "id"))
+        url = reverse("trade-version-diff", kwargs={"trade_id": self.trade.id})
+
+        response = self.client.get(url, {"from": logs[0].id, "to": logs[-1].id})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["events"], len(logs) - 1)
+        self.assertEqual(
+            data["diff"], snapshot_diff(logs[0].new_state, logs[-1].new_state)
+        )
+        self.assertEqual(
+            data["diff"]["amount"], {"previous": "2000.00", "new": "300.00"}
+        )
+
+        # From the creation to the latest version by default
+        response = self.client.get(url, {"to": logs[-1].id})
+        self.assertEqual(response.json()["events"], len(logs))
+        response = self.client.get(url)
+        self.assertEqual(
+            response.json()["diff"],
+            snapshot_diff(logs[0].previous_state, logs[-1].new_state),
+        )
+
+        # Back to the first amount, the field is left out
+        TradeService.update_trade(
+            self.trade.id, Action.UPDATE, self.user.id, {"amount": 2000}
+        )
+        response = self.client.get(url, {"from": logs[0].id})
+        self.assertNotIn("amount", response.json()["diff"])
+
+    def test_version_diff_queries(self):
+        self.run_workflow()
+        logs = list(self.trade.log.order_by("timestamp", "id"))
+        url = reverse("trade-version-diff", kwargs={"trade_id": self.trade.id})
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url, {"from": logs[0].id, "to": logs[-1].id})
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn("previous_state", queries[1]["sql"])
+        self.assertNotIn("new_state", queries[1]["sql"])
+
+    def test_version_diff_not_found(self):
+        url = reverse("trade-version-diff", kwargs={"trade_id": uuid.uuid4()})
+        self.assertEqual(self.client.get(url).status_code, 404)
+        url = reverse("trade-version-diff", kwargs={"trade_id": self.trade.id})
+        response = self.client.get(url, {"from": str(uuid.uuid4())})
+        self.assertEqual(response.status_code, 404)
+
+    def test_version_diff_invalid_version(self):
+        url = reverse("trade-version-diff", kwargs={"trade_id": self.trade.id})
+        response = self.client.get(url, {"to": "yesterday"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json(),
+            {"error": "'to' must be a log id or an ISO 8601 date and time"},
+        )
+
+    def test_stats(self):
+        # The trade of setUp is created without the API
+        TradeStatsService.reconcile_state_counts()
+        trade = {
+            "trading_entity": "test entity",
+            "counterparty": "test Counterpart",
+            "direction": TradeDirection.SELL,
+            "currency": "CAD",
+            "amount": 2000,
+        }
+        self.client.post(reverse("trade-bulk-create"), [trade] * 3, format="json")
+        response = self.client.post(reverse("trade-list"), trade, format="json")
+        created_id = response.json()["id"]
+        self.run_workflow()
+        TradeService.update_trade(created_id, Action.SUBMIT, self.user.id, None)
+        TradeService.update_trade(created_id, Action.CANCEL, self.user.id, None)
+        self.client.patch(
+            reverse("trade-modify-batch"),
+            {
+                "user_id": self.user.id,
+                "action": Action.SUBMIT,
+                "ids": list(
+                    Trade.objects.filter(state=TradeState.DRAFT).values_list(
+                        "id", flat=True
+                    )[:2]
+                ),
+            },
+            format="json",
+        )
+        # A rejected transition doesn't count
+        response = self.client.patch(
+            reverse("trade-modify", kwargs={"trade_id": created_id}),
+            {"user_id": self.user.id, "action": Action.APPROVE},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("trade-stats"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(
+            response.json(),
+            {
+                "states": {
+                    "draft": 1,
+                    "pending approval": 2,
+                    "needs reapproval": 0,
+                    "approved": 1,
+                    "sent": 0,
+                    "executed": 0,
+                    "cancelled": 1,
+                },
+                "active": 4,
+                "total": 5,
+            },
+        )
+        self.assertEqual(TradeStatsService.reconcile_state_counts(), {})
+
+    def test_reconcile_trade_counts(self):
+        TradeStatsService.reconcile_state_counts()
+        Trade.objects.filter(id=self.trade.id).update(state=TradeState.SENT)
+        output = io.StringIO()
+        call_command("reconcile_trade_counts", stdout=output)
+        self.assertIn("draft: 1 -> 0", output.getvalue())
+        self.assertIn("sent: 0 -> 1", output.getvalue())
+        self.assertEqual(
+            self.client.get(reverse("trade-stats")).json()["states"]["sent"], 1
+        )
+        self.assertEqual(TradeStatsService.reconcile_state_counts(), {})
+
+    def test_as_of_batch(self):
+        times = self.run_workflow()
+        other = Trade.objects.create(
+            trading_entity="other entity",
+            counterparty="test Counterpart",
+            direction=TradeDirection.BUY,
+            currency="CAD",
+            amount=500,
+        )
+        missing_id = str(uuid.uuid4())
+        url = reverse("trade-as-of-batch")
+        response = self.client.post(
+            url,
+            data={
+                "ts": timezone.now().isoformat(),
+                "ids": [str(self.trade.id), str(other.id), missing_id],
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        trades = response.json()["trades"]
+        self.assertEqual(trades[0]["state"]["state"], TradeState.APPROVED)
+        self.assertEqual(trades[1]["state"]["trading_entity"], "other entity")
+        self.assertIsNone(trades[1]["log_id"])
+        self.assertEqual(
+            trades[2], {"id": missing_id, "error": "Trade not found at this time"}
+        )
+
+        response = self.client.post(
+            url,
+            data={"ts": times[1].isoformat(), "ids": [str(self.trade.id)]},
+            format="json",
+        )
+        self.assertEqual(
+            response.json()["trades"][0]["state"]["state"], TradeState.PENDING_APPROVAL
+        )
+
     def test_modify_trade_not_found(self):
         url = reverse("trade-modify", kwargs={"trade_id": uuid.uuid4()})
         response = self.client.patch(url, data={"user_id": self.user.id}, format="json")
@@ -204,3 +937,121 @@ class TradeViewTests(TestCase):
             format="json",
         )
         self.assertEqual(response.status_code, 400)
+
+    def test_diff(self):
+        trade = {
+            "trading_entity": "Trading entity",
+            "counterparty": "Counterpart",
+            "direction": "sell",
+            "currency": "CAD",
+            "amount": "10000.00",
+            "underlying": ["USD", "CAD"],
+            "trade_date": "2025-11-25T20:55:15Z",
+        }
+        response = self.client.post(
+            reverse("trade-highlight-changes"),
+            {
+                "trade1": trade,
+                "trade2": dict(
+                    trade,
+                    amount=10000,
+                    underlying=["CAD", "USD"],
+                    trade_date="2025-11-25T15:55:15-05:00",
+                    counterparty="Other counterpart",
+                ),
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(),
+            {
+                "counterparty": {
+                    "previous": "Counterpart",
+                    "new": "Other counterpart",
+                }
+            },
+        )
+
+    def test_diff_ignores_read_only_fields(self):
+        trade = TradeSerializer(self.trade).data
+        TradeService.update_trade(self.trade.id, Action.SUBMIT, self.user.id, None)
+        self.trade.refresh_from_db()
+        response = self.client.post(
+            reverse("trade-highlight-changes"),
+            {
+                "trade1": trade,
+                "trade2": dict(TradeSerializer(self.trade).data, trade_date=["x"]),
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {})
+
+    def test_diff_invalid_trade(self):
+        response = self.client.post(
+            reverse("trade-highlight-changes"),
+            {"trade1": {"amount": "a lot"}, "trade2": {}},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json(),
+            {
+                "error": "Invalid Trade 'trade1'",
+                "details": {"amount": "Must be a number"},
+            },
+        )
+
+    def test_diff_versions(self):
+        versions = [
+            {"amount": "100", "underlying": ["USD", "CAD"]},
+            {"amount": 100.0, "underlying": ["CAD", "USD"]},
+            {"amount": "200.5", "underlying": ["CAD"]},
+        ]
+        url = reverse("trade-highlight-changes")
+        response = self.client.post(url, {"versions": versions}, format="json")
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["mode"], "consecutive")
+        self.assertEqual(
+            data["diffs"],
+            [
+                {"from": 0, "to": 1, "diff": {}},
+                {
+                    "from": 1,
+                    "to": 2,
+                    "diff": {
+                        "amount": {"previous": "100.00", "new": "200.50"},
+                        "underlying": {"previous": ["CAD", "USD"], "new": ["CAD"]},
+                    },
+                },
+            ],
+        )
+
+        response = self.client.post(
+            url, {"versions": versions, "mode": "pairwise"}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(diff["from"], diff["to"]) for diff in response.json()["diffs"]],
+            [(0, 1), (0, 2), (1, 2)],
+        )
+
+    def test_diff_versions_invalid(self):
+        url = reverse("trade-highlight-changes")
+        for body in [
+            {"versions": [{}]},
+            {"versions": {"amount": 1}},
+            {"versions": [{}, {}], "mode": "everything"},
+            {"versions": [{}] * 101, "mode": "pairwise"},
+            {"versions": [{}, {"trade_date": "yesterday"}]},
+            {"versions": [{}, {"created_at": {}}]},
+            {"versions": [{}, {"trade_date": ["x"]}]},
+        ]:
+            response = self.client.post(url, body, format="json")
+            self.assertEqual(response.status_code, 400, body)
+        self.assertEqual(
+            response.json()["details"],
+            {"trade_date": "Must be an ISO 8601 date and time"},
+        )
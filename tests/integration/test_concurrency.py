@@ -0,0 +1,136 @@
+import threading
+import uuid
+from decimal import Decimal
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TransactionTestCase
+
+from trade_api.exceptions import BadRequestException, ConflictException
+from trade_api.models import Action, Trade, TradeDirection, TradeState
+from trade_api.services import TradeService, TradeStatsService
+
+
+@skipUnless(connection.vendor == "postgresql", "Needs concurrent connections")
+class ConcurrentTransitionTests(TransactionTestCase):
+    """Fires racing transitions at the same trade from several threads"""
+
+    threads = 16
+
+    def setUp(self):
+        self.trade = Trade.objects.create(
+            trading_entity="test entity",
+            counterparty="test Counterpart",
+            direction=TradeDirection.SELL,
+            currency="CAD",
+            amount=2000,
+            state=TradeState.PENDING_APPROVAL,
+        )
+
+    def race(self, calls):
+        barrier = threading.Barrier(len(calls))
+        outcomes = []
+
+        def run(call):
+            try:
+                barrier.wait()
+                call()
+                outcomes.append("success")
+            except ConflictException:
+                outcomes.append("conflict")
+            except BadRequestException:
+                # Started after the winner committed, so the transition is invalid
+                outcomes.append("rejected")
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=run, args=(call,)) for call in calls]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return outcomes
+
+    def transition(self, action, fields=None, expected_version=None):
+        return lambda: TradeService.update_trade(
+            self.trade.id, action, uuid.uuid4(), fields, expected_version
+        )
+
+    def test_racing_transitions_apply_once(self):
+        self.trade.state = TradeState.SENT
+        self.trade.save()
+        # Both actions lead to a terminal state, so only one can ever apply
+        outcomes = self.race(
+            [self.transition(Action.BOOK, {"strike": 1})] * (self.threads // 2)
+            + [self.transition(Action.CANCEL)] * (self.threads // 2)
+        )
+
+        self.assertEqual(outcomes.count("success"), 1)
+        self.assertEqual(
+            outcomes.count("conflict") + outcomes.count("rejected"), self.threads - 1
+        )
+        self.trade.refresh_from_db()
+        self.assertIn(self.trade.state, [TradeState.EXECUTED, TradeState.CANCELLED])
+        self.assertEqual(self.trade.version, 2)
+        log = self.trade.log.get()
+        self.assertEqual(log.new_state["state"], self.trade.state)
+
+    def test_racing_updates_with_if_match(self):
+        outcomes = self.race(
+            [
+                self.transition(Action.UPDATE, {"amount": i}, expected_version=1)
+                for i in range(self.threads)
+            ]
+        )
+
+        self.assertEqual(outcomes.count("success"), 1)
+        self.trade.refresh_from_db()
+        self.assertEqual(self.trade.version, 2)
+        self.assertEqual(self.trade.log.count(), 1)
+        self.assertEqual(
+            self.trade.amount, Decimal(self.trade.log.get().new_state["amount"])
+        )
+
+    def test_sequential_updates_with_latest_version(self):
+        for version in range(1, 6):
+            self.transition(Action.UPDATE, {"amount": version}, version)()
+        self.trade.refresh_from_db()
+        self.assertEqual(self.trade.version, 6)
+        self.assertEqual(self.trade.log.count(), 5)
+
+    def test_racing_transitions_keep_state_counts(self):
+        self.trade.state = TradeState.SENT
+        self.trade.save()
+        trades = [self.trade] + [
+            Trade.objects.create(
+                trading_entity="test entity",
+                counterparty="test Counterpart",
+                direction=TradeDirection.SELL,
+                currency="CAD",
+                amount=2000,
+                state=TradeState.SENT,
+            )
+            for _ in range(self.threads // 2 - 1)
+        ]
+        TradeStatsService.reconcile_state_counts()
+        # Both actions lead to a terminal state, each trade leaves 'sent' once
+        outcomes = self.race(
+            [
+                lambda trade=trade, action=action, fields=fields: (
+                    TradeService.update_trade(trade.id, action, uuid.uuid4(), fields)
+                )
+                for trade in trades
+                for action, fields in (
+                    (Action.BOOK, {"strike": 1}),
+                    (Action.CANCEL, None),
+                )
+            ]
+        )
+
+        self.assertEqual(outcomes.count("success"), len(trades))
+        counts = TradeStatsService.get_state_counts()["states"]
+        self.assertEqual(counts[TradeState.SENT], 0)
+        self.assertEqual(
+            counts[TradeState.EXECUTED] + counts[TradeState.CANCELLED], len(trades)
+        )
+        self.assertEqual(TradeStatsService.reconcile_state_counts(), {})
@@ -0,0 +1,28 @@
+from django.test import LiveServerTestCase
+
+from benchmarks import load_test
+
+
+class LoadTestTests(LiveServerTestCase):
+    """Short run of the load test against the live server"""
+
+    def test_run(self):
+        report = load_test.run(
+            self.live_server_url, concurrency=2, duration=1, mix=load_test.DEFAULT_MIX
+        )
+
+        self.assertEqual(report["totals"]["errors"], 0)
+        self.assertGreater(report["totals"]["workflows"], 0)
+        self.assertIn("POST /trades/", report["endpoints"])
+        self.assertIn("PATCH /trades/<id>/ (book)", report["endpoints"])
+        latency = report["endpoints"]["POST /trades/"]["latency_ms"]
+        self.assertLessEqual(latency["p50"], latency["p95"])
+        self.assertLessEqual(latency["p95"], latency["p99"])
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+
+        self.assertEqual(load_test.percentile(values, 0.5), 50)
+        self.assertEqual(load_test.percentile(values, 0.99), 99)
+        self.assertEqual(load_test.percentile([7], 0.95), 7)
+        self.assertIsNone(load_test.percentile([], 0.5))
@@ -0,0 +1,142 @@
+import json
+import uuid
+from datetime import timedelta
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from trade_api.models import Action, Trade, TradeDirection, TradeLog, TradeState
+from trade_api.services import TradeLogService, TradeService
+
+
+def plan_nodes(plan):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+@skipUnless(connection.vendor == "postgresql", "Query plans are PostgreSQL specific")
+class QueryPlanTests(TestCase):
+    """Asserts that the queries issued by the services are served by the indexes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        states = list(TradeState)
+        Trade.objects.bulk_create(
+            [
+                Trade(
+                    trading_entity=f"entity {i}",
+                    counterparty="counterparty",
+                    direction=TradeDirection.BUY,
+                    currency="CAD",
+                    amount=1000,
+                    underlying=["CAD"],
+                    state=states[i % len(states)],
+                )
+                for i in range(20000)
+            ],
+            batch_size=2000,
+        )
+        trades = list(Trade.objects.all()[:100])
+        cls.trade = trades[0]
+        cls.user_id = uuid.uuid4()
+        TradeLog.objects.bulk_create(
+            [
+                TradeLog(
+                    trade=trade,
+                    user_id=cls.user_id if i == 0 else uuid.uuid4(),
+                    action=Action.UPDATE if i else Action.CANCEL,
+                    previous_state={},
+                    new_state={},
+                )
+                for trade in trades
+                for i in range(100)
+            ],
+            batch_size=2000,
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE trade_api_trade")
+            cursor.execute("ANALYZE trade_api_tradelog")
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}")
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return list(plan_nodes(plan[0]["Plan"]))
+
+    def assertQueriesUseIndex(self, queries, index_name):
+        selects = [
+            query["sql"] for query in queries if query["sql"].startswith("SELECT")
+        ]
+        self.assertTrue(selects)
+        used = set()
+        for sql in selects:
+            nodes = self.explain(sql)
+            self.assertFalse(
+                [node for node in nodes if node["Node Type"] == "Seq Scan"],
+                f"Sequential scan in plan of: {sql}",
+            )
+            used.update(node.get("Index Name") for node in nodes)
+        self.assertIn(index_name, used)
+
+    def test_list_page_filtered_by_state(self):
+        with CaptureQueriesContext(connection) as queries:
+            TradeService.get_projected_page(page=50, state=TradeState.EXECUTED)
+        self.assertQueriesUseIndex(queries, "trade_state_created_idx")
+
+    def test_list_cursor(self):
+        with CaptureQueriesContext(connection) as queries:
+            TradeService.get_projected_by_cursor()
+        self.assertQueriesUseIndex(queries, "trade_created_idx")
+
+    def test_list_cursor_filtered_by_state(self):
+        next_cursor, _, _, _ = TradeService.get_projected_by_cursor(
+            state=TradeState.CANCELLED
+        )
+        with CaptureQueriesContext(connection) as queries:
+            TradeService.get_projected_by_cursor(
+                cursor=next_cursor, state=TradeState.CANCELLED
+            )
+        self.assertQueriesUseIndex(queries, "trade_state_created_idx")
+
+    def test_list_cursor_active_trades(self):
+        with CaptureQueriesContext(connection) as queries:
+            TradeService.get_projected_by_cursor(state="active")
+        self.assertQueriesUseIndex(queries, "trade_active_created_idx")
+
+    def test_trade_logs(self):
+        with CaptureQueriesContext(connection) as queries:
+            list(
+                TradeLogService.get_all_by_trade_id_ordered_by_timestamp(self.trade.id)
+            )
+        self.assertQueriesUseIndex(queries, "tradelog_trade_timestamp_idx")
+
+    def test_trades_as_of(self):
+        with CaptureQueriesContext(connection) as queries:
+            TradeLogService.get_trades_as_of([self.trade.id], timezone.now())
+        self.assertQueriesUseIndex(queries, "tradelog_trade_timestamp_idx")
+
+    def test_audit_by_user(self):
+        with CaptureQueriesContext(connection) as queries:
+            TradeLogService.get_audit_page(user_id=self.user_id)
+        self.assertQueriesUseIndex(queries, "tradelog_user_timestamp_idx")
+
+    def test_audit_by_action(self):
+        with CaptureQueriesContext(connection) as queries:
+            TradeLogService.get_audit_page(
+                action=Action.CANCEL, since=timezone.now() - timedelta(days=1)
+            )
+        self.assertQueriesUseIndex(queries, "tradelog_action_timestamp_idx")
+
+    def test_audit_time_window(self):
+        next_cursor, _, _ = TradeLogService.get_audit_page()
+        with CaptureQueriesContext(connection) as queries:
+            TradeLogService.get_audit_page(
+                cursor=next_cursor, since=timezone.now() - timedelta(days=1)
+            )
+        self.assertQueriesUseIndex(queries, "tradelog_timestamp_idx")
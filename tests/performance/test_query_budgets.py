@@ -0,0 +1,366 @@
+import time
+import tracemalloc
+import uuid
+from collections import namedtuple
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from trade_api.models import Action, Trade, TradeDirection, TradeState
+from trade_api.services import TradeService
+from trade_api.utils import BULK_CREATE_BATCH_SIZE
+
+Budget = namedtuple("Budget", ["queries", "peak_kb", "ms"])
+
+# Ceilings per endpoint: the query counts are the current ones, the allocation
+# peak (traced with tracemalloc) and the time leave room for slower machines
+BUDGETS = {
+    "list": Budget(queries=2, peak_kb=500, ms=250),
+    "list cursor": Budget(queries=1, peak_kb=500, ms=250),
+    "list cursor with total": Budget(queries=2, peak_kb=500, ms=250),
+    "get": Budget(queries=1, peak_kb=300, ms=250),
+    "create": Budget(queries=2, peak_kb=300, ms=250),
+    "bulk create": Budget(queries=4, peak_kb=1500, ms=500),
+    "submit": Budget(queries=5, peak_kb=300, ms=250),
+    "approve": Budget(queries=5, peak_kb=300, ms=250),
+    "send": Budget(queries=5, peak_kb=300, ms=250),
+    "book": Budget(queries=6, peak_kb=300, ms=250),
+    "update": Budget(queries=6, peak_kb=300, ms=250),
+    "cancel": Budget(queries=5, peak_kb=300, ms=250),
+    "batch": Budget(queries=6, peak_kb=2000, ms=500),
+    "logs": Budget(queries=2, peak_kb=4000, ms=500),
+    "logs page": Budget(queries=1, peak_kb=300, ms=250),
+    "logs page compact": Budget(queries=3, peak_kb=500, ms=250),
+    "logs diff only": Budget(queries=2, peak_kb=1500, ms=500),
+    "audit": Budget(queries=1, peak_kb=300, ms=250),
+    "csv": Budget(queries=3, peak_kb=2000, ms=500),
+    "export": Budget(queries=1, peak_kb=1500, ms=500),
+    "export logs gzip": Budget(queries=1, peak_kb=1000, ms=500),
+    "as of": Budget(queries=3, peak_kb=500, ms=250),
+    "as of batch": Budget(queries=4, peak_kb=1000, ms=500),
+    "stats": Budget(queries=1, peak_kb=300, ms=250),
+    "diff": Budget(queries=0, peak_kb=300, ms=250),
+    "version diff": Budget(queries=2, peak_kb=1000, ms=250),
+    "diff versions": Budget(queries=0, peak_kb=8000, ms=1000),
+}
+
+# Volumes of the seeded database
+TRADES = 300
+HISTORY_LENGTH = 200
+BATCH_SIZE = 100
+
+
+def make_trade(**fields):
+    return Trade(
+        trading_entity="Trading entity",
+        counterparty="Counterpart",
+        direction=TradeDirection.SELL,
+        currency="CAD",
+        amount=10000,
+        underlying=["USD", "EUR"],
+        **fields,
+    )
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+)
+class QueryBudgetTests(TestCase):
+    """Queries, allocations and time of each endpoint on a seeded database.
+
+    The caches are disabled so every request reaches the database. A query
+    more than the budget (e.g. one per row of a page or per log of a history)
+    fails the test, update the budget only for an intended change.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        Trade.objects.bulk_create([make_trade() for _ in range(TRADES)])
+        cls.user_id = uuid.uuid4()
+        cls.trade = make_trade()
+        cls.trade.save()
+        for index in range(HISTORY_LENGTH):
+            TradeService.update_trade(
+                cls.trade.id, Action.UPDATE, cls.user_id, {"amount": 10000 + index}
+            )
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def measure(self, name, request):
+        """Runs 'request' (returning a response) within the budget of 'name'"""
+        budget = BUDGETS[name]
+        tracemalloc.start()
+        try:
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                response = request()
+                if response.streaming:
+                    content = b"".join(response.streaming_content)
+                else:
+                    content = response.content
+                elapsed = (time.perf_counter() - start) * 1e3
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertLess(response.status_code, 300, content[:500])
+        self.assertLessEqual(
+            len(queries),
+            budget.queries,
+            f"{name}: {len(queries)} queries\n"
+            + "\n".join(query["sql"] for query in queries.captured_queries),
+        )
+        self.assertLessEqual(peak / 1024, budget.peak_kb, f"{name}: peak")
+        self.assertLessEqual(elapsed, budget.ms, f"{name}: time")
+        return response
+
+    def transition(self, name, state, action, fields=None):
+        trade = Trade.objects.create(
+            trading_entity="Trading entity",
+            counterparty="Counterpart",
+            direction=TradeDirection.SELL,
+            currency="CAD",
+            amount=10000,
+            state=state,
+        )
+        body = {"user_id": str(self.user_id), "action": action}
+        if fields:
+            body["fields"] = fields
+        self.measure(
+            name,
+            lambda: self.client.patch(
+                reverse("trade-modify", args=[trade.id]), body, format="json"
+            ),
+        )
+
+    def test_list(self):
+        url = reverse("trade-list")
+        self.measure("list", lambda: self.client.get(url, {"page": 5}))
+        self.measure(
+            "list",
+            lambda: self.client.get(
+                url, {"page": 2, "per_page": 100, "state": "draft"}
+            ),
+        )
+
+    def test_list_cursor(self):
+        url = reverse("trade-list")
+        response = self.measure(
+            "list cursor", lambda: self.client.get(url, {"cursor": ""})
+        )
+        cursor = response.json()["next"]
+        self.measure("list cursor", lambda: self.client.get(url, {"cursor": cursor}))
+        self.measure(
+            "list cursor with total",
+            lambda: self.client.get(url, {"cursor": cursor, "with_total": "true"}),
+        )
+
+    def test_get(self):
+        url = reverse("trade-modify", args=[self.trade.id])
+        self.measure("get", lambda: self.client.get(url))
+
+    def test_create(self):
+        body = {
+            "trading_entity": "Trading entity",
+            "counterparty": "Counterpart",
+            "direction": "sell",
+            "currency": "CAD",
+            "amount": 10000,
+            "underlying": ["USD"],
+        }
+        self.measure(
+            "create",
+            lambda: self.client.post(reverse("trade-list"), body, format="json"),
+        )
+
+    def test_bulk_create(self):
+        body = [
+            {
+                "trading_entity": "Trading entity",
+                "counterparty": "Counterpart",
+                "direction": "sell",
+                "currency": "CAD",
+                "amount": 10000 + index,
+                "underlying": ["USD"],
+            }
+            for index in range(BATCH_SIZE)
+        ]
+        self.measure(
+            "bulk create",
+            lambda: self.client.post(reverse("trade-bulk-create"), body, format="json"),
+        )
+
+    def test_bulk_create_queries_per_batch(self):
+        # One INSERT per batch of trades, the other queries don't grow with them
+        for batches in (1, 3):
+            body = [
+                {
+                    "trading_entity": "Trading entity",
+                    "counterparty": "Counterpart",
+                    "direction": "sell",
+                    "currency": "CAD",
+                    "amount": 10000 + index,
+                }
+                for index in range(batches * BULK_CREATE_BATCH_SIZE)
+            ]
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(
+                    reverse("trade-bulk-create"), body, format="json"
+                )
+            self.assertEqual(response.status_code, 201)
+            inserts = [
+                query
+                for query in queries.captured_queries
+                if query["sql"].startswith('INSERT INTO "trade_api_trade" ')
+            ]
+            self.assertEqual(len(inserts), batches)
+            self.assertEqual(len(queries), BUDGETS["bulk create"].queries - 1 + batches)
+
+    def test_transitions(self):
+        self.transition("submit", TradeState.DRAFT, Action.SUBMIT)
+        self.transition("approve", TradeState.PENDING_APPROVAL, Action.APPROVE)
+        self.transition("send", TradeState.APPROVED, Action.SEND)
+        self.transition("book", TradeState.SENT, Action.BOOK, {"strike": 1.25})
+        self.transition("update", TradeState.DRAFT, Action.UPDATE, {"amount": 12000})
+        self.transition("cancel", TradeState.APPROVED, Action.CANCEL)
+
+    def test_batch(self):
+        trades = Trade.objects.bulk_create([make_trade() for _ in range(BATCH_SIZE)])
+        body = {
+            "user_id": str(self.user_id),
+            "action": Action.SUBMIT,
+            "ids": [str(trade.id) for trade in trades],
+        }
+        self.measure(
+            "batch",
+            lambda: self.client.patch(
+                reverse("trade-modify-batch"), body, format="json"
+            ),
+        )
+
+    def test_logs(self):
+        url = reverse("trade-log-by-trade", args=[self.trade.id])
+        response = self.measure("logs", lambda: self.client.get(url))
+        self.assertEqual(len(response.json()), HISTORY_LENGTH)
+
+    def test_logs_pages(self):
+        url = reverse("trade-log-by-trade", args=[self.trade.id])
+        response = self.measure(
+            "logs page", lambda: self.client.get(url, {"pagination": "cursor"})
+        )
+        cursor = response.json()["next"]
+        self.measure("logs page", lambda: self.client.get(url, {"cursor": cursor}))
+        self.measure(
+            "logs diff only", lambda: self.client.get(url, {"diff_only": "true"})
+        )
+
+    def test_audit(self):
+        url = reverse("trade-log-list")
+        response = self.measure("audit", lambda: self.client.get(url))
+        cursor = response.json()["next"]
+        self.measure(
+            "audit",
+            lambda: self.client.get(
+                url, {"cursor": cursor, "user_id": self.user_id, "action": "update"}
+            ),
+        )
+
+    @override_settings(TRADE_LOG_COMPACT_STORAGE=True)
+    def test_logs_compact(self):
+        trade = make_trade()
+        trade.save()
+        for index in range(HISTORY_LENGTH):
+            TradeService.update_trade(
+                trade.id, Action.UPDATE, self.user_id, {"amount": 10000 + index}
+            )
+        url = reverse("trade-log-by-trade", args=[trade.id])
+        self.measure("logs", lambda: self.client.get(url))
+        response = self.measure(
+            "logs page compact", lambda: self.client.get(url, {"pagination": "cursor"})
+        )
+        cursor = response.json()["next"]
+        self.measure(
+            "logs page compact", lambda: self.client.get(url, {"cursor": cursor})
+        )
+        url = reverse("trade-log-csv", args=[trade.id])
+        self.measure("csv", lambda: self.client.get(url))
+
+    def test_csv(self):
+        url = reverse("trade-log-csv", args=[self.trade.id])
+        self.measure("csv", lambda: self.client.get(url))
+
+    def test_export(self):
+        self.measure("export", lambda: self.client.get(reverse("trade-bulk-export")))
+        self.measure(
+            "export logs gzip",
+            lambda: self.client.get(
+                reverse("trade-log-bulk-export"), {"output": "csv", "gzip": "true"}
+            ),
+        )
+
+    def test_as_of(self):
+        timestamp = timezone.now().isoformat()
+        url = reverse("trade-as-of", args=[self.trade.id])
+        self.measure("as of", lambda: self.client.get(url, {"ts": timestamp}))
+
+    def test_as_of_batch(self):
+        ids = [str(self.trade.id)] + [
+            str(id) for id in Trade.objects.values_list("id", flat=True)[:BATCH_SIZE]
+        ]
+        body = {"ids": ids, "ts": timezone.now().isoformat()}
+        self.measure(
+            "as of batch",
+            lambda: self.client.post(reverse("trade-as-of-batch"), body, format="json"),
+        )
+
+    def test_stats(self):
+        self.measure("stats", lambda: self.client.get(reverse("trade-stats")))
+
+    def test_diff(self):
+        trade = {
+            "trading_entity": "Trading entity",
+            "counterparty": "Counterpart",
+            "direction": "sell",
+            "currency": "CAD",
+            "amount": 10000,
+            "underlying": ["USD"],
+        }
+        body = {"trade1": trade, "trade2": dict(trade, amount=12000)}
+        self.measure(
+            "diff",
+            lambda: self.client.post(
+                reverse("trade-highlight-changes"), body, format="json"
+            ),
+        )
+
+    def test_version_diff(self):
+        logs = list(self.trade.log.order_by("timestamp", "id"))
+        url = reverse("trade-version-diff", args=[self.trade.id])
+        self.measure(
+            "version diff",
+            lambda: self.client.get(url, {"from": logs[0].id, "to": logs[-1].id}),
+        )
+        self.measure("version diff", lambda: self.client.get(url))
+
+    def test_diff_versions(self):
+        versions = [
+            {
+                "amount": 10000 + index // 2,
+                "underlying": ["USD", "EUR"] if index % 2 else ["EUR", "USD"],
+                "trade_date": timezone.now().isoformat(),
+            }
+            for index in range(1000)
+        ]
+        self.measure(
+            "diff versions",
+            lambda: self.client.post(
+                reverse("trade-highlight-changes"),
+                {"versions": versions},
+                format="json",
+            ),
+        )
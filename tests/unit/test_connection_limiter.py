@@ -0,0 +1,110 @@
+import gc
+import threading
+import unittest
+
+from trade_api.backends.postgresql.base import ConnectionLimiter
+
+
+class TestConnectionLimiter(unittest.TestCase):
+    def test_limits_open_connections(self):
+        limiter = ConnectionLimiter(max_size=2, timeout=0.01)
+        self.assertTrue(limiter.acquire())
+        self.assertTrue(limiter.acquire())
+        self.assertFalse(limiter.acquire())
+
+        stats = limiter.stats()
+        self.assertEqual(stats["open"], 2)
+        self.assertEqual(stats["waits"], 1)
+        self.assertEqual(stats["timeouts"], 1)
+
+    def test_release(self):
+        limiter = ConnectionLimiter(max_size=1, timeout=0.01)
+        self.assertTrue(limiter.acquire())
+        limiter.release()
+        self.assertTrue(limiter.acquire())
+
+        stats = limiter.stats()
+        self.assertEqual(stats["open"], 1)
+        self.assertEqual(stats["opened"], 2)
+        self.assertEqual(stats["closed"], 1)
+
+    def test_reclaims_connections_of_ended_threads(self):
+        class Connection:
+            closed = False
+
+            def close(self):
+                self.closed = True
+
+        limiter = ConnectionLimiter(max_size=1, timeout=0.01)
+        connection = Connection()
+
+        def open_connection():
+            self.assertTrue(limiter.acquire())
+            limiter.track(connection)
+
+        thread = threading.Thread(target=open_connection)
+        thread.start()
+        thread.join()
+
+        self.assertTrue(limiter.acquire())
+        self.assertTrue(connection.closed)
+        stats = limiter.stats()
+        self.assertEqual(stats["open"], 1)
+        self.assertEqual(stats["reclaimed"], 1)
+        self.assertEqual(stats["waits"], 0)
+
+    def test_collected_while_holding_the_lock(self):
+        class Connection:
+            def __init__(self):
+                # Cycle only freed by the garbage collector, as for the wrappers
+                self.cycle = self
+
+        limiter = ConnectionLimiter(max_size=1, timeout=0.01)
+        self.assertTrue(limiter.acquire())
+        limiter.track(Connection())
+
+        def collect():
+            with limiter._lock:
+                gc.collect()
+
+        thread = threading.Thread(target=collect, daemon=True)
+        thread.start()
+        thread.join(timeout=5)
+        self.assertFalse(thread.is_alive(), "Finalizer deadlocked on the lock")
+
+        self.assertEqual(limiter.stats()["open"], 0)
+        self.assertTrue(limiter.acquire())
+
+    def test_release_once(self):
+        class Connection:
+            pass
+
+        limiter = ConnectionLimiter(max_size=1, timeout=0.01)
+        self.assertTrue(limiter.acquire())
+        connection = Connection()
+        release = limiter.track(connection)
+        release()
+        release()
+        del connection
+        gc.collect()
+
+        stats = limiter.stats()
+        self.assertEqual(stats["open"], 0)
+        self.assertEqual(stats["closed"], 1)
+
+    def test_waiter_gets_slot_of_collected_connection(self):
+        class Connection:
+            def __init__(self):
+                self.cycle = self
+
+        limiter = ConnectionLimiter(max_size=1, timeout=5)
+        self.assertTrue(limiter.acquire())
+        connection = Connection()
+        limiter.track(connection)
+
+        timer = threading.Timer(0.1, lambda: gc.collect())
+        del connection
+        timer.start()
+        self.assertTrue(limiter.acquire())
+        timer.join()
+        self.assertEqual(limiter.stats()["waits"], 1)
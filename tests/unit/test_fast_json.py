@@ -0,0 +1,111 @@
+import io
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest import mock
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ErrorDetail, ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict
+
+from trade_api.parsers import FastJSONParser, fast_json_parser
+from trade_api.renderers import FastJSONRenderer, fast_json_renderer
+
+PAYLOAD = {
+    "trades": [
+        ReturnDict(
+            {
+                "id": uuid.UUID("756e561a-0d43-4c94-b0bb-7283bfd49eab"),
+                "amount": Decimal("10000.00"),
+                "underlying": ["USD", "CAD"],
+                "trade_date": datetime(
+                    2025, 11, 25, 20, 55, 15, 113853, tzinfo=timezone.utc
+                ),
+                "strike": None,
+                "counterparty": "Contrepartie\u2028é",
+            },
+            serializer=None,
+        )
+    ],
+    "error": ErrorDetail("Invalid", code="invalid"),
+    "message": gettext_lazy("Not found."),
+    "page": 1,
+}
+
+
+class TestFastJSONRenderer(SimpleTestCase):
+    def test_same_output_as_json_renderer(self):
+        self.assertEqual(
+            FastJSONRenderer().render(PAYLOAD), JSONRenderer().render(PAYLOAD)
+        )
+
+    def test_indent(self):
+        media_type = "application/json; indent=4"
+        self.assertEqual(
+            FastJSONRenderer().render(PAYLOAD, media_type),
+            JSONRenderer().render(PAYLOAD, media_type),
+        )
+
+    def test_integers_beyond_64_bits(self):
+        data = {"amount": 123456789012345678901234, "page": -(2**64)}
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_none(self):
+        self.assertEqual(FastJSONRenderer().render(None), b"")
+
+    def test_without_orjson(self):
+        with mock.patch.object(fast_json_renderer, "orjson", None):
+            self.assertEqual(
+                FastJSONRenderer().render(PAYLOAD), JSONRenderer().render(PAYLOAD)
+            )
+
+
+class TestFastJSONParser(SimpleTestCase):
+    BODY = b'{"user_id": "26920541", "fields": {"amount": 10.5, "underlying": ["USD"]}}'
+
+    def test_same_output_as_json_parser(self):
+        self.assertEqual(
+            FastJSONParser().parse(io.BytesIO(self.BODY)),
+            JSONParser().parse(io.BytesIO(self.BODY)),
+        )
+
+    def test_integers_beyond_64_bits(self):
+        body = (
+            b'{"fields": {"amount": 123456789012345678901234, '
+            b'"strike": -9223372036854775809, "notional": 0.12345678901234567890}}'
+        )
+        parsed = FastJSONParser().parse(io.BytesIO(body))
+        self.assertEqual(parsed, JSONParser().parse(io.BytesIO(body)))
+        self.assertEqual(parsed["fields"]["amount"], 123456789012345678901234)
+        self.assertIsInstance(parsed["fields"]["strike"], int)
+
+    def test_integers_beyond_64_bits_rejects_nan(self):
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(
+                io.BytesIO(b'{"amount": 123456789012345678901234, "strike": NaN}')
+            )
+
+    def test_invalid_json(self):
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b'{"action": '))
+
+    def test_nan_rejected(self):
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b'{"amount": NaN}'))
+
+    def test_other_encoding(self):
+        body = '{"counterparty": "é"}'.encode("latin-1")
+        self.assertEqual(
+            FastJSONParser().parse(io.BytesIO(body), None, {"encoding": "latin-1"}),
+            {"counterparty": "é"},
+        )
+
+    def test_without_orjson(self):
+        with mock.patch.object(fast_json_parser, "orjson", None):
+            self.assertEqual(
+                FastJSONParser().parse(io.BytesIO(self.BODY)),
+                JSONParser().parse(io.BytesIO(self.BODY)),
+            )
@@ -0,0 +1,43 @@
+import importlib
+import unittest
+
+migration = importlib.import_module(
+    "trade_api.migrations.0008_typed_trade_log_snapshots"
+)
+
+
+class TestTypedSnapshotMigration(unittest.TestCase):
+    def test_convert_legacy_snapshot(self):
+        legacy = {
+            "id": "756e561a-0d43-4c94-b0bb-7283bfd49eab",
+            "amount": "10000",
+            "strike": "None",
+            "underlying": "['USD', 'CAD']",
+            "trade_date": "2025-11-25 20:55:15.113853+00:00",
+            "state": "approved",
+        }
+        self.assertEqual(
+            migration.convert_snapshot(legacy),
+            {
+                "id": "756e561a-0d43-4c94-b0bb-7283bfd49eab",
+                "amount": "10000.00",
+                "strike": None,
+                "underlying": ["USD", "CAD"],
+                "trade_date": "2025-11-25T20:55:15.113853Z",
+                "state": "approved",
+            },
+        )
+
+    def test_convert_is_idempotent(self):
+        typed = {
+            "amount": "10000.00",
+            "underlying": ["USD"],
+            "trade_date": "2025-11-25T20:55:15.113853Z",
+        }
+        self.assertEqual(migration.convert_snapshot(typed), typed)
+
+    def test_unparsable_values_kept(self):
+        self.assertEqual(
+            migration.convert_snapshot({"amount": "abc", "underlying": "USD"}),
+            {"amount": "abc", "underlying": "USD"},
+        )
@@ -0,0 +1,30 @@
+import unittest
+import uuid
+from datetime import datetime, timezone
+
+from trade_api.utils import decode_cursor, encode_cursor
+
+
+class TestCursor(unittest.TestCase):
+    def test_round_trip(self):
+        created_at = datetime(2025, 11, 25, 20, 53, 36, 615607, tzinfo=timezone.utc)
+        id = uuid.uuid4()
+        self.assertEqual(
+            decode_cursor(encode_cursor(created_at, id)), (created_at, id, False)
+        )
+
+    def test_round_trip_backwards(self):
+        created_at = datetime(2025, 11, 25, tzinfo=timezone.utc)
+        id = uuid.uuid4()
+        self.assertEqual(
+            decode_cursor(encode_cursor(created_at, id, backwards=True)),
+            (created_at, id, True),
+        )
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(ValueError):
+            decode_cursor("invalid")
+
+    def test_invalid_payload(self):
+        with self.assertRaises(ValueError):
+            decode_cursor("eyJpZCI6IjEyMyJ9")
@@ -0,0 +1,51 @@
+import csv
+import gzip
+import io
+import json
+
+from django.test import SimpleTestCase
+
+from trade_api.utils import chunked, csv_stream, gzip_stream, ndjson_stream
+
+
+class TestExportStream(SimpleTestCase):
+    def setUp(self):
+        self.batches = [
+            [{"id": 1, "underlying": ["USD", "CAD"], "strike": None}],
+            [
+                {"id": 2, "underlying": [], "strike": "1.35"},
+                {"id": 3, "underlying": ["EUR"], "strike": None},
+            ],
+        ]
+
+    def test_chunked(self):
+        self.assertEqual(list(chunked(range(5), 2)), [[0, 1], [2, 3], [4]])
+        self.assertEqual(list(chunked([], 2)), [])
+
+    def test_ndjson_chunk_per_batch(self):
+        chunks = list(ndjson_stream(self.batches, lambda row: json.dumps(row).encode()))
+        self.assertEqual(len(chunks), 2)
+        rows = [json.loads(line) for line in b"".join(chunks).splitlines()]
+        self.assertEqual(rows, self.batches[0] + self.batches[1])
+
+    def test_csv_header_and_json_values(self):
+        content = b"".join(csv_stream(self.batches, ("id", "underlying", "strike")))
+        rows = list(csv.reader(io.StringIO(content.decode("utf-8"))))
+        self.assertEqual(
+            rows,
+            [
+                ["id", "underlying", "strike"],
+                ["1", '["USD","CAD"]', ""],
+                ["2", "[]", "1.35"],
+                ["3", '["EUR"]', ""],
+            ],
+        )
+
+    def test_gzip_round_trip(self):
+        chunks = [b"a" * 100000, b"", b"b" * 10]
+        self.assertEqual(
+            gzip.decompress(b"".join(gzip_stream(iter(chunks)))), b"".join(chunks)
+        )
+
+    def test_gzip_empty(self):
+        self.assertEqual(gzip.decompress(b"".join(gzip_stream(iter([])))), b"")
@@ -0,0 +1,75 @@
+import unittest
+
+from trade_api.utils.metrics import (
+    Histogram,
+    RequestMetrics,
+    current_request,
+    label_request,
+    server_timing,
+    timed,
+)
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.metrics = RequestMetrics()
+        self.token = current_request.set(self.metrics)
+
+    def tearDown(self):
+        current_request.reset(self.token)
+
+    def test_timed(self):
+        with timed("serializer"):
+            # Nested in the same stage, not counted twice
+            with timed("serializer"):
+                pass
+        timed("diff")(lambda: None)()
+
+        self.assertEqual(set(self.metrics.stages), {"serializer", "diff"})
+        self.assertGreater(self.metrics.stages["serializer"], 0)
+
+    def test_label_request(self):
+        label_request(action="submit")
+        self.assertEqual(self.metrics.labels, {"action": "submit"})
+
+    def test_outside_of_a_request(self):
+        current_request.set(None)
+        with timed("serializer"):
+            pass
+        label_request(action="submit")
+        self.assertEqual(self.metrics.stages, {})
+        self.assertEqual(self.metrics.labels, {})
+
+    def test_server_timing(self):
+        self.metrics.queries = 3
+        self.metrics.db_time = 0.002
+        self.metrics.stages["render"] = 0.0005
+
+        self.assertEqual(
+            server_timing(self.metrics, 0.01),
+            'total;dur=10.000, db;dur=2.000;desc="3 queries", render;dur=0.500',
+        )
+
+    def test_histogram(self):
+        histogram = Histogram("requests", "Requests.", ("route",), (0.1, 1))
+        histogram.observe(0.05, route="trade-list")
+        histogram.observe(0.5, route="trade-list")
+        histogram.observe(2, route="trade-list")
+
+        self.assertEqual(
+            histogram.collect(),
+            [
+                "# HELP requests Requests.",
+                "# TYPE requests histogram",
+                'requests_bucket{route="trade-list",le="0.1"} 1',
+                'requests_bucket{route="trade-list",le="1.0"} 2',
+                'requests_bucket{route="trade-list",le="+Inf"} 3',
+                'requests_sum{route="trade-list"} 2.55',
+                'requests_count{route="trade-list"} 3',
+            ],
+        )
+
+    def test_histogram_escapes_labels(self):
+        histogram = Histogram("requests", "Requests.", ("route",), ())
+        histogram.observe(1, route='a"b\\c')
+        self.assertIn('requests_count{route="a\\"b\\\\c"} 1', histogram.collect())
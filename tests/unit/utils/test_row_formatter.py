@@ -0,0 +1,72 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+from django.utils import timezone as django_timezone
+
+from trade_api.models import Trade
+from trade_api.serializers import TradeSerializer
+from trade_api.utils import row_formatter
+
+
+class TestRowFormatter(SimpleTestCase):
+    def setUp(self):
+        self.trade = Trade(
+            id=uuid.UUID("756e561a-0d43-4c94-b0bb-7283bfd49eab"),
+            trading_entity="Trading entity",
+            counterparty="Counterpart",
+            direction="sell",
+            currency="CAD",
+            amount=Decimal("10000.5"),
+            underlying=["USD", "CAD"],
+            trade_date=datetime(2025, 11, 25, 20, 55, 15, 113853, tzinfo=timezone.utc),
+            value_date=datetime(
+                2025, 11, 25, 16, 0, tzinfo=timezone(timedelta(hours=-5))
+            ),
+            strike=Decimal("1.35"),
+            state="approved",
+            version=3,
+            created_at=datetime(2025, 11, 24, tzinfo=timezone.utc),
+            updated_at=datetime(2025, 11, 25, 21, 0, 0, 1, tzinfo=timezone.utc),
+        )
+
+    def row(self, columns):
+        return tuple(getattr(self.trade, column) for column in columns)
+
+    def test_same_output_as_serializer(self):
+        columns, format_rows = row_formatter(TradeSerializer)
+        self.assertEqual(
+            format_rows([self.row(columns)]), [TradeSerializer(self.trade).data]
+        )
+
+    def test_same_output_with_current_timezone(self):
+        columns, format_rows = row_formatter(TradeSerializer)
+        with django_timezone.override("America/Toronto"):
+            self.assertEqual(
+                format_rows([self.row(columns)]), [TradeSerializer(self.trade).data]
+            )
+
+    def test_same_output_as_serializer_with_nulls(self):
+        self.trade.strike = None
+        self.trade.trade_date = None
+        columns, format_rows = row_formatter(TradeSerializer)
+        self.assertEqual(
+            format_rows([self.row(columns)]), [TradeSerializer(self.trade).data]
+        )
+
+    def test_fields(self):
+        fields = ("id", "state", "counterparty", "amount")
+        columns, format_rows = row_formatter(TradeSerializer, fields)
+        self.assertEqual(columns, fields)
+        self.assertEqual(
+            format_rows([self.row(columns) + ("extra column",)]),
+            [
+                {
+                    "id": "756e561a-0d43-4c94-b0bb-7283bfd49eab",
+                    "state": "approved",
+                    "counterparty": "Counterpart",
+                    "amount": "10000.50",
+                }
+            ],
+        )
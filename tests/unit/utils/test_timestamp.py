@@ -0,0 +1,33 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from trade_api.exceptions import BadRequestException
+from trade_api.utils import get_timestamp
+
+
+class TestGetTimestamp(unittest.TestCase):
+    def test_aware(self):
+        self.assertEqual(
+            get_timestamp("2025-11-25T20:55:15+02:00"),
+            datetime(2025, 11, 25, 20, 55, 15, tzinfo=timezone(timedelta(hours=2))),
+        )
+
+    def test_naive_is_utc(self):
+        self.assertEqual(
+            get_timestamp("2025-11-25T20:55:15"),
+            datetime(2025, 11, 25, 20, 55, 15, tzinfo=timezone.utc),
+        )
+
+    def test_missing(self):
+        with self.assertRaises(BadRequestException) as context:
+            get_timestamp(None, "since")
+        self.assertEqual(context.exception.detail, {"error": "No 'since' provided"})
+
+    def test_invalid(self):
+        for value in ("yesterday", "2025-13-45T00:00:00"):
+            with self.assertRaises(BadRequestException) as context:
+                get_timestamp(value, "until")
+            self.assertEqual(
+                context.exception.detail,
+                {"error": "'until' must be an ISO 8601 date and time"},
+            )
@@ -1,31 +1,42 @@
 import unittest
-from datetime import date
 
-from trade_api.utils import trade_diff
+from trade_api.utils import trade_diffs, version_pairs
 
 
-class TestTradeDiff(unittest.TestCase):
-    def test_no_difference(self):
-        trade1 = {"id": 1, "amount": 100, "trade_date": date(2025, 11, 25)}
-        trade2 = {"id": 1, "amount": 100, "trade_date": date(2025, 11, 25)}
-        self.assertEqual(trade_diff(trade1, trade2), {})
+class TestTradeDiffs(unittest.TestCase):
+    def setUp(self):
+        self.snapshots = [
+            {"amount": "100.00", "underlying": ["USD", "CAD"]},
+            {"amount": "100.00", "underlying": ["CAD", "USD"]},
+            {"amount": "200.00", "underlying": ["CAD"]},
+        ]
 
-    def test_difference_in_multiple_fields(self):
-        trade1 = {
-            "id": 1,
-            "amount": 100,
-            "type": "buy",
-            "trade_date": date(2025, 11, 25),
-        }
-        trade2 = {
-            "id": 2,
-            "amount": 200,
-            "type": "sell",
-            "trade_date": date(2025, 11, 25),
-        }
-        expected = {
-            "id": {"previous": "1", "new": "2"},
-            "amount": {"previous": "100", "new": "200"},
-            "type": {"previous": "buy", "new": "sell"},
-        }
-        self.assertEqual(trade_diff(trade1, trade2), expected)
+    def test_version_pairs(self):
+        self.assertEqual(version_pairs(3), [(0, 1), (1, 2)])
+        self.assertEqual(version_pairs(3, "pairwise"), [(0, 1), (0, 2), (1, 2)])
+        self.assertEqual(version_pairs(1), [])
+
+    def test_consecutive(self):
+        self.assertEqual(
+            trade_diffs(self.snapshots),
+            [
+                {"from": 0, "to": 1, "diff": {}},
+                {
+                    "from": 1,
+                    "to": 2,
+                    "diff": {
+                        "amount": {"previous": "100.00", "new": "200.00"},
+                        "underlying": {"previous": ["CAD", "USD"], "new": ["CAD"]},
+                    },
+                },
+            ],
+        )
+
+    def test_pairwise(self):
+        diffs = trade_diffs(self.snapshots, "pairwise")
+        self.assertEqual(
+            [(diff["from"], diff["to"]) for diff in diffs], [(0, 1), (0, 2), (1, 2)]
+        )
+        self.assertEqual(
+            diffs[1]["diff"]["underlying"], {"previous": ["USD", "CAD"], "new": ["CAD"]}
+        )
@@ -0,0 +1,170 @@
+import unittest
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+
+from trade_api.models import Trade
+from trade_api.utils import compose_diffs, parse_snapshot, snapshot_diff, take_snapshot
+
+
+class TestTakeSnapshot(SimpleTestCase):
+    def setUp(self):
+        self.trade = Trade(
+            id=uuid.UUID("756e561a-0d43-4c94-b0bb-7283bfd49eab"),
+            trading_entity="Trading entity",
+            counterparty="Counterpart",
+            direction="sell",
+            currency="CAD",
+            amount=Decimal("10000.00"),
+            underlying=["USD", "CAD"],
+            trade_date=datetime(2025, 11, 25, 20, 55, 15, 113853, tzinfo=timezone.utc),
+            state="approved",
+        )
+
+    def test_typed_values(self):
+        snapshot = take_snapshot(self.trade)
+        self.assertEqual(snapshot["id"], "756e561a-0d43-4c94-b0bb-7283bfd49eab")
+        self.assertEqual(snapshot["amount"], "10000.00")
+        self.assertEqual(snapshot["underlying"], ["USD", "CAD"])
+        self.assertEqual(snapshot["trade_date"], "2025-11-25T20:55:15.113853Z")
+        self.assertIsNone(snapshot["strike"])
+        self.assertNotIn("version", snapshot)
+
+    def test_normalizes_raw_values(self):
+        self.trade.amount = 0
+        self.trade.strike = "1.5"
+        self.trade.value_date = datetime(
+            2025, 11, 25, 22, 0, tzinfo=timezone(timedelta(hours=2))
+        )
+        snapshot = take_snapshot(self.trade)
+        self.assertEqual(snapshot["amount"], "0.00")
+        self.assertEqual(snapshot["strike"], "1.500000")
+        self.assertEqual(snapshot["value_date"], "2025-11-25T20:00:00Z")
+
+    def test_overrides(self):
+        snapshot = take_snapshot(self.trade, state="pending approval", trade_date=None)
+        self.assertEqual(snapshot["state"], "pending approval")
+        self.assertIsNone(snapshot["trade_date"])
+
+    def test_snapshot_is_detached(self):
+        snapshot = take_snapshot(self.trade)
+        self.trade.underlying.append("USD")
+        self.assertEqual(snapshot["underlying"], ["USD", "CAD"])
+
+
+class TestParseSnapshot(SimpleTestCase):
+    def test_same_as_take_snapshot(self):
+        trade = Trade(
+            id=uuid.UUID("756e561a-0d43-4c94-b0bb-7283bfd49eab"),
+            trading_entity="Trading entity",
+            counterparty="Counterpart",
+            direction="sell",
+            currency="CAD",
+            amount=Decimal("10000.00"),
+            underlying=["USD", "CAD"],
+            trade_date=datetime(2025, 11, 25, 20, 55, 15, 113853, tzinfo=timezone.utc),
+            strike=Decimal("1.35"),
+            state="approved",
+        )
+        snapshot = take_snapshot(trade)
+        data = dict(
+            snapshot,
+            id="756E561A-0D43-4C94-B0BB-7283BFD49EAB",
+            amount=10000,
+            trade_date="2025-11-25T15:55:15.113853-05:00",
+            strike="1.350",
+        )
+        self.assertEqual(parse_snapshot(Trade, data), snapshot)
+
+    def test_only_given_fields(self):
+        self.assertEqual(
+            parse_snapshot(Trade, {"amount": "12.5", "version": 3, "unknown": 1}),
+            {"amount": "12.50"},
+        )
+
+    def test_empty_values(self):
+        self.assertEqual(
+            parse_snapshot(Trade, {"trade_date": "", "strike": None, "style": ""}),
+            {"trade_date": None, "strike": None, "style": ""},
+        )
+
+    def test_invalid_values(self):
+        with self.assertRaises(ValueError) as context:
+            parse_snapshot(
+                Trade, {"amount": "a lot", "trade_date": "tomorrow", "id": "1"}
+            )
+        self.assertEqual(
+            context.exception.args[0],
+            {
+                "amount": "Must be a number",
+                "trade_date": "Must be an ISO 8601 date and time",
+                "id": "Must be a UUID",
+            },
+        )
+
+    def test_unhashable_values(self):
+        with self.assertRaises(ValueError) as context:
+            parse_snapshot(Trade, {"trade_date": ["x"], "created_at": {}})
+        self.assertEqual(
+            context.exception.args[0],
+            {
+                "trade_date": "Must be an ISO 8601 date and time",
+                "created_at": "Must be an ISO 8601 date and time",
+            },
+        )
+
+    def test_not_an_object(self):
+        with self.assertRaises(ValueError):
+            parse_snapshot(Trade, ["amount"])
+
+
+class TestSnapshotDiff(unittest.TestCase):
+    def test_no_difference(self):
+        snapshot = {"amount": "100.00", "underlying": ["USD", "CAD"]}
+        self.assertEqual(snapshot_diff(snapshot, dict(snapshot)), {})
+
+    def test_underlying_order_ignored(self):
+        self.assertEqual(
+            snapshot_diff(
+                {"underlying": ["USD", "CAD"]}, {"underlying": ["CAD", "USD"]}
+            ),
+            {},
+        )
+
+    def test_typed_difference(self):
+        self.assertEqual(
+            snapshot_diff(
+                {"trade_date": None, "underlying": ["CAD"]},
+                {"trade_date": "2025-11-25T20:55:15Z", "underlying": ["CAD", "USD"]},
+            ),
+            {
+                "trade_date": {"previous": None, "new": "2025-11-25T20:55:15Z"},
+                "underlying": {"previous": ["CAD"], "new": ["CAD", "USD"]},
+            },
+        )
+
+
+class TestComposeDiffs(unittest.TestCase):
+    def test_same_as_diff_of_ends(self):
+        snapshots = [
+            {"amount": "100.00", "state": "draft", "underlying": ["USD", "CAD"]},
+            {"amount": "200.00", "state": "draft", "underlying": ["CAD"]},
+            {"amount": "200.00", "state": "approved", "underlying": ["CAD", "USD"]},
+            {"amount": "300.00", "state": "approved", "underlying": ["CAD", "USD"]},
+        ]
+        diffs = [
+            snapshot_diff(previous, new)
+            for previous, new in zip(snapshots, snapshots[1:])
+        ]
+        self.assertEqual(
+            compose_diffs(diffs),
+            {
+                "amount": {"previous": "100.00", "new": "300.00"},
+                "state": {"previous": "draft", "new": "approved"},
+            },
+        )
+
+    def test_no_diffs(self):
+        self.assertEqual(compose_diffs([]), {})
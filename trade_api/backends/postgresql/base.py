@@ -0,0 +1,190 @@
+import functools
+import queue
+import threading
+import time
+import weakref
+
+from django.db.backends.postgresql import base
+
+from ...utils.metrics import observe_query
+
+DEFAULT_POOL_MAX_SIZE = 20
+DEFAULT_POOL_TIMEOUT = 10
+# Seconds between the checks for collected connections of a waiting thread
+COLLECTED_POLL = 0.05
+
+
+class ConnectionLimiter:
+    """Connections of a database alias open in this process, at most 'max_size'"""
+
+    def __init__(self, max_size, timeout):
+        self.max_size = max_size
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self.open = 0
+        self.opened = 0
+        self.closed = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.reclaimed = 0
+        # Finalizer of each tracked connection and the thread that opened it
+        self._owners = {}
+        # Tokens of the connections freed by the garbage collector, released
+        # by the next acquire or stats
+        self._collected = queue.SimpleQueue()
+
+    def acquire(self):
+        self._release_collected()
+        if not self._slots.acquire(blocking=False) and not (
+            self.reclaim() and self._slots.acquire(blocking=False)
+        ):
+            with self._lock:
+                self.waits += 1
+            if not self._wait_for_slot():
+                with self._lock:
+                    self.timeouts += 1
+                return False
+        with self._lock:
+            self.open += 1
+            self.opened += 1
+        return True
+
+    def _wait_for_slot(self):
+        """Waits up to 'timeout' for a slot, checking regularly for the
+        connections the garbage collector freed meanwhile"""
+        deadline = time.monotonic() + self.timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if self._slots.acquire(timeout=max(0, min(remaining, COLLECTED_POLL))):
+                return True
+            self._release_collected()
+            if remaining <= COLLECTED_POLL:
+                return self._slots.acquire(blocking=False)
+
+    def release(self, token=None):
+        with self._lock:
+            self._owners.pop(token, None)
+            self.open -= 1
+            self.closed += 1
+        self._slots.release()
+
+    def _release_collected(self):
+        while True:
+            try:
+                token = self._collected.get_nowait()
+            except queue.Empty:
+                return
+            self.release(token)
+
+    def _release_tracked(self, token, finalizer):
+        # Detaching makes the release happen once, whether the connection is
+        # closed, reclaimed or collected first
+        if finalizer.detach() is not None:
+            self.release(token)
+
+    def track(self, connection):
+        """Release of the slot of a new connection, called on close, by reclaim
+        or once the connection is garbage collected"""
+        token = object()
+        # The collector runs the finalizers in whichever thread allocates,
+        # possibly one holding _lock, so they only queue the token
+        finalizer = weakref.finalize(connection, self._collected.put, token)
+        with self._lock:
+            self._owners[token] = (finalizer, threading.current_thread())
+        return functools.partial(self._release_tracked, token, finalizer)
+
+    def reclaim(self):
+        """Closes the connections of threads that have ended, number closed.
+
+        Servers that end their threads without closing the connections (e.g.
+        the development server) would otherwise hold the slots until a
+        garbage collection.
+        """
+        with self._lock:
+            owners = [
+                (token, finalizer)
+                for token, (finalizer, thread) in self._owners.items()
+                if not thread.is_alive()
+            ]
+        reclaimed = 0
+        for token, finalizer in owners:
+            target = finalizer.peek()
+            if target is None:
+                continue
+            target[0].close()
+            self._release_tracked(token, finalizer)
+            reclaimed += 1
+        with self._lock:
+            self.reclaimed += reclaimed
+        return reclaimed
+
+    def stats(self):
+        self._release_collected()
+        with self._lock:
+            return {
+                "max_size": self.max_size,
+                "timeout": self.timeout,
+                "open": self.open,
+                "opened": self.opened,
+                "closed": self.closed,
+                "waits": self.waits,
+                "timeouts": self.timeouts,
+                "reclaimed": self.reclaimed,
+            }
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL backend capping the connections the process keeps open.
+
+    Each thread holds its own connection, kept CONN_MAX_AGE seconds and checked
+    before reuse with CONN_HEALTH_CHECKS. POOL_MAX_SIZE bounds them: beyond it the
+    connections of ended threads are closed, then a thread waits up to
+    POOL_TIMEOUT seconds for one to close and fails.
+    """
+
+    limiters = {}
+    limiters_lock = threading.Lock()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Counts the queries of the request being handled for its metrics
+        self.execute_wrappers.append(observe_query)
+
+    @property
+    def limiter(self):
+        with self.limiters_lock:
+            limiter = self.limiters.get(self.alias)
+            if limiter is None:
+                limiter = ConnectionLimiter(
+                    self.settings_dict.get("POOL_MAX_SIZE", DEFAULT_POOL_MAX_SIZE),
+                    self.settings_dict.get("POOL_TIMEOUT", DEFAULT_POOL_TIMEOUT),
+                )
+                self.limiters[self.alias] = limiter
+            return limiter
+
+    def pool_stats(self):
+        return self.limiter.stats()
+
+    def get_new_connection(self, conn_params):
+        limiter = self.limiter
+        if not limiter.acquire():
+            raise base.Database.OperationalError(
+                f"No database connection available after {limiter.timeout}s, "
+                f"{limiter.max_size} are open"
+            )
+        try:
+            connection = super().get_new_connection(conn_params)
+        except BaseException:
+            limiter.release()
+            raise
+        self._release_slot = limiter.track(connection)
+        return connection
+
+    def _close(self):
+        try:
+            super()._close()
+        finally:
+            release_slot = getattr(self, "_release_slot", None)
+            if release_slot is not None:
+                release_slot()
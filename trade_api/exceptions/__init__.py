@@ -1,2 +1,3 @@
 from .bad_request_exception import BadRequestException
+from .conflict_exception import ConflictException
 from .not_found_exception import NotFoundException
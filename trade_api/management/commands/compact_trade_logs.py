@@ -0,0 +1,87 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from trade_api.models import TERMINAL_TRADE_STATES, TradeLog
+from trade_api.utils import EXPORT_CHUNK_SIZE, apply_diff
+
+
+class Command(BaseCommand):
+    help = (
+        "Converts the stored trade logs to the compact storage (diff only, with a "
+        "checkpoint every N events and on terminal states), or back with --expand"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--expand",
+            action="store_true",
+            help="Rebuild and store the full states of every log",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=settings.TRADE_LOG_CHECKPOINT_INTERVAL,
+            help="Events between two checkpoints",
+        )
+        parser.add_argument("--batch-size", type=int, default=EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        self.batch_size = options["batch_size"]
+        self.batch = []
+        self.updated = 0
+
+        logs = (
+            TradeLog.objects.order_by("trade_id", "timestamp", "id")
+            .only("trade_id", "previous_state", "new_state", "is_checkpoint", "diff")
+            .iterator(chunk_size=self.batch_size)
+        )
+
+        trade_id = None
+        for log in logs:
+            if log.trade_id != trade_id:
+                trade_id = log.trade_id
+                index = 0
+                state = {}
+            if options["expand"]:
+                state = self.expand(log, state)
+            else:
+                self.compact(log, index, options["interval"])
+            index += 1
+
+        self.flush()
+        self.stdout.write(self.style.SUCCESS(f"Updated {self.updated} trade logs"))
+
+    def compact(self, log, index, interval):
+        if not log.is_checkpoint:
+            return
+        if index % interval == 0 or log.new_state.get("state") in TERMINAL_TRADE_STATES:
+            return
+        log.previous_state = {}
+        log.new_state = {}
+        log.is_checkpoint = False
+        self.save(log)
+
+    def expand(self, log, state):
+        if log.is_checkpoint:
+            return log.new_state
+        log.previous_state = state
+        log.new_state = apply_diff(state, log.diff)
+        log.is_checkpoint = True
+        self.save(log)
+        return log.new_state
+
+    def save(self, log):
+        self.batch.append(log)
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.batch:
+            return
+        with transaction.atomic():
+            TradeLog.objects.bulk_update(
+                self.batch, ["previous_state", "new_state", "is_checkpoint"]
+            )
+        self.updated += len(self.batch)
+        self.batch = []
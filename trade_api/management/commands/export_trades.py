@@ -0,0 +1,67 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from trade_api.exceptions import BadRequestException
+from trade_api.services import ExportService
+from trade_api.services.export_service import EXPORT_FORMATS, EXPORT_KINDS
+from trade_api.utils import EXPORT_CHUNK_SIZE, get_timestamp
+
+
+class Command(BaseCommand):
+    help = (
+        "Streams every trade, or every log event, matching a state and date filter "
+        "as NDJSON or CSV, optionally gzip-compressed, to a file or the standard output"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=EXPORT_KINDS)
+        parser.add_argument("--output-format", choices=EXPORT_FORMATS, default="ndjson")
+        parser.add_argument("--gzip", action="store_true", help="Compress with gzip")
+        parser.add_argument(
+            "--state", help="Filter by the state of the trades (or 'active')"
+        )
+        parser.add_argument(
+            "--since", help="Trades updated (or logs) at or after this ISO 8601 date"
+        )
+        parser.add_argument(
+            "--until", help="Trades updated (or logs) at or before this ISO 8601 date"
+        )
+        parser.add_argument(
+            "--file", help="File to write, the standard output by default"
+        )
+        parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            filters = {
+                name: get_timestamp(options[name], name) if options[name] else None
+                for name in ("since", "until")
+            }
+            chunks = ExportService.export(
+                options["kind"],
+                options["output_format"],
+                options["gzip"],
+                chunk_size=options["chunk_size"],
+                state=options["state"],
+                **filters,
+            )
+        except BadRequestException as error:
+            raise CommandError(error.detail["error"])
+
+        if not options["file"]:
+            self.write(chunks, sys.stdout.buffer)
+            return
+        with open(options["file"], "wb") as file:
+            size = self.write(chunks, file)
+        self.stderr.write(
+            self.style.SUCCESS(f"Wrote {size} bytes to {options['file']}")
+        )
+
+    def write(self, chunks, file):
+        size = 0
+        for chunk in chunks:
+            file.write(chunk)
+            size += len(chunk)
+        file.flush()
+        return size
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from trade_api.services import TradeStatsService
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds the counters of trades per state by counting the trades, e.g. "
+        "after trades were written outside of the API"
+    )
+
+    def handle(self, *args, **options):
+        drifts = TradeStatsService.reconcile_state_counts()
+        for state, (counter, trades) in drifts.items():
+            self.stdout.write(f"{state}: {counter} -> {trades}")
+        self.stdout.write(
+            self.style.SUCCESS(f"Reconciled the trade counters, {len(drifts)} drifted")
+        )
@@ -0,0 +1,66 @@
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from ..utils.metrics import (
+    REQUEST_METHODS,
+    RequestMetrics,
+    current_request,
+    observe_request,
+    server_timing,
+)
+
+
+class MetricsMiddleware:
+    """Records the latency, database queries and stage times of each request.
+
+    They are observed in the histograms served by /metrics, labelled by route
+    (the URL name), method and trade action, and sent back in a Server-Timing
+    header when TRADE_SERVER_TIMING is set. Should come first in MIDDLEWARE to
+    include the time of the others.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = current_request.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_request.reset(token)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = current_request.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_request.reset(token)
+        return self.finish(request, response, metrics)
+
+    def finish(self, request, response, metrics):
+        total = perf_counter() - metrics.start
+        match = request.resolver_match
+        observe_request(
+            metrics,
+            total,
+            route=match.url_name or match.route if match else "unmatched",
+            # Any other verb is grouped so clients can't add series at will
+            method=request.method if request.method in REQUEST_METHODS else "other",
+            action=metrics.labels.get("action", ""),
+        )
+        if getattr(settings, "TRADE_SERVER_TIMING", False):
+            response["Server-Timing"] = server_timing(metrics, total)
+        return response
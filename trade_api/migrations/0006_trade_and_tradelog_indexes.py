@@ -0,0 +1,32 @@
+# Generated by Django 4.2.26 on 2026-10-18 00:03
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Indexes are built concurrently so existing tables stay writable
+    atomic = False
+
+    dependencies = [
+        ('trade_api', '0005_remove_tradelog_state_after_and_more'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='trade',
+            index=models.Index(fields=['state', '-created_at', '-id'], name='trade_state_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='trade',
+            index=models.Index(fields=['-created_at', '-id'], name='trade_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='trade',
+            index=models.Index(condition=models.Q(('state__in', ['draft', 'pending approval', 'needs reapproval', 'approved', 'sent'])), fields=['-created_at', '-id'], name='trade_active_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='tradelog',
+            index=models.Index(fields=['trade', '-timestamp'], name='tradelog_trade_timestamp_idx'),
+        ),
+    ]
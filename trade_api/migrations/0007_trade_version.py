@@ -0,0 +1,18 @@
+# Generated by Django 4.2.26 on 2026-10-18 00:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trade_api', '0006_trade_and_tradelog_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trade',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
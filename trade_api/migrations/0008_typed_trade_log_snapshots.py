@@ -0,0 +1,95 @@
+import ast
+from datetime import datetime, timezone
+from decimal import Decimal, InvalidOperation
+
+from django.db import migrations
+
+# Snapshots used to store str() of every value, this rewrites them as typed JSON
+# (ISO dates, decimal strings, real lists, null) and recomputes the diffs.
+# The conversion is kept here so later changes to the app don't alter it.
+
+DECIMAL_FIELDS = {"amount": 2, "strike": 6}
+DATETIME_FIELDS = {
+    "trade_date",
+    "value_date",
+    "delivery_date",
+    "created_at",
+    "updated_at",
+}
+LIST_FIELDS = {"underlying"}
+BATCH_SIZE = 500
+
+
+def convert_value(field, value):
+    if value == "None":
+        return None
+    if not isinstance(value, str):
+        return value
+    try:
+        if field in DECIMAL_FIELDS:
+            exponent = Decimal(1).scaleb(-DECIMAL_FIELDS[field])
+            return str(Decimal(value).quantize(exponent))
+        if field in DATETIME_FIELDS:
+            date = datetime.fromisoformat(value.replace("Z", "+00:00"))
+            if date.tzinfo is not None:
+                date = date.astimezone(timezone.utc)
+            return date.isoformat().replace("+00:00", "Z")
+        if field in LIST_FIELDS:
+            return list(ast.literal_eval(value))
+    except (ValueError, SyntaxError, TypeError, InvalidOperation):
+        pass
+    return value
+
+
+def convert_snapshot(snapshot):
+    return {field: convert_value(field, value) for field, value in snapshot.items()}
+
+
+def values_equal(value_1, value_2):
+    if isinstance(value_1, list) and isinstance(value_2, list):
+        try:
+            return set(value_1) == set(value_2)
+        except TypeError:
+            pass
+    return value_1 == value_2
+
+
+def snapshot_diff(snapshot_1, snapshot_2):
+    diff = {}
+    fields = list(snapshot_1) + [
+        field for field in snapshot_2 if field not in snapshot_1
+    ]
+    for field in fields:
+        previous = snapshot_1.get(field)
+        new = snapshot_2.get(field)
+        if not values_equal(previous, new):
+            diff[field] = {"previous": previous, "new": new}
+    return diff
+
+
+def convert_trade_logs(apps, schema_editor):
+    TradeLog = apps.get_model("trade_api", "TradeLog")
+    batch = []
+    for log in TradeLog.objects.only("previous_state", "new_state", "diff").iterator(
+        chunk_size=BATCH_SIZE
+    ):
+        log.previous_state = convert_snapshot(log.previous_state)
+        log.new_state = convert_snapshot(log.new_state)
+        log.diff = snapshot_diff(log.previous_state, log.new_state)
+        batch.append(log)
+        if len(batch) >= BATCH_SIZE:
+            TradeLog.objects.bulk_update(batch, ["previous_state", "new_state", "diff"])
+            batch = []
+    if batch:
+        TradeLog.objects.bulk_update(batch, ["previous_state", "new_state", "diff"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("trade_api", "0007_trade_version"),
+    ]
+
+    operations = [
+        migrations.RunPython(convert_trade_logs, migrations.RunPython.noop),
+    ]
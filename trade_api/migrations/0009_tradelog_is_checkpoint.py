@@ -0,0 +1,18 @@
+# Generated by Django 4.2.26 on 2026-10-18 00:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("trade_api", "0008_typed_trade_log_snapshots"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="tradelog",
+            name="is_checkpoint",
+            field=models.BooleanField(default=True, editable=False),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.26 on 2026-10-18 00:56
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Indexes are built concurrently so existing tables stay writable
+    atomic = False
+
+    dependencies = [
+        ("trade_api", "0009_tradelog_is_checkpoint"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="tradelog",
+            index=models.Index(
+                fields=["user_id", "-timestamp", "-id"],
+                name="tradelog_user_timestamp_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="tradelog",
+            index=models.Index(
+                fields=["action", "-timestamp", "-id"],
+                name="tradelog_action_timestamp_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="tradelog",
+            index=models.Index(
+                fields=["-timestamp", "-id"], name="tradelog_timestamp_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 4.2.26 on 2026-10-18 01:08
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_trades(apps, schema_editor):
+    # Trades changed while this runs are fixed by 'manage.py reconcile_trade_counts'
+    Trade = apps.get_model("trade_api", "Trade")
+    TradeStateCount = apps.get_model("trade_api", "TradeStateCount")
+    TradeStateCount.objects.bulk_create(
+        [
+            TradeStateCount(state=state, shard=0, count=count)
+            for state, count in Trade.objects.order_by()
+            .values_list("state")
+            .annotate(Count("id"))
+        ]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("trade_api", "0010_tradelog_audit_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TradeStateCount",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "state",
+                    models.CharField(
+                        choices=[
+                            ("draft", "Draft"),
+                            ("pending approval", "Pending Approval"),
+                            ("needs reapproval", "Needs Reapproval"),
+                            ("approved", "Approved"),
+                            ("sent", "Sent"),
+                            ("executed", "Executed"),
+                            ("cancelled", "Cancelled"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("shard", models.PositiveSmallIntegerField(default=0)),
+                ("count", models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="tradestatecount",
+            constraint=models.UniqueConstraint(
+                fields=("state", "shard"), name="tradestatecount_state_shard_unique"
+            ),
+        ),
+        migrations.RunPython(count_trades, migrations.RunPython.noop),
+    ]
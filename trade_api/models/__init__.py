@@ -1,2 +1,9 @@
-from .trade import Trade, TradeDirection, TradeState
+from .trade import (
+    ACTIVE_TRADE_STATES,
+    TERMINAL_TRADE_STATES,
+    Trade,
+    TradeDirection,
+    TradeState,
+)
 from .trade_log import Action, TradeLog
+from .trade_state_count import TradeStateCount
@@ -15,6 +15,20 @@ class TradeState(models.TextChoices):
     CANCELLED = "cancelled"
 
 
+# States a trade can still move out of, the hot subset of the table
+ACTIVE_TRADE_STATES = [
+    TradeState.DRAFT,
+    TradeState.PENDING_APPROVAL,
+    TradeState.NEEDS_REAPPROVAL,
+    TradeState.APPROVED,
+    TradeState.SENT,
+]
+
+
+# States a trade can't move out of
+TERMINAL_TRADE_STATES = [TradeState.EXECUTED, TradeState.CANCELLED]
+
+
 class TradeDirection(models.TextChoices):
     BUY = "buy"
     SELL = "sell"
@@ -46,16 +60,37 @@ class Trade(models.Model):
     state = models.CharField(
         max_length=20, choices=TradeState.choices, default=TradeState.DRAFT
     )
+    # Incremented on every write, used for optimistic concurrency (If-Match)
+    version = models.PositiveIntegerField(default=1, editable=False)
 
     created_at = models.DateTimeField(auto_now_add=True, editable=False)
     updated_at = models.DateTimeField(auto_now=True)
 
-    def save(self, *args, **kwargs):
+    class Meta:
+        indexes = [
+            # Trade list filtered by state, ordered by creation (page and cursor modes)
+            models.Index(
+                fields=["state", "-created_at", "-id"], name="trade_state_created_idx"
+            ),
+            # Unfiltered trade list
+            models.Index(fields=["-created_at", "-id"], name="trade_created_idx"),
+            # Trade list of the trades still in the workflow
+            models.Index(
+                fields=["-created_at", "-id"],
+                condition=models.Q(state__in=ACTIVE_TRADE_STATES),
+                name="trade_active_created_idx",
+            ),
+        ]
+
+    def add_currency_to_underlying(self):
         currency = cast(str, self.currency)
         currencies = cast(List[str], self.underlying or [])
         if currency not in currencies:
             currencies.append(currency)
             self.underlying = currencies
+
+    def save(self, *args, **kwargs):
+        self.add_currency_to_underlying()
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -24,7 +24,28 @@ class TradeLog(models.Model):
     previous_state = models.JSONField(default=dict, editable=False)
     new_state = models.JSONField(default=dict, editable=False)
     diff = models.JSONField(default=dict, editable=False)
+    # Compact storage only keeps the diff, the full states are rebuilt on read
+    # from the previous checkpoint (a row storing both states)
+    is_checkpoint = models.BooleanField(default=True, editable=False)
     timestamp = models.DateTimeField(auto_now_add=True, editable=False)
 
+    class Meta:
+        indexes = [
+            # History of a trade ordered by time
+            models.Index(
+                fields=["trade", "-timestamp"], name="tradelog_trade_timestamp_idx"
+            ),
+            # Audit across trades by user, by action or over a time window
+            models.Index(
+                fields=["user_id", "-timestamp", "-id"],
+                name="tradelog_user_timestamp_idx",
+            ),
+            models.Index(
+                fields=["action", "-timestamp", "-id"],
+                name="tradelog_action_timestamp_idx",
+            ),
+            models.Index(fields=["-timestamp", "-id"], name="tradelog_timestamp_idx"),
+        ]
+
     def __str__(self):
         return f"Trade {self.trade} {self.action} at {self.timestamp.isoformat()}"
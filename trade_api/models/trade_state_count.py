@@ -0,0 +1,23 @@
+from django.db import models
+
+from .trade import TradeState
+
+
+class TradeStateCount(models.Model):
+    """Trades in a state, kept up to date in the transaction of every creation
+    and transition. A state's count is split over shards (rows) so concurrent
+    transitions rarely wait for each other, it's the sum of its shards."""
+
+    state = models.CharField(max_length=20, choices=TradeState.choices)
+    shard = models.PositiveSmallIntegerField(default=0)
+    count = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["state", "shard"], name="tradestatecount_state_shard_unique"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.state} (shard {self.shard}): {self.count}"
@@ -0,0 +1 @@
+from .fast_json_parser import FastJSONParser
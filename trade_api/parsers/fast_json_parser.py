@@ -0,0 +1,42 @@
+import io
+import re
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Integers orjson could read past 64 bits, which it turns into floats where the
+# stdlib decoder keeps them exact (digits of strings match too, harmlessly)
+LONG_INTEGER = re.compile(rb"(?<![.\d])\d{19,}")
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser decoding with orjson when it's installed.
+
+    orjson only reads UTF-8, rejects NaN and Infinity like the strict mode of
+    JSONParser and reads integers of more than 64 bits as floats, other bodies
+    fall back to the stdlib decoder.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if (
+            orjson is None
+            or not self.strict
+            or encoding.lower() not in ("utf-8", "utf8")
+        ):
+            return super().parse(stream, media_type, parser_context)
+
+        body = stream.read()
+        if LONG_INTEGER.search(body):
+            return super().parse(io.BytesIO(body), media_type, parser_context)
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
@@ -0,0 +1 @@
+from .fast_json_renderer import FastJSONRenderer
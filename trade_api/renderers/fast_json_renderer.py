@@ -0,0 +1,48 @@
+from rest_framework.renderers import JSONRenderer
+
+from ..utils import timed
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Dates go through the DRF encoder like with JSONRenderer (UTC as 'Z',
+# milliseconds), UUIDs and subclasses of dict, list and str (ReturnDict,
+# ErrorDetail, ...) are encoded natively
+ORJSON_OPTIONS = (
+    orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS if orjson else 0
+)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer encoding with orjson when it's installed, with the same output.
+
+    Falls back to the stdlib encoder of JSONRenderer without orjson, for the
+    formats orjson doesn't produce (indentation, non compact or ASCII only JSON)
+    and for the data it can't encode (integers of more than 64 bits).
+    """
+
+    @timed("render")
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or not self.compact
+            or self.ensure_ascii
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        encoder = self.encoder_class()
+        try:
+            ret = orjson.dumps(data, default=encoder.default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Escaped like JSONRenderer so the output stays a strict javascript subset
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+                b"\xe2\x80\xa9", b"\\u2029"
+            )
+        return ret
@@ -1,2 +1,2 @@
-from .trade_log_serializer import TradeLogSerializer
+from .trade_log_serializer import TradeLogDiffSerializer, TradeLogSerializer
 from .trade_serializer import TradeSerializer
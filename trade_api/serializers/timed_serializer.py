@@ -0,0 +1,25 @@
+from rest_framework import serializers
+
+from ..utils import timed
+
+
+class TimedSerializerMixin:
+    """Records the validation and the representation in the 'serializer' stage
+    of the request metrics"""
+
+    def run_validation(self, *args, **kwargs):
+        with timed("serializer"):
+            return super().run_validation(*args, **kwargs)
+
+    @property
+    def data(self):
+        with timed("serializer"):
+            return super().data
+
+
+class TimedListSerializer(TimedSerializerMixin, serializers.ListSerializer):
+    pass
+
+
+class TimedModelSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    pass
@@ -1,12 +1,12 @@
-from rest_framework import serializers
-
 from ..models import TradeLog
+from .timed_serializer import TimedListSerializer, TimedModelSerializer
 
 
-class TradeLogSerializer(serializers.ModelSerializer):
+class TradeLogSerializer(TimedModelSerializer):
     class Meta:
         model = TradeLog
-        fields = "__all__"
+        list_serializer_class = TimedListSerializer
+        exclude = ["is_checkpoint"]
         read_only_fields = [
             "trade",
             "user_id",
@@ -16,3 +16,11 @@ class TradeLogSerializer(serializers.ModelSerializer):
             "timestamp",
             "diff",
         ]
+
+
+class TradeLogDiffSerializer(TradeLogSerializer):
+    """TradeLogSerializer without the full states, only the diff"""
+
+    class Meta(TradeLogSerializer.Meta):
+        exclude = ["is_checkpoint", "previous_state", "new_state"]
+        read_only_fields = ["trade", "user_id", "action", "timestamp", "diff"]
@@ -2,15 +2,18 @@ from rest_framework import serializers
 
 from ..models import Trade
 from ..utils import compare_dates
+from .timed_serializer import TimedListSerializer, TimedModelSerializer
 
 
-class TradeSerializer(serializers.ModelSerializer):
+class TradeSerializer(TimedModelSerializer):
     class Meta:
         model = Trade
+        list_serializer_class = TimedListSerializer
         fields = "__all__"
         read_only_fields = [
             "id",
             "state",
+            "version",
             "created_at",
             "updated_at",
             "trade_date",
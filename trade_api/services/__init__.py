@@ -1,2 +1,5 @@
+from .export_service import ExportService
+from .health_service import HealthService
 from .trade_log_service import TradeLogService
 from .trade_service import TradeService
+from .trade_stats_service import TradeStatsService
@@ -0,0 +1,88 @@
+from ..exceptions import BadRequestException
+from ..models import Trade, TradeLog
+from ..renderers import FastJSONRenderer
+from ..serializers import TradeLogDiffSerializer, TradeSerializer
+from ..utils import (
+    EXPORT_CHUNK_SIZE,
+    chunked,
+    csv_stream,
+    gzip_stream,
+    ndjson_stream,
+    row_formatter,
+)
+from .trade_service import filter_by_state
+
+EXPORT_KINDS = ("trades", "logs")
+EXPORT_FORMATS = ("ndjson", "csv")
+EXPORT_CONTENT_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def export_queryset(kind, state=None, since=None, until=None):
+    """Rows to export, in the order of their index so the cursor streams them
+    without sorting: trades on (created_at, id) filtered on their last update,
+    logs on (timestamp, id) filtered on the current state of their trade"""
+    if kind == "trades":
+        rows = filter_by_state(Trade.objects.all(), state)
+        if since is not None:
+            rows = rows.filter(updated_at__gte=since)
+        if until is not None:
+            rows = rows.filter(updated_at__lte=until)
+        return rows.order_by("created_at", "id"), TradeSerializer
+
+    rows = TradeLog.objects.all()
+    if state is not None:
+        trades = filter_by_state(Trade.objects.all(), state)
+        rows = rows.filter(trade_id__in=trades.values("id"))
+    if since is not None:
+        rows = rows.filter(timestamp__gte=since)
+    if until is not None:
+        rows = rows.filter(timestamp__lte=until)
+    return rows.order_by("timestamp", "id"), TradeLogDiffSerializer
+
+
+class ExportService:
+    @staticmethod
+    def export(
+        kind,
+        output="ndjson",
+        compress=False,
+        chunk_size=EXPORT_CHUNK_SIZE,
+        **filters,
+    ):
+        """Bytes of every trade or log event (only their diff) matching the
+        filters as NDJSON or CSV, gzip-compressed when 'compress'.
+
+        Rows are read by a server-side cursor 'chunk_size' at a time and each
+        chunk is formatted, encoded and compressed before the next one is
+        fetched, so memory doesn't depend on the size of the export. Nothing is
+        read until the stream is consumed.
+        """
+        if kind not in EXPORT_KINDS:
+            raise BadRequestException(
+                {"error": f"'kind' should be one of these options: {EXPORT_KINDS}"}
+            )
+        if output not in EXPORT_FORMATS:
+            raise BadRequestException(
+                {"error": f"'output' should be one of these options: {EXPORT_FORMATS}"}
+            )
+
+        rows, serializer_class = export_queryset(kind, **filters)
+        columns, format_rows = row_formatter(serializer_class)
+        rows = rows.values_list(*columns).iterator(chunk_size=chunk_size)
+        batches = (format_rows(batch) for batch in chunked(rows, chunk_size))
+
+        if output == "ndjson":
+            chunks = ndjson_stream(batches, FastJSONRenderer().render)
+        else:
+            chunks = csv_stream(batches, tuple(serializer_class().fields))
+        if compress:
+            chunks = gzip_stream(chunks)
+        return chunks
+
+    @staticmethod
+    def get_filename(kind, output, compress=False):
+        return f"{kind}.{output}" + (".gz" if compress else "")
+
+    @staticmethod
+    def get_content_type(output, compress=False):
+        return "application/gzip" if compress else EXPORT_CONTENT_TYPES[output]
@@ -0,0 +1,46 @@
+import time
+
+from django.db import DatabaseError, connection
+
+
+class HealthService:
+    @staticmethod
+    def get_database_health():
+        """Round trip to the database and the state of the connections, 'status'
+        is 'unavailable' when the database can't be reached"""
+        settings_dict = connection.settings_dict
+        health = {
+            "status": "ok",
+            "vendor": connection.vendor,
+            "conn_max_age": settings_dict["CONN_MAX_AGE"],
+            "conn_health_checks": settings_dict["CONN_HEALTH_CHECKS"],
+        }
+        if hasattr(connection, "pool_stats"):
+            health["pool"] = connection.pool_stats()
+
+        start = time.perf_counter()
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                health["latency_ms"] = round((time.perf_counter() - start) * 1e3, 3)
+                if connection.vendor == "postgresql":
+                    # Connections of every process of the application (and others)
+                    cursor.execute("""
+                        SELECT count(*),
+                            count(*) FILTER (WHERE state = 'active'),
+                            count(*) FILTER (WHERE state = 'idle'),
+                            current_setting('max_connections')::int
+                        FROM pg_stat_activity
+                        WHERE datname = current_database()
+                        """)
+                    total, active, idle, max_connections = cursor.fetchone()
+                    health["server"] = {
+                        "connections": total,
+                        "active": active,
+                        "idle": idle,
+                        "max_connections": max_connections,
+                    }
+        except DatabaseError as error:
+            health["status"] = "unavailable"
+            health["error"] = str(error)
+        return health
@@ -1,8 +1,65 @@
 import csv
-import io
+import uuid
+from collections import defaultdict, namedtuple
+from operator import attrgetter
 
-from ..exceptions import NotFoundException
-from ..models import Trade
+from asgiref.sync import sync_to_async
+from django.db.models import Q
+
+from ..exceptions import BadRequestException, NotFoundException
+from ..models import Action, Trade, TradeLog
+from ..utils import (
+    DEFAULT_PAGE_SIZE,
+    EXPORT_CHUNK_SIZE,
+    TRADE_LOG_CSV_COLUMNS,
+    EchoBuffer,
+    apply_diff,
+    compose_diffs,
+    take_snapshot,
+    timed,
+)
+from .trade_service import cursor_page, cursor_queryset
+
+
+def filter_logs(logs, action=None, user_id=None, since=None, until=None):
+    """Logs of an action, by a user and within [since, until]"""
+    if action is not None:
+        if action not in Action.values:
+            raise BadRequestException(
+                {"error": f"'action' should be one of these options: {Action.values}"}
+            )
+        logs = logs.filter(action=action)
+    if user_id is not None:
+        try:
+            logs = logs.filter(user_id=uuid.UUID(str(user_id)))
+        except ValueError:
+            raise BadRequestException({"error": "'user_id' must be a UUID"})
+    if since is not None:
+        logs = logs.filter(timestamp__gte=since)
+    if until is not None:
+        logs = logs.filter(timestamp__lte=until)
+    return logs
+
+
+def up_to(log):
+    """Logs at or before 'log' (or a Position) in the (timestamp, id) order"""
+    return Q(timestamp__lt=log.timestamp) | Q(timestamp=log.timestamp, id__lte=log.id)
+
+
+# Position of a version of a trade in the (timestamp, id) order of its logs
+Position = namedtuple("Position", ["timestamp", "id"])
+# Id after every other one, the version at a time follows all the logs at that time
+LAST_ID = uuid.UUID(int=2**128 - 1)
+
+
+def version_position(version, timestamps):
+    """Position of a version given by a log id (the version after that log) or
+    a datetime (the version at that time), 'timestamps' of the log ids"""
+    if version is None:
+        return None
+    if isinstance(version, uuid.UUID):
+        return Position(timestamps[version], version)
+    return Position(version, LAST_ID)
 
 
 class TradeLogService:
@@ -13,50 +70,343 @@ class TradeLogService:
         except Trade.DoesNotExist:
             raise NotFoundException({"error": "Trade not found"})
 
-        return trade.log.all().order_by("-timestamp")
+        logs = list(trade.log.all().order_by("timestamp", "id"))
+        TradeLogService.rebuild_states(logs)
+        logs.reverse()
+        return logs
 
     @staticmethod
-    def export_trade_logs_to_csv(trade_id):
-        try:
-            trade = Trade.objects.get(id=trade_id)
-        except Trade.DoesNotExist:
+    async def aget_all_by_trade_id_ordered_by_timestamp(trade_id):
+        if not await Trade.objects.filter(id=trade_id).aexists():
             raise NotFoundException({"error": "Trade not found"})
 
-        trade_logs = trade.log.all().order_by("-timestamp")
-        csv_logs = io.StringIO()
-
-        if not trade_logs:
-            return csv_logs
-
-        columns = [
-            "trading_entity",
-            "counterparty",
-            "direction",
-            "style",
-            "currency",
-            "amount",
-            "underlying",
-            "trade_date",
-            "value_date",
-            "delivery_date",
-            "strike",
-            "state",
+        logs = [
+            log
+            async for log in TradeLog.objects.filter(trade_id=trade_id).order_by(
+                "timestamp", "id"
+            )
         ]
+        TradeLogService.rebuild_states(logs)
+        logs.reverse()
+        return logs
 
-        writer = csv.DictWriter(csv_logs, fieldnames=columns)
-        writer.writeheader()
+    @staticmethod
+    def get_by_trade_id(
+        trade_id,
+        cursor=None,
+        per_page=DEFAULT_PAGE_SIZE,
+        diff_only=False,
+        **filters,
+    ):
+        """Logs of a trade from the latest, filtered by filter_logs, in pages of
+        'per_page' from 'cursor' (all of them when 'per_page' is None).
 
-        for log in trade_logs:
-            row = {}
-            for key in columns:
-                row[f"{key}"] = log.new_state.get(key, "")
-            writer.writerow(row)
+        'diff_only' leaves out the full states, which aren't read from the
+        database nor rebuilt for compact logs. Returns the next and previous
+        cursors and the logs.
+        """
+        logs = filter_logs(TradeLog.objects.filter(trade_id=trade_id), **filters)
+        if diff_only:
+            logs = logs.defer("previous_state", "new_state")
 
-        # Adds the first state before any changes
-        row = {}
-        for key in columns:
-            row[f"{key}"] = trade_logs[len(trade_logs) - 1].previous_state.get(key, "")
-        writer.writerow(row)
+        if per_page is None:
+            next_cursor = previous_cursor = None
+            logs = list(logs.order_by("-timestamp", "-id"))
+        else:
+            page, backwards = cursor_queryset(logs, cursor, per_page, "timestamp")
+            next_cursor, previous_cursor, logs = cursor_page(
+                list(page),
+                cursor,
+                per_page,
+                backwards,
+                position=attrgetter("timestamp", "id"),
+            )
+
+        # Only checked without logs, a trade with logs exists
+        if not logs and not Trade.objects.filter(id=trade_id).exists():
+            raise NotFoundException({"error": "Trade not found"})
+
+        if not diff_only:
+            TradeLogService.fill_states(trade_id, logs)
+        return next_cursor, previous_cursor, logs
+
+    @staticmethod
+    async def aget_by_trade_id(
+        trade_id,
+        cursor=None,
+        per_page=DEFAULT_PAGE_SIZE,
+        diff_only=False,
+        **filters,
+    ):
+        logs = filter_logs(TradeLog.objects.filter(trade_id=trade_id), **filters)
+        if diff_only:
+            logs = logs.defer("previous_state", "new_state")
+
+        if per_page is None:
+            next_cursor = previous_cursor = None
+            logs = [log async for log in logs.order_by("-timestamp", "-id")]
+        else:
+            page, backwards = cursor_queryset(logs, cursor, per_page, "timestamp")
+            next_cursor, previous_cursor, logs = cursor_page(
+                [log async for log in page],
+                cursor,
+                per_page,
+                backwards,
+                position=attrgetter("timestamp", "id"),
+            )
+
+        if not logs and not await Trade.objects.filter(id=trade_id).aexists():
+            raise NotFoundException({"error": "Trade not found"})
+
+        if not diff_only:
+            await sync_to_async(TradeLogService.fill_states)(trade_id, logs)
+        return next_cursor, previous_cursor, logs
+
+    @staticmethod
+    def get_audit_page(cursor=None, per_page=DEFAULT_PAGE_SIZE, **filters):
+        """Logs of every trade from the latest, filtered by filter_logs, in pages
+        of 'per_page' from 'cursor'. Only the diffs are read, the full states
+        of compact logs would need each trade's history."""
+        logs = filter_logs(TradeLog.objects.all(), **filters).defer(
+            "previous_state", "new_state"
+        )
+        page, backwards = cursor_queryset(logs, cursor, per_page, "timestamp")
+        return cursor_page(
+            list(page),
+            cursor,
+            per_page,
+            backwards,
+            position=attrgetter("timestamp", "id"),
+        )
+
+    @staticmethod
+    def fill_states(trade_id, logs):
+        """Rebuilds the states of the compact logs among 'logs' (some logs of a
+        trade), from the checkpoint preceding the oldest of them"""
+        compact = [log for log in logs if not log.is_checkpoint]
+        if not compact:
+            return logs
+        position = attrgetter("timestamp", "id")
+        oldest = min(compact, key=position)
+        newest = max(compact, key=position)
+
+        history = TradeLog.objects.filter(trade_id=trade_id)
+        checkpoint = (
+            history.filter(up_to(oldest), is_checkpoint=True)
+            .order_by("-timestamp", "-id")
+            .only("timestamp", "new_state", "is_checkpoint")
+            .first()
+        )
+        # Without an older checkpoint the states are rebuilt from nothing
+        chain = history.filter(up_to(newest)).only(
+            "timestamp", "new_state", "diff", "is_checkpoint"
+        )
+        if checkpoint is not None:
+            chain = chain.exclude(up_to(checkpoint))
+            chain = [checkpoint, *chain.order_by("timestamp", "id")]
+        else:
+            chain = list(chain.order_by("timestamp", "id"))
+
+        states = {
+            log.id: (log.previous_state, log.new_state)
+            for log in TradeLogService.rebuild_states(chain)
+            if not log.is_checkpoint
+        }
+        for log in compact:
+            log.previous_state, log.new_state = states[log.id]
+        return logs
+
+    @staticmethod
+    def get_trades_as_of(trade_ids, timestamp):
+        """State of each trade at 'timestamp', from the latest log at that time.
+
+        Takes a fixed number of indexed queries whatever the number of trades and
+        the length of their histories (compact logs replay at most the events
+        since their checkpoint).
+        """
+        trades = {trade.id: trade for trade in Trade.objects.filter(id__in=trade_ids)}
+        logs = TradeLog.objects.filter(trade_id__in=trades, timestamp__lte=timestamp)
 
-        csv_logs.seek(0)
-        return csv_logs
+        # Latest checkpoint of each trade at that time
+        checkpoints = {
+            log.trade_id: log
+            for log in logs.filter(is_checkpoint=True)
+            .order_by("trade_id", "-timestamp", "-id")
+            .distinct("trade_id")
+            .only("trade_id", "timestamp", "new_state")
+        }
+
+        # Compact logs following these checkpoints
+        diffs = defaultdict(list)
+        if checkpoints:
+            after_checkpoints = Q()
+            for checkpoint in checkpoints.values():
+                after_checkpoints |= Q(
+                    trade_id=checkpoint.trade_id, timestamp__gt=checkpoint.timestamp
+                )
+            for log in (
+                logs.filter(after_checkpoints, is_checkpoint=False)
+                .order_by("trade_id", "timestamp", "id")
+                .only("trade_id", "diff")
+            ):
+                diffs[log.trade_id].append(log)
+
+        # Trades not changed yet at that time are in their creation state
+        first_states = dict(
+            TradeLog.objects.filter(trade_id__in=trades.keys() - checkpoints.keys())
+            .order_by("trade_id", "timestamp", "id")
+            .distinct("trade_id")
+            .values_list("trade_id", "previous_state")
+        )
+
+        results = {}
+        for id, trade in trades.items():
+            if id in checkpoints:
+                state = checkpoints[id].new_state
+                log_id = checkpoints[id].id
+                for log in diffs[id]:
+                    state = apply_diff(state, log.diff)
+                    log_id = log.id
+            elif trade.created_at <= timestamp:
+                state = first_states.get(id) or take_snapshot(trade)
+                log_id = None
+            else:
+                continue
+            results[id] = {"log_id": log_id, "state": state}
+        return results
+
+    @staticmethod
+    def get_diff_between_versions(trade_id, start=None, end=None):
+        """Diff of a trade from the version 'start' to the version 'end', each
+        given by a log id or a datetime (see version_position), from its
+        creation and to its latest version by default. Returns the number of
+        events in between and their diff.
+
+        Only the stored diff of each event is read and composed, not the full
+        states, in a query plus one to find the log ids given. Versions given
+        the other way round give the inverse diff.
+        """
+        log_ids = [
+            version for version in (start, end) if isinstance(version, uuid.UUID)
+        ]
+        timestamps = {}
+        if log_ids:
+            timestamps = dict(
+                TradeLog.objects.filter(trade_id=trade_id, id__in=log_ids).values_list(
+                    "id", "timestamp"
+                )
+            )
+            for log_id in log_ids:
+                if log_id not in timestamps:
+                    raise NotFoundException({"error": f"Log {log_id} not found"})
+
+        start = version_position(start, timestamps)
+        end = version_position(end, timestamps)
+        backwards = start is not None and end is not None and start > end
+        if backwards:
+            start, end = end, start
+
+        logs = TradeLog.objects.filter(trade_id=trade_id)
+        if start is not None:
+            logs = logs.exclude(up_to(start))
+        if end is not None:
+            logs = logs.filter(up_to(end))
+        diffs = list(logs.order_by("timestamp", "id").values_list("diff", flat=True))
+
+        # Only checked without logs, a trade with logs exists
+        if not diffs and not log_ids and not Trade.objects.filter(id=trade_id).exists():
+            raise NotFoundException({"error": "Trade not found"})
+
+        with timed("diff"):
+            diff = compose_diffs(diffs)
+        if backwards:
+            diff = {
+                field: {"previous": change["new"], "new": change["previous"]}
+                for field, change in diff.items()
+            }
+        return len(diffs), diff
+
+    @staticmethod
+    @timed("rebuild")
+    def rebuild_states(logs):
+        """Fills the states of compact logs, 'logs' being a trade's logs from the oldest"""
+        state = {}
+        for log in logs:
+            if log.is_checkpoint:
+                state = log.new_state
+                continue
+            log.previous_state = state
+            state = apply_diff(state, log.diff)
+            log.new_state = state
+        return logs
+
+    @staticmethod
+    def iter_new_states_from_latest(trade_logs, chunk_size=EXPORT_CHUNK_SIZE):
+        """New state of each log from the latest, with compact logs rebuilt.
+
+        Logs are read through a server-side cursor, only the compact logs newer
+        than the next checkpoint are held in memory.
+        """
+        rows = (
+            trade_logs.order_by("-timestamp", "-id")
+            .values_list("is_checkpoint", "new_state", "diff")
+            .iterator(chunk_size=chunk_size)
+        )
+
+        pending_diffs = []
+        for is_checkpoint, new_state, diff in rows:
+            if not is_checkpoint:
+                pending_diffs.append(diff)
+                continue
+            yield from TradeLogService._replay_from_latest(new_state, pending_diffs)
+            yield new_state
+            pending_diffs = []
+
+        # Compact logs without an older checkpoint are rebuilt from nothing
+        yield from TradeLogService._replay_from_latest({}, pending_diffs)
+
+    @staticmethod
+    def _replay_from_latest(checkpoint_state, diffs):
+        states = []
+        state = checkpoint_state
+        for diff in reversed(diffs):
+            state = apply_diff(state, diff)
+            states.append(state)
+        return reversed(states)
+
+    @staticmethod
+    def export_trade_logs_to_csv(trade_id, chunk_size=EXPORT_CHUNK_SIZE):
+        # Checked before streaming starts so a missing trade still gives a 404
+        if not Trade.objects.filter(id=trade_id).exists():
+            raise NotFoundException({"error": "Trade not found"})
+
+        return TradeLogService._stream_trade_logs_csv(trade_id, chunk_size)
+
+    @staticmethod
+    def _stream_trade_logs_csv(trade_id, chunk_size):
+        trade_logs = TradeLog.objects.filter(trade_id=trade_id)
+        writer = csv.DictWriter(EchoBuffer(), fieldnames=TRADE_LOG_CSV_COLUMNS)
+
+        new_states = TradeLogService.iter_new_states_from_latest(trade_logs, chunk_size)
+
+        has_logs = False
+        for new_state in new_states:
+            if not has_logs:
+                has_logs = True
+                yield writer.writeheader()
+            yield writer.writerow(
+                {key: new_state.get(key, "") for key in TRADE_LOG_CSV_COLUMNS}
+            )
+
+        if not has_logs:
+            return
+
+        # Adds the first state before any changes
+        first_state = (
+            trade_logs.order_by("timestamp", "id")
+            .values_list("previous_state", flat=True)
+            .first()
+        )
+        yield writer.writerow(
+            {key: first_state.get(key, "") for key in TRADE_LOG_CSV_COLUMNS}
+        )
@@ -1,11 +1,47 @@
+import hashlib
+import time
+import uuid
+from collections import Counter, defaultdict
+from functools import lru_cache
+from operator import attrgetter, itemgetter
 from typing import Union
 
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
 from django.core.paginator import Paginator
+from django.db import connection, transaction
+from django.db.models import F, Q
 from django.utils import timezone
 
-from ..exceptions import BadRequestException, NotFoundException
-from ..models import Action, Trade, TradeLog, TradeState
-from ..utils import trade_diff
+from ..exceptions import BadRequestException, ConflictException, NotFoundException
+from ..models import (
+    ACTIVE_TRADE_STATES,
+    TERMINAL_TRADE_STATES,
+    Action,
+    Trade,
+    TradeLog,
+    TradeState,
+)
+from ..serializers import TradeSerializer
+from ..utils import (
+    BULK_CREATE_BATCH_SIZE,
+    DEFAULT_PAGE_SIZE,
+    FIELDLESS_ACTIONS,
+    decode_cursor,
+    encode_cursor,
+    get_trade_generation,
+    invalidate_cached_trades,
+    label_request,
+    parse_snapshot,
+    row_formatter,
+    snapshot_diff,
+    take_snapshot,
+    timed,
+    trade_cache_key,
+    trade_diffs,
+)
+from .trade_stats_service import count_trades, transition_changes
 
 # Table of valid actions depending on the trade state
 valid_transitions = {
@@ -35,48 +71,526 @@ valid_transitions = {
 }
 
 
+def validate_action(action, user_id):
+    if (user_id) is None:
+        raise BadRequestException({"error": "No 'user_id' provided"})
+
+    if action is None:
+        raise BadRequestException({"error": "No 'action' provided"})
+
+    if action not in Action._value2member_map_:
+        all_value = [a.value for a in Action]
+        raise BadRequestException(
+            {"error": f"'action' should be one of these options: {all_value}"}
+        )
+
+
+def label_action(action):
+    """Labels the request metrics with the action, unknown ones (sent by the
+    client) as "invalid" so they can't add series"""
+    label_request(action=action if action in Action.values else "invalid")
+
+
+# Date recorded on the trade by each action
+action_dates = {
+    Action.APPROVE: "trade_date",
+    Action.SEND: "value_date",
+    Action.BOOK: "delivery_date",
+}
+
+
+def set_action_dates(trade, action, now):
+    if action in action_dates:
+        setattr(trade, action_dates[action], now)
+    elif action == Action.UPDATE:
+        trade.trade_date = None
+        trade.value_date = None
+        trade.delivery_date = None
+
+
+@timed("diff")
+def make_trade_log(trade, user_id, action, previous_state, new_state):
+    """Log of a change, 'trade' must already hold its new state and version"""
+    log = TradeLog(
+        trade=trade,
+        user_id=user_id,
+        action=action,
+        previous_state=previous_state,
+        new_state=new_state,
+        diff=snapshot_diff(previous_state, new_state),
+    )
+
+    # The version counts the trade's changes, the first one (version 2) and every
+    # TRADE_LOG_CHECKPOINT_INTERVAL after keep the full states
+    if (
+        settings.TRADE_LOG_COMPACT_STORAGE
+        and trade.state not in TERMINAL_TRADE_STATES
+        and (trade.version - 2) % settings.TRADE_LOG_CHECKPOINT_INTERVAL != 0
+    ):
+        log.previous_state = {}
+        log.new_state = {}
+        log.is_checkpoint = False
+    return log
+
+
+# Shared counters of the list page cache, to tune TRADE_LIST_CACHE_TIMEOUT
+LIST_CACHE_HITS_KEY = "trades:list:hits"
+LIST_CACHE_MISSES_KEY = "trades:list:misses"
+
+# Columns written back by update_trade, the others never change after creation
+writable_fields = [
+    field.attname
+    for field in Trade._meta.concrete_fields
+    if not field.primary_key and field.name not in ("created_at", "version")
+]
+
+
+# Fields a client sets on a trade, the ones the two-trade diff compares
+input_fields = frozenset(
+    name for name, field in TradeSerializer().fields.items() if not field.read_only
+)
+
+
+@lru_cache(maxsize=None)
+def transition_sql(action):
+    """Conditional UPDATE applying a field-less action, returning the new row
+    along with the previous values of the columns it changes"""
+    qn = connection.ops.quote_name
+    table = qn(Trade._meta.db_table)
+    columns = ", ".join(
+        f"t.{qn(field.column)}" for field in Trade._meta.concrete_fields
+    )
+    select_date = set_date = return_date = ""
+    if action in action_dates:
+        date = qn(action_dates[action])
+        select_date = f", {date}"
+        set_date = f", {date} = %s"
+        return_date = f", previous.{date} AS previous_date"
+    return f"""
+        WITH previous AS (
+            SELECT id, state, updated_at{select_date}
+            FROM {table} WHERE id = %s AND (%s IS NULL OR version = %s)
+            FOR UPDATE
+        )
+        UPDATE {table} AS t
+        SET state = %s, updated_at = %s, version = t.version + 1{set_date}
+        FROM previous
+        WHERE t.id = previous.id AND previous.state IN %s
+        RETURNING {columns},
+            previous.state AS previous_trade_state,
+            previous.updated_at AS previous_updated_at{return_date}
+    """
+
+
+def check_state(state):
+    """Rejects a 'state' filter that is neither a state nor 'active'"""
+    if state != "active" and state not in TradeState.values:
+        raise BadRequestException(
+            {
+                "error": "'state' should be one of these options: "
+                f"{TradeState.values + ['active']}"
+            }
+        )
+
+
+def filter_by_state(trades, state):
+    if state is None:
+        return trades
+    check_state(state)
+    # 'active' groups every state that is still in the workflow
+    if state == "active":
+        return trades.filter(state__in=ACTIVE_TRADE_STATES)
+    return trades.filter(state=state)
+
+
+def cursor_queryset(trades, cursor, per_page, field="created_at"):
+    """Rows of the page starting at 'cursor' (the first page without one), plus
+    one to know if there is another page without counting. Rows are ordered
+    from the latest on ('field', id)."""
+    backwards = False
+    if cursor:
+        try:
+            created_at, id, backwards = decode_cursor(cursor)
+        except ValueError:
+            raise BadRequestException({"error": "Invalid 'cursor'"})
+
+        # Keyset condition on (field, id), the extra range on the field lets
+        # the database seek into the index instead of scanning from the top
+        if backwards:
+            trades = trades.filter(**{f"{field}__gte": created_at}).filter(
+                Q(**{f"{field}__gt": created_at}) | Q(id__gt=id)
+            )
+        else:
+            trades = trades.filter(**{f"{field}__lte": created_at}).filter(
+                Q(**{f"{field}__lt": created_at}) | Q(id__lt=id)
+            )
+
+    if backwards:
+        trades = trades.order_by(field, "id")
+    else:
+        trades = trades.order_by(f"-{field}", "-id")
+    return trades[: per_page + 1], backwards
+
+
+def cursor_page(
+    trades, cursor, per_page, backwards, position=attrgetter("created_at", "id")
+):
+    """Trades of the page fetched with cursor_queryset and the cursors around it,
+    'position' gives the (created_at, id) of a trade (or the cursor field of a row)"""
+    has_more = len(trades) > per_page
+    trades = trades[:per_page]
+    if backwards:
+        trades.reverse()
+
+    next_cursor = None
+    previous_cursor = None
+    if trades:
+        if has_more or backwards:
+            next_cursor = encode_cursor(*position(trades[-1]))
+        if (has_more and backwards) or (cursor and not backwards):
+            previous_cursor = encode_cursor(*position(trades[0]), backwards=True)
+    return next_cursor, previous_cursor, trades
+
+
+def trade_projection(fields=None):
+    """Columns and row formatter giving the TradeSerializer output of 'fields'"""
+    if fields is not None:
+        allowed = tuple(TradeSerializer().fields)
+        unknown = [field for field in fields if field not in allowed]
+        if unknown or not fields:
+            raise BadRequestException(
+                {"error": f"'fields' should be some of these options: {list(allowed)}"}
+            )
+        fields = tuple(fields)
+    return row_formatter(TradeSerializer, fields)
+
+
+def projected_trades(state, fields):
+    """Trades filtered by state as rows of the projection of 'fields', with
+    their (created_at, id) at the end for the cursors"""
+    columns, format_rows = trade_projection(fields)
+    trades = filter_by_state(Trade.objects.all(), state).values_list(
+        *columns, "created_at", "id"
+    )
+    return trades, timed("serializer")(format_rows)
+
+
+def states_of(state):
+    """States of the trades a list filtered by 'state' can contain"""
+    if state is None:
+        return tuple(TradeState.values)
+    # Checked before any cache key is made from it, every unknown value would
+    # get its own generation and pages
+    check_state(state)
+    if state == "active":
+        return tuple(ACTIVE_TRADE_STATES)
+    return (state,)
+
+
+def increment(key, initial):
+    """Increments a counter shared through the cache, 'initial' if it's missing"""
+    try:
+        return cache.incr(key)
+    except ValueError:
+        if cache.add(key, initial, timeout=None):
+            return initial
+        return cache.incr(key)
+
+
+def list_generation_key(state):
+    # States contain spaces and the filter comes from the query string, both
+    # unusable as is in the keys of some backends (e.g. memcached)
+    return f"trades:list:generation:{hashlib.sha256(state.encode()).hexdigest()}"
+
+
+def get_list_generations(state):
+    keys = [list_generation_key(state) for state in states_of(state)]
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            # Starting from the clock never reuses a generation lost to an eviction
+            cache.add(key, time.time_ns(), timeout=None)
+            generations[key] = cache.get(key)
+    return [generations[key] for key in keys]
+
+
+def bump_list_generations(states):
+    """Outdates the cached list pages that can contain trades in 'states', again
+    on commit so a page read before the commit isn't kept"""
+    keys = {list_generation_key(state) for state in states}
+
+    def bump():
+        for key in keys:
+            increment(key, time.time_ns())
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def list_page_cache_key(state, params):
+    # The generations of the listed states are part of the key, so a change
+    # outdates the pages without having to find them
+    key = repr((state, params, get_list_generations(state)))
+    return f"trades:list:page:{hashlib.sha256(key.encode()).hexdigest()}"
+
+
 class TradeService:
     @staticmethod
-    def get_all_ordered_by_created_at(
-        page: int = 1, per_page: int = 10, state: Union[TradeState, None] = None
+    def get_projected_page(
+        page: int = 1,
+        per_page: int = DEFAULT_PAGE_SIZE,
+        state: Union[TradeState, None] = None,
+        fields: Union[tuple, None] = None,
     ):
-        if state is None:
-            trades = Trade.objects.order_by("-created_at")
-        else:
-            trades = Trade.objects.filter(state=state).order_by("-created_at")
+        """Page of the trades from the latest, filtered by state, giving the
+        serialized 'fields' of the trades (all by default) read as rows instead
+        of model instances"""
+        rows, format_rows = projected_trades(state, fields)
+        paginator = Paginator(rows.order_by("-created_at", "-id"), per_page)
+        trade_page = paginator.get_page(page)
+        return (
+            trade_page.number,
+            paginator.num_pages,
+            format_rows(trade_page),
+        )
 
-        paginator = Paginator(trades, per_page)
+    @staticmethod
+    async def aget_projected_page(
+        page: int = 1,
+        per_page: int = DEFAULT_PAGE_SIZE,
+        state: Union[TradeState, None] = None,
+        fields: Union[tuple, None] = None,
+    ):
+        rows, format_rows = projected_trades(state, fields)
+        rows = rows.order_by("-created_at", "-id")
+        paginator = Paginator(rows, per_page)
+        paginator.count = await rows.acount()
         trade_page = paginator.get_page(page)
-        return trade_page.number, paginator.num_pages, list(trade_page)
+        return (
+            trade_page.number,
+            paginator.num_pages,
+            format_rows([row async for row in trade_page.object_list]),
+        )
+
+    @staticmethod
+    def get_projected_by_cursor(
+        cursor: Union[str, None] = None,
+        per_page: int = DEFAULT_PAGE_SIZE,
+        state: Union[TradeState, None] = None,
+        with_total: bool = False,
+        fields: Union[tuple, None] = None,
+    ):
+        """Page of the trades from 'cursor' on, filtered by state, giving the
+        serialized 'fields' of the trades"""
+        rows, format_rows = projected_trades(state, fields)
+
+        # Counting is the expensive part on large tables, so it is opt-in
+        total = rows.count() if with_total else None
+
+        page, backwards = cursor_queryset(rows, cursor, per_page)
+        next_cursor, previous_cursor, rows = cursor_page(
+            list(page), cursor, per_page, backwards, position=itemgetter(-2, -1)
+        )
+        return next_cursor, previous_cursor, total, format_rows(rows)
+
+    @staticmethod
+    async def aget_projected_by_cursor(
+        cursor: Union[str, None] = None,
+        per_page: int = DEFAULT_PAGE_SIZE,
+        state: Union[TradeState, None] = None,
+        with_total: bool = False,
+        fields: Union[tuple, None] = None,
+    ):
+        rows, format_rows = projected_trades(state, fields)
+        total = await rows.acount() if with_total else None
+
+        page, backwards = cursor_queryset(rows, cursor, per_page)
+        next_cursor, previous_cursor, rows = cursor_page(
+            [row async for row in page],
+            cursor,
+            per_page,
+            backwards,
+            position=itemgetter(-2, -1),
+        )
+        return next_cursor, previous_cursor, total, format_rows(rows)
+
+    @staticmethod
+    def get_list_page_cached(state, params, build_page):
+        """Page of the list from the cache, 'build_page' renders it on a miss"""
+        key = list_page_cache_key(state, params)
+        page = cache.get(key)
+        if page is None:
+            increment(LIST_CACHE_MISSES_KEY, 1)
+            page = build_page()
+            cache.set(key, page, settings.TRADE_LIST_CACHE_TIMEOUT)
+        else:
+            increment(LIST_CACHE_HITS_KEY, 1)
+        return page
+
+    @staticmethod
+    async def aget_list_page_cached(state, params, build_page):
+        """get_list_page_cached with a coroutine function as 'build_page'"""
+        key = await sync_to_async(list_page_cache_key)(state, params)
+        page = await cache.aget(key)
+        if page is None:
+            await sync_to_async(increment)(LIST_CACHE_MISSES_KEY, 1)
+            page = await build_page()
+            await cache.aset(key, page, settings.TRADE_LIST_CACHE_TIMEOUT)
+        else:
+            await sync_to_async(increment)(LIST_CACHE_HITS_KEY, 1)
+        return page
+
+    @staticmethod
+    def get_list_cache_stats():
+        counters = cache.get_many([LIST_CACHE_HITS_KEY, LIST_CACHE_MISSES_KEY])
+        hits = counters.get(LIST_CACHE_HITS_KEY, 0)
+        misses = counters.get(LIST_CACHE_MISSES_KEY, 0)
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / (hits + misses) if hits + misses else None,
+            "timeout": settings.TRADE_LIST_CACHE_TIMEOUT,
+        }
 
     @staticmethod
     def get_by_id(id):
-        trade = Trade.objects.get(id=id)
+        try:
+            id = uuid.UUID(str(id))
+        except ValueError:
+            raise NotFoundException({"error": "Trade not found"})
+
+        # Read-through cache, every write to the trade moves it to a new
+        # generation (on commit too) so the copies read before are left behind
+        key = trade_cache_key(id, get_trade_generation(id))
+        trade = cache.get(key)
+        if trade is None:
+            try:
+                trade = Trade.objects.get(id=id)
+            except Trade.DoesNotExist:
+                raise NotFoundException({"error": "Trade not found"})
+            cache.add(key, trade, settings.TRADE_CACHE_TIMEOUT)
+        return trade
+
+    @staticmethod
+    async def aget_by_id(id):
+        try:
+            id = uuid.UUID(str(id))
+        except ValueError:
+            raise NotFoundException({"error": "Trade not found"})
+
+        generation = await sync_to_async(get_trade_generation)(id)
+        key = trade_cache_key(id, generation)
+        trade = await cache.aget(key)
+        if trade is None:
+            try:
+                trade = await Trade.objects.aget(id=id)
+            except Trade.DoesNotExist:
+                raise NotFoundException({"error": "Trade not found"})
+            await cache.aadd(key, trade, settings.TRADE_CACHE_TIMEOUT)
         return trade
 
     @staticmethod
     def create_trade(trade):
-        return trade.save()
+        # No savepoint needed, the insert and the count are all there is to undo
+        with transaction.atomic(savepoint=False):
+            trade = trade.save()
+            count_trades({trade.state: 1})
+        bump_list_generations([trade.state])
+        return trade
+
+    @staticmethod
+    def bulk_create_trades(trades, batch_size=BULK_CREATE_BATCH_SIZE):
+        # bulk_create skips Trade.save(), so the currency is added here
+        for trade in trades:
+            trade.add_currency_to_underlying()
+
+        with transaction.atomic():
+            trades = Trade.objects.bulk_create(trades, batch_size=batch_size)
+            count_trades(Counter(trade.state for trade in trades))
+            bump_list_generations({trade.state for trade in trades})
+            return trades
+
+    @staticmethod
+    def update_trade(id, action, user_id, updated_fields, expected_version=None):
+        label_action(action)
+        with transaction.atomic():
+            if (
+                action in FIELDLESS_ACTIONS
+                and user_id is not None
+                and not updated_fields
+                and connection.vendor == "postgresql"
+            ):
+                trade = TradeService._transition_trade(
+                    id, action, user_id, expected_version
+                )
+            else:
+                trade = TradeService._update_trade(
+                    id, action, user_id, updated_fields, expected_version
+                )
+            invalidate_cached_trades([trade.id])
+            return trade
 
     @staticmethod
-    def update_trade(id, action, user_id, updated_fields):
+    def _transition_trade(id, action, user_id, expected_version):
         try:
-            trade = Trade.objects.get(id=id)
-        except Trade.DoesNotExist:
+            id = uuid.UUID(str(id))
+        except ValueError:
             raise NotFoundException({"error": "Trade not found"})
 
-        if (user_id) is None:
-            raise BadRequestException({"error": "No 'user_id' provided"})
+        # Field-less actions always lead to the same state
+        previous_states = tuple(
+            state for state, actions in valid_transitions.items() if action in actions
+        )
+        new_state = valid_transitions[previous_states[0]][action]
 
-        if action is None:
-            raise BadRequestException({"error": "No 'action' provided"})
+        now = timezone.now()
+        params = [id, expected_version, expected_version, new_state, now]
+        if action in action_dates:
+            params.append(now)
+        params.append(previous_states)
+        trades = list(Trade.objects.raw(transition_sql(action), params))
 
-        if action not in Action._value2member_map_:
-            all_value = [a.value for a in Action]
-            raise BadRequestException(
-                {"error": f"'action' should be one of these options: {all_value}"}
+        # Nothing matched, the full path reports why (not found, conflict, state)
+        if not trades:
+            return TradeService._update_trade(
+                id, action, user_id, None, expected_version
+            )
+        trade = trades[0]
+
+        # Only the state, the action's date and updated_at changed
+        previous_values = {
+            "state": trade.previous_trade_state,
+            "updated_at": trade.previous_updated_at,
+        }
+        if action in action_dates:
+            previous_values[action_dates[action]] = trade.previous_date
+        current_trade = take_snapshot(trade, **previous_values)
+        new_trade = take_snapshot(trade)
+
+        make_trade_log(trade, user_id, action, current_trade, new_trade).save(
+            force_insert=True
+        )
+        count_trades(transition_changes([(trade.previous_trade_state, trade.state)]))
+        bump_list_generations([trade.previous_trade_state, trade.state])
+
+        return trade
+
+    @staticmethod
+    def _update_trade(id, action, user_id, updated_fields, expected_version):
+        try:
+            trade = Trade.objects.get(id=id)
+        except Trade.DoesNotExist:
+            raise NotFoundException({"error": "Trade not found"})
+
+        if expected_version is not None and trade.version != expected_version:
+            raise ConflictException(
+                {
+                    "error": f"Trade was modified (version {trade.version}, expected {expected_version})"
+                }
             )
 
+        validate_action(action, user_id)
+
         if action == Action.UPDATE and updated_fields is None:
             raise BadRequestException({"error": "No 'fields' provided"})
 
@@ -96,9 +610,7 @@ class TradeService:
             )
 
         # Takes a snapshot of the trade's current state
-        current_trade = {
-            field.name: str(getattr(trade, field.name)) for field in trade._meta.fields
-        }
+        current_trade = take_snapshot(trade)
 
         if updated_fields:
             for field, value in updated_fields.items():
@@ -111,39 +623,163 @@ class TradeService:
         trade.state = valid_transitions[trade.state][action]
 
         # Logs specific actions
-        if action == Action.APPROVE:
-            trade.trade_date = timezone.now()
-        elif action == Action.SEND:
-            trade.value_date = timezone.now()
-        elif action == Action.BOOK:
-            trade.delivery_date = timezone.now()
-        elif action == Action.UPDATE:
-            trade.trade_date = None
-            trade.value_date = None
-            trade.delivery_date = None
-
-        trade.save()
+        now = timezone.now()
+        set_action_dates(trade, action, now)
 
-        # Takes a snapshot of the trade's new state
-        new_trade = {
-            field.name: str(getattr(trade, field.name)) for field in trade._meta.fields
-        }
+        trade.add_currency_to_underlying()
+        trade.updated_at = now
 
-        # Creates a table of differences bewteen the snapshots
-        diff = trade_diff(current_trade, new_trade)
+        # Compare-and-swap on the version read above, a concurrent write in
+        # between makes it match no row instead of being overwritten
+        updated = Trade.objects.filter(id=trade.id, version=trade.version).update(
+            version=F("version") + 1,
+            **{field: getattr(trade, field) for field in writable_fields},
+        )
+        if not updated:
+            raise ConflictException(
+                {
+                    "error": "Trade was modified concurrently, retry with its latest version"
+                }
+            )
+        trade.version += 1
 
-        TradeLog.objects.create(
-            trade=trade,
-            user_id=user_id,
-            action=action,
-            previous_state=current_trade,
-            new_state=new_trade,
-            diff=diff,
+        # Takes a snapshot of the trade's new state
+        new_trade = take_snapshot(trade)
+
+        # Logs the snapshots and the table of differences between them
+        make_trade_log(trade, user_id, action, current_trade, new_trade).save(
+            force_insert=True
         )
+        count_trades(transition_changes([(current_trade["state"], trade.state)]))
+        bump_list_generations([current_trade["state"], trade.state])
 
         return trade
 
     @staticmethod
-    def get_diff_between_trades(trade1, trade2):
-        diff = trade_diff(trade1.validated_data, trade2.validated_data)
-        return diff
+    def update_trades(ids, action, user_id):
+        label_action(action)
+        validate_action(action, user_id)
+
+        if action not in FIELDLESS_ACTIONS:
+            raise BadRequestException(
+                {
+                    "error": f"'action' should be one of these options for a batch: {FIELDLESS_ACTIONS}"
+                }
+            )
+
+        ids = list(dict.fromkeys(str(id) for id in ids))
+        results = {}
+        trade_ids = {}
+        for id in ids:
+            try:
+                trade_ids[id] = uuid.UUID(id)
+            except ValueError:
+                results[id] = {"id": id, "status": "rejected", "error": "Invalid id"}
+
+        with transaction.atomic():
+            # Locks the targets so their state cannot change before the update
+            trades = {
+                trade.id: trade
+                for trade in Trade.objects.select_for_update().filter(
+                    id__in=trade_ids.values()
+                )
+            }
+
+            now = timezone.now()
+            logs = []
+            transitions = []
+            ids_by_new_state = defaultdict(list)
+            changed_states = set()
+            for id, trade_id in trade_ids.items():
+                trade = trades.get(trade_id)
+                if trade is None:
+                    results[id] = {
+                        "id": id,
+                        "status": "rejected",
+                        "error": "Trade not found",
+                    }
+                    continue
+                if action not in valid_transitions.get(trade.state, {}):
+                    results[id] = {
+                        "id": id,
+                        "status": "rejected",
+                        "error": f"Invalid action '{action}' for state '{trade.state}'",
+                    }
+                    continue
+
+                current_trade = take_snapshot(trade)
+                changed_states.add(trade.state)
+                trade.state = valid_transitions[trade.state][action]
+                transitions.append((current_trade["state"], trade.state))
+                set_action_dates(trade, action, now)
+                trade.updated_at = now
+                new_trade = take_snapshot(trade)
+
+                trade.version += 1
+
+                ids_by_new_state[trade.state].append(trade_id)
+                logs.append(
+                    make_trade_log(trade, user_id, action, current_trade, new_trade)
+                )
+                results[id] = {
+                    "id": id,
+                    "status": "updated",
+                    "state": trade.state,
+                    "version": trade.version,
+                }
+
+            # Batch actions only set the state and the action's date, so one
+            # update per resulting state covers every trade
+            for new_state, state_ids in ids_by_new_state.items():
+                changes = {
+                    "state": new_state,
+                    "updated_at": now,
+                    "version": F("version") + 1,
+                }
+                if action in action_dates:
+                    changes[action_dates[action]] = now
+                Trade.objects.filter(id__in=state_ids).update(**changes)
+                invalidate_cached_trades(state_ids)
+                changed_states.add(new_state)
+            if changed_states:
+                bump_list_generations(changed_states)
+
+            TradeLog.objects.bulk_create(logs)
+            count_trades(transition_changes(transitions))
+
+        return [results[id] for id in ids]
+
+    @staticmethod
+    def get_diff_between_two_trades(trade1, trade2):
+        """Diff of the fields a client sets (those of a trade creation)"""
+        diffs = TradeService.get_diff_between_trades(
+            [trade1, trade2], names=["trade1", "trade2"], fields=input_fields
+        )
+        return diffs[0]["diff"]
+
+    @staticmethod
+    def get_diff_between_trades(trades, mode="consecutive", names=None, fields=None):
+        """Diffs between versions of trades given as JSON, each with the next one
+        or every pair ('mode'). Versions are parsed once into typed snapshots,
+        checking the types of their fields but not the model's validators, so
+        'underlying' is compared as a set, decimals on their value and dates on
+        their instant. 'names' of the versions are used in errors, only 'fields'
+        are compared when given (the others aren't checked)."""
+        if names is None:
+            names = [f"versions[{index}]" for index in range(len(trades))]
+        with timed("diff"):
+            snapshots = []
+            for name, trade in zip(names, trades):
+                if fields is not None and isinstance(trade, dict):
+                    trade = {
+                        field: value
+                        for field, value in trade.items()
+                        if field in fields
+                    }
+                try:
+                    snapshots.append(parse_snapshot(Trade, trade))
+                except ValueError as error:
+                    raise BadRequestException(
+                        {"error": f"Invalid Trade '{name}'", "details": error.args[0]}
+                    )
+            return trade_diffs(snapshots, mode)
@@ -0,0 +1,101 @@
+import random
+from collections import Counter
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+
+from ..models import ACTIVE_TRADE_STATES, Trade, TradeState, TradeStateCount
+
+
+@lru_cache(maxsize=None)
+def count_sql(rows):
+    """Upsert adding a delta to 'rows' (state, shard) counters"""
+    qn = connection.ops.quote_name
+    table = qn(TradeStateCount._meta.db_table)
+    values = ", ".join(["(%s, %s, %s)"] * rows)
+    return f"""
+        INSERT INTO {table} (state, shard, count) VALUES {values}
+        ON CONFLICT (state, shard)
+        DO UPDATE SET count = {table}.count + EXCLUDED.count
+    """
+
+
+def count_trades(changes):
+    """Adds the changes of the number of trades per state ({state: delta}) to
+    the counters, in one query within the transaction of the change"""
+    changes = sorted((state, delta) for state, delta in changes.items() if delta)
+    if not changes:
+        return
+    # Rows are locked in the order of the states, so transactions updating the
+    # same shard queue instead of deadlocking
+    shard = random.randrange(settings.TRADE_STATE_COUNT_SHARDS)
+    params = []
+    for state, delta in changes:
+        params += [state, shard, delta]
+    with connection.cursor() as cursor:
+        cursor.execute(count_sql(len(changes)), params)
+
+
+def transition_changes(transitions):
+    """Changes of the number of trades per state of (previous, new) states"""
+    changes = Counter()
+    for previous_state, new_state in transitions:
+        if previous_state != new_state:
+            changes[previous_state] -= 1
+            changes[new_state] += 1
+    return changes
+
+
+class TradeStatsService:
+    @staticmethod
+    def get_state_counts():
+        """Number of trades per state, from the counters (a few rows per state)
+        whatever the number of trades"""
+        counts = dict.fromkeys(TradeState.values, 0)
+        counts.update(
+            TradeStateCount.objects.order_by()
+            .values_list("state")
+            .annotate(Sum("count"))
+        )
+        return {
+            "states": counts,
+            "active": sum(counts[state] for state in ACTIVE_TRADE_STATES),
+            "total": sum(counts.values()),
+        }
+
+    @staticmethod
+    def reconcile_state_counts():
+        """Rebuilds the counters by counting the trades, returns the states whose
+        counter had drifted as {state: (counter, trades)}.
+
+        The counters are locked first: transitions that already counted are
+        committed before the trades are counted, and the others wait for the
+        rebuild to commit and then count on top of it.
+        """
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"LOCK TABLE {connection.ops.quote_name(TradeStateCount._meta.db_table)}"
+                    " IN EXCLUSIVE MODE"
+                )
+            counters = TradeStatsService.get_state_counts()["states"]
+            trades = dict.fromkeys(TradeState.values, 0)
+            trades.update(
+                Trade.objects.order_by().values_list("state").annotate(Count("id"))
+            )
+
+            TradeStateCount.objects.all().delete()
+            TradeStateCount.objects.bulk_create(
+                [
+                    TradeStateCount(state=state, shard=0, count=count)
+                    for state, count in trades.items()
+                    if count
+                ]
+            )
+        return {
+            state: (counters[state], trades[state])
+            for state in trades
+            if counters[state] != trades[state]
+        }
@@ -1,8 +1,23 @@
+from django.urls import re_path
 from rest_framework.routers import DefaultRouter
 
-from .views import TradeLogView, TradeView
+from .views import HealthView, TradeLogView, TradeView, async_view, metrics_view
 
 router = DefaultRouter()
 router.register(r"trades", TradeView, basename="trade")
 router.register(r"trade_logs", TradeLogView, basename="trade-log")
-urlpatterns = router.urls
+router.register(r"health", HealthView, basename="health")
+urlpatterns = router.urls + [
+    re_path(r"^async/trades/$", async_view.list_trades, name="async-trade-list"),
+    re_path(
+        r"^async/trades/(?P<trade_id>[0-9a-fA-F-]{36})/$",
+        async_view.get_trade,
+        name="async-trade-detail",
+    ),
+    re_path(
+        r"^async/trade_logs/(?P<trade_id>[0-9a-fA-F-]{36})/$",
+        async_view.list_trade_logs,
+        name="async-trade-log-by-trade",
+    ),
+    re_path(r"^metrics/?$", metrics_view.metrics, name="metrics"),
+]
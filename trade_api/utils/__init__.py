@@ -1,3 +1,17 @@
 from .compare_dates import compare_dates
 from .constants import *
-from .trade_diff import trade_diff
+from .cursor import decode_cursor, encode_cursor
+from .echo_buffer import EchoBuffer
+from .export_stream import chunked, csv_stream, gzip_stream, ndjson_stream
+from .metrics import label_request, timed
+from .row_formatter import row_formatter
+from .timestamp import get_timestamp
+from .trade_cache import get_trade_generation, invalidate_cached_trades, trade_cache_key
+from .trade_diff import trade_diffs, version_pairs
+from .trade_snapshot import (
+    apply_diff,
+    compose_diffs,
+    parse_snapshot,
+    snapshot_diff,
+    take_snapshot,
+)
@@ -0,0 +1,36 @@
+DEFAULT_PAGE_SIZE = 10
+MAX_PAGE_SIZE = 100
+
+# Trades accepted by one bulk creation request and inserted per statement
+BULK_CREATE_MAX_SIZE = 10000
+BULK_CREATE_BATCH_SIZE = 500
+
+# Actions that take no fields, they can be applied in batch or with a single UPDATE
+FIELDLESS_ACTIONS = ["submit", "approve", "send", "cancel"]
+BATCH_ACTION_MAX_SIZE = 1000
+
+# Trades reconstructed by one point-in-time request
+AS_OF_MAX_SIZE = 1000
+
+# Versions compared by one diff request, each with the next or every pair
+DIFF_MODES = ["consecutive", "pairwise"]
+DIFF_MAX_VERSIONS = 10000
+DIFF_MAX_PAIRWISE_VERSIONS = 100
+
+# Rows fetched per round trip by the server-side cursors of the exports
+EXPORT_CHUNK_SIZE = 2000
+
+TRADE_LOG_CSV_COLUMNS = [
+    "trading_entity",
+    "counterparty",
+    "direction",
+    "style",
+    "currency",
+    "amount",
+    "underlying",
+    "trade_date",
+    "value_date",
+    "delivery_date",
+    "strike",
+    "state",
+]
@@ -0,0 +1,23 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+
+
+def encode_cursor(created_at, id, backwards=False):
+    payload = {"created_at": created_at.isoformat(), "id": str(id)}
+    if backwards:
+        payload["backwards"] = True
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(cursor + padding))
+        created_at = datetime.fromisoformat(payload["created_at"])
+        id = uuid.UUID(payload["id"])
+    except (ValueError, TypeError, KeyError):
+        raise ValueError("Invalid cursor")
+    return created_at, id, bool(payload.get("backwards", False))
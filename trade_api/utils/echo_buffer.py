@@ -0,0 +1,5 @@
+class EchoBuffer:
+    """File-like object handing back what is written, to stream csv rows one by one"""
+
+    def write(self, value):
+        return value
@@ -0,0 +1,56 @@
+import csv
+import json
+import zlib
+from itertools import islice
+
+from .echo_buffer import EchoBuffer
+
+# Compression level of the gzip exports, zlib's fastest: they are compressed
+# while the response streams, repetitive rows still shrink several times
+GZIP_LEVEL = 1
+
+
+def chunked(iterable, size):
+    """Lists of 'size' items of an iterable (the last one may be shorter)"""
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def ndjson_stream(batches, encode):
+    """Bytes of one JSON line per row, a chunk per batch of rows, 'encode'
+    turning a row into JSON bytes"""
+    for rows in batches:
+        yield b"".join([encode(row) + b"\n" for row in rows])
+
+
+def csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(",", ":"))
+    return value
+
+
+def csv_stream(batches, columns):
+    """Bytes of a CSV file with a header of 'columns', a chunk per batch of
+    rows, JSON values (e.g. lists and diffs) are written as JSON"""
+    writer = csv.writer(EchoBuffer())
+    yield writer.writerow(columns).encode("utf-8")
+    for rows in batches:
+        yield "".join(
+            [
+                writer.writerow([csv_value(row[column]) for column in columns])
+                for row in rows
+            ]
+        ).encode("utf-8")
+
+
+def gzip_stream(chunks, level=GZIP_LEVEL):
+    """Chunks compressed on the fly into a gzip file"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
@@ -0,0 +1,200 @@
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+
+# Seconds, from a cached read to a slow export
+DURATION_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+REQUEST_LABELS = ("route", "method", "action")
+# Methods labelled as is, the others as "other"
+REQUEST_METHODS = frozenset(
+    ["GET", "POST", "PATCH", "PUT", "DELETE", "HEAD", "OPTIONS"]
+)
+
+# Metrics of the request being handled, None outside of MetricsMiddleware
+current_request = ContextVar("current_request", default=None)
+
+
+class RequestMetrics:
+    """Queries, database time and time per stage of a request"""
+
+    __slots__ = ("start", "queries", "db_time", "stages", "active_stages", "labels")
+
+    def __init__(self):
+        self.start = perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.stages = {}
+        self.active_stages = set()
+        self.labels = {}
+
+
+def label_request(**labels):
+    """Adds labels (e.g. the trade action) to the metrics of the current request"""
+    metrics = current_request.get()
+    if metrics is not None:
+        metrics.labels.update(labels)
+
+
+@contextmanager
+def timed(stage):
+    """Adds the time spent in the block (or decorated function) to 'stage' of
+    the current request, blocks nested in the same stage aren't counted twice"""
+    metrics = current_request.get()
+    if metrics is None or stage in metrics.active_stages:
+        yield
+        return
+    metrics.active_stages.add(stage)
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        metrics.active_stages.discard(stage)
+        metrics.stages[stage] = metrics.stages.get(stage, 0.0) + (
+            perf_counter() - start
+        )
+
+
+def observe_query(execute, sql, params, many, context):
+    """Database execute wrapper counting the queries of the current request"""
+    metrics = current_request.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_time += perf_counter() - start
+
+
+def escape_label(value):
+    return str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def format_labels(labels):
+    return ",".join(f'{name}="{escape_label(value)}"' for name, value in labels)
+
+
+class Histogram:
+    """Prometheus histogram of this process, per combination of labels"""
+
+    def __init__(self, name, documentation, labelnames, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # Labels -> [count per bucket (the last one for +Inf), sum]
+        self._series = {}
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def collect(self):
+        """Lines of the text exposition format"""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            series = sorted(
+                (key, list(counts), total)
+                for key, (counts, total) in self._series.items()
+            )
+        bounds = [repr(float(bound)) for bound in self.buckets] + ["+Inf"]
+        for key, counts, total in series:
+            labels = list(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                bucket_labels = format_labels(labels + [("le", bound)])
+                lines.append(f"{self.name}_bucket{{{bucket_labels}}} {cumulative}")
+            lines.append(f"{self.name}_sum{{{format_labels(labels)}}} {total!r}")
+            lines.append(f"{self.name}_count{{{format_labels(labels)}}} {cumulative}")
+        return lines
+
+
+REQUEST_DURATION = Histogram(
+    "trade_api_request_duration_seconds",
+    "Time to handle a request, until its response is rendered.",
+    REQUEST_LABELS,
+    DURATION_BUCKETS,
+)
+REQUEST_DB_QUERIES = Histogram(
+    "trade_api_request_db_queries",
+    "Database queries per request.",
+    REQUEST_LABELS,
+    QUERY_COUNT_BUCKETS,
+)
+REQUEST_DB_DURATION = Histogram(
+    "trade_api_request_db_duration_seconds",
+    "Time spent in database queries per request.",
+    REQUEST_LABELS,
+    DURATION_BUCKETS,
+)
+REQUEST_STAGE_DURATION = Histogram(
+    "trade_api_request_stage_duration_seconds",
+    "Time spent per request in a stage (serializer, render, diff, rebuild).",
+    REQUEST_LABELS + ("stage",),
+    DURATION_BUCKETS,
+)
+HISTOGRAMS = (
+    REQUEST_DURATION,
+    REQUEST_DB_QUERIES,
+    REQUEST_DB_DURATION,
+    REQUEST_STAGE_DURATION,
+)
+
+
+def observe_request(metrics, total, **labels):
+    REQUEST_DURATION.observe(total, **labels)
+    REQUEST_DB_QUERIES.observe(metrics.queries, **labels)
+    REQUEST_DB_DURATION.observe(metrics.db_time, **labels)
+    for stage, duration in metrics.stages.items():
+        REQUEST_STAGE_DURATION.observe(duration, stage=stage, **labels)
+
+
+def render_metrics():
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines += histogram.collect()
+    return "\n".join(lines) + "\n"
+
+
+def server_timing(metrics, total):
+    """Server-Timing header value of a request, durations in milliseconds"""
+    entries = [
+        f"total;dur={total * 1e3:.3f}",
+        f'db;dur={metrics.db_time * 1e3:.3f};desc="{metrics.queries} queries"',
+    ]
+    for stage, duration in metrics.stages.items():
+        entries.append(f"{stage};dur={duration * 1e3:.3f}")
+    return ", ".join(entries)
@@ -0,0 +1,105 @@
+import decimal
+from functools import lru_cache
+
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+
+def represent_datetime(value, current_timezone):
+    value = value.astimezone(current_timezone).isoformat()
+    if value.endswith("+00:00"):
+        value = value[:-6] + "Z"
+    return value
+
+
+def decimal_representer(field):
+    exponent = decimal.Decimal(1).scaleb(-field.decimal_places)
+    context = decimal.Context(prec=field.max_digits, rounding=field.rounding)
+
+    def represent_decimal(value):
+        if not isinstance(value, decimal.Decimal):
+            value = decimal.Decimal(str(value).strip())
+        return f"{value.quantize(exponent, context=context):f}"
+
+    return represent_decimal
+
+
+def get_representer(field):
+    """Faster equivalent of 'field.to_representation' for values read from the
+    database, None when they are already represented (represent_datetime also
+    takes the current timezone)"""
+    if isinstance(field, serializers.DateTimeField):
+        output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+        if (
+            output_format
+            and output_format.lower() == ISO_8601
+            and getattr(field, "timezone", None) is None
+        ):
+            return represent_datetime
+    elif isinstance(field, serializers.DecimalField):
+        coerce_to_string = getattr(
+            field, "coerce_to_string", api_settings.COERCE_DECIMAL_TO_STRING
+        )
+        if coerce_to_string and not field.localize and not field.normalize_output:
+            return decimal_representer(field)
+    elif isinstance(field, serializers.UUIDField):
+        if field.uuid_format == "hex_verbose":
+            return str
+    elif isinstance(field, serializers.PrimaryKeyRelatedField):
+        # The column holds the related id, represented as is
+        if field.pk_field is None:
+            return None
+    elif isinstance(field, serializers.JSONField):
+        if not field.binary:
+            return None
+    elif isinstance(
+        field,
+        (serializers.CharField, serializers.ChoiceField, serializers.IntegerField),
+    ):
+        # Choices are stored as their value and these columns are already typed
+        return None
+    return field.to_representation
+
+
+@lru_cache(maxsize=None)
+def row_formatter(serializer_class, fields=None):
+    """Columns to select for 'fields' of a serializer (all by default) and the
+    function turning a list of rows of them into the serializer's output.
+
+    Rows may carry extra columns after these, they are left out.
+    """
+    serializer_fields = serializer_class().fields
+    if fields is None:
+        fields = tuple(serializer_fields)
+    columns = tuple(serializer_fields[name].source for name in fields)
+    representers = {name: get_representer(serializer_fields[name]) for name in fields}
+    datetimes = tuple(
+        name
+        for name, representer in representers.items()
+        if representer is represent_datetime
+    )
+    represented = tuple(
+        (name, representer)
+        for name, representer in representers.items()
+        if representer is not None and representer is not represent_datetime
+    )
+
+    def format_rows(rows):
+        # Looking the timezone up is as costly as formatting, it's done once
+        current_timezone = timezone.get_current_timezone()
+        results = []
+        for row in rows:
+            data = dict(zip(fields, row))
+            for name in datetimes:
+                value = data[name]
+                if value is not None:
+                    data[name] = represent_datetime(value, current_timezone)
+            for name, represent in represented:
+                value = data[name]
+                if value is not None:
+                    data[name] = represent(value)
+            results.append(data)
+        return results
+
+    return columns, format_rows
@@ -0,0 +1,21 @@
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from ..exceptions import BadRequestException
+
+
+def get_timestamp(value, name="ts"):
+    """Aware datetime of an ISO 8601 parameter 'name' (UTC when naive)"""
+    if value is None:
+        raise BadRequestException({"error": f"No '{name}' provided"})
+    try:
+        timestamp = parse_datetime(str(value))
+    except ValueError:
+        timestamp = None
+    if timestamp is None:
+        raise BadRequestException(
+            {"error": f"'{name}' must be an ISO 8601 date and time"}
+        )
+    if timezone.is_naive(timestamp):
+        timestamp = timezone.make_aware(timestamp, timezone.utc)
+    return timestamp
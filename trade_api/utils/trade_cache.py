@@ -0,0 +1,42 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+def trade_generation_key(id):
+    return f"trade:generation:{str(id).lower()}"
+
+
+def get_trade_generation(id):
+    """Generation of the cached copies of a trade, read before the trade so a
+    copy read before a commit is stored under the generation the commit ends"""
+    key = trade_generation_key(id)
+    generation = cache.get(key)
+    if generation is None:
+        # Starting from the clock never reuses a generation lost to an eviction
+        cache.add(key, time.time_ns(), settings.TRADE_CACHE_TIMEOUT)
+        generation = cache.get(key)
+    return generation
+
+
+def trade_cache_key(id, generation):
+    return f"trade:{str(id).lower()}:{generation}"
+
+
+def invalidate_cached_trades(ids):
+    """Outdates the cached trades now and again once the transaction commits,
+    so a read of the previous row made before the commit isn't served"""
+    keys = [trade_generation_key(id) for id in ids]
+
+    def bump():
+        for key in keys:
+            try:
+                cache.incr(key)
+            except ValueError:
+                # Without a generation, the next read starts a new one
+                pass
+
+    bump()
+    transaction.on_commit(bump)
@@ -1,6 +1,23 @@
-def trade_diff(trade_1, trade_2):
-    diff = {}
-    for field in trade_1:
-        if trade_1[field] != trade_2[field]:
-            diff[field] = {"previous": str(trade_1[field]), "new": str(trade_2[field])}
-    return diff
+from itertools import combinations
+
+from .trade_snapshot import snapshot_diff
+
+
+def version_pairs(count, mode="consecutive"):
+    """Indexes of the versions to compare: each one with the next, or every pair"""
+    if mode == "pairwise":
+        return list(combinations(range(count), 2))
+    return [(index, index + 1) for index in range(count - 1)]
+
+
+def trade_diffs(snapshots, mode="consecutive"):
+    """Diffs between snapshots of trades (see parse_snapshot), with the indexes
+    of the versions each one goes from and to"""
+    return [
+        {
+            "from": previous,
+            "to": new,
+            "diff": snapshot_diff(snapshots[previous], snapshots[new]),
+        }
+        for previous, new in version_pairs(len(snapshots), mode)
+    ]
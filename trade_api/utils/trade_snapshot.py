@@ -0,0 +1,252 @@
+import copy
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+from operator import attrgetter
+
+from django.utils.dateparse import parse_datetime
+
+# Bookkeeping fields that are not part of a trade's state
+SNAPSHOT_EXCLUDED_FIELDS = ("version",)
+
+# Formatting dates and ids dominates a snapshot, and the two snapshots of a
+# transition share most of them, so their encodings are memoized
+ENCODING_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=ENCODING_CACHE_SIZE)
+def encode_datetime(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        parsed = parse_datetime(value)
+        if parsed is None:
+            return value
+        value = parsed
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.isoformat().replace("+00:00", "Z")
+
+
+def decimal_encoder(decimal_places):
+    exponent = Decimal(1).scaleb(-decimal_places)
+
+    def encode_decimal(value):
+        if value is None:
+            return None
+        if not isinstance(value, Decimal):
+            value = Decimal(str(value))
+        return str(value.quantize(exponent))
+
+    return encode_decimal
+
+
+def encode_json(value):
+    # Copied so later changes to the instance (e.g. the underlying list) don't leak in
+    if isinstance(value, list):
+        return list(value)
+    return copy.deepcopy(value)
+
+
+@lru_cache(maxsize=ENCODING_CACHE_SIZE)
+def encode_uuid(value):
+    if value is None:
+        return None
+    return str(value)
+
+
+def get_encoder(field):
+    internal_type = field.get_internal_type()
+    if internal_type == "DateTimeField":
+        return encode_datetime
+    if internal_type == "DecimalField":
+        return decimal_encoder(field.decimal_places)
+    if internal_type == "JSONField":
+        return encode_json
+    if internal_type == "UUIDField":
+        return encode_uuid
+    # Strings, numbers and booleans are already JSON values
+    return None
+
+
+@lru_cache(maxsize=None)
+def snapshot_fields(model):
+    """Precomputed accessors of the fields kept in a snapshot: a getter of all
+    the plain fields at once, and the (name, attname, encoder) of the others"""
+    fields = [
+        field
+        for field in model._meta.concrete_fields
+        if field.name not in SNAPSHOT_EXCLUDED_FIELDS
+    ]
+    plain = [field for field in fields if get_encoder(field) is None]
+    encoded = tuple(
+        (field.name, field.attname, get_encoder(field))
+        for field in fields
+        if get_encoder(field) is not None
+    )
+    plain_names = tuple(field.name for field in plain)
+    plain_getter = attrgetter(*(field.attname for field in plain))
+    if len(plain) == 1:
+        single_getter = plain_getter
+        plain_getter = lambda instance: (single_getter(instance),)  # noqa: E731
+    encoders = {name: encode for name, _, encode in encoded}
+    return plain_names, plain_getter, encoded, encoders
+
+
+def take_snapshot(instance, **overrides):
+    """JSON-ready typed state of an instance, 'overrides' replace attribute values"""
+    plain_names, plain_getter, encoded, encoders = snapshot_fields(type(instance))
+    snapshot = dict(zip(plain_names, plain_getter(instance)))
+    for name, attname, encode in encoded:
+        snapshot[name] = encode(getattr(instance, attname))
+    for name, value in overrides.items():
+        encode = encoders.get(name)
+        snapshot[name] = encode(value) if encode else value
+    return snapshot
+
+
+@lru_cache(maxsize=ENCODING_CACHE_SIZE)
+def parse_datetime_string(value):
+    try:
+        parsed = parse_datetime(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValueError("Must be an ISO 8601 date and time")
+    return encode_datetime(parsed)
+
+
+def parse_datetime_value(value):
+    # Checked before the cached parsing, which needs hashable values
+    if isinstance(value, str):
+        return parse_datetime_string(value)
+    if isinstance(value, datetime):
+        return encode_datetime(value)
+    raise ValueError("Must be an ISO 8601 date and time")
+
+
+def decimal_parser(decimal_places):
+    encode_decimal = decimal_encoder(decimal_places)
+
+    def parse_decimal(value):
+        if isinstance(value, bool) or not isinstance(value, (str, int, float, Decimal)):
+            raise ValueError("Must be a number")
+        try:
+            decimal = Decimal(str(value).strip())
+            if not decimal.is_finite():
+                raise InvalidOperation
+            return encode_decimal(decimal)
+        except InvalidOperation:
+            raise ValueError("Must be a number")
+
+    return parse_decimal
+
+
+def parse_uuid(value):
+    try:
+        return str(uuid.UUID(str(value)))
+    except ValueError:
+        raise ValueError("Must be a UUID")
+
+
+def get_parser(field):
+    internal_type = field.get_internal_type()
+    if internal_type == "DateTimeField":
+        return parse_datetime_value
+    if internal_type == "DecimalField":
+        return decimal_parser(field.decimal_places)
+    if internal_type == "UUIDField":
+        return parse_uuid
+    # Strings, numbers, booleans and JSON are compared as given
+    return None
+
+
+@lru_cache(maxsize=None)
+def snapshot_parsers(model):
+    return {
+        field.name: get_parser(field)
+        for field in model._meta.concrete_fields
+        if field.name not in SNAPSHOT_EXCLUDED_FIELDS
+    }
+
+
+def parse_snapshot(model, data):
+    """Snapshot of the fields given in 'data' (e.g. a trade as JSON), typed like
+    take_snapshot so equal values compare equal whatever their format (decimal
+    places, time zone of dates). Only the types are checked, not the model's
+    validators. Other keys are left out, raises ValueError with the message of
+    each invalid field."""
+    if not isinstance(data, dict):
+        raise ValueError({"non_field_errors": "Must be an object"})
+    parsers = snapshot_parsers(model)
+    snapshot = {}
+    errors = {}
+    for name, value in data.items():
+        if name not in parsers:
+            continue
+        parse = parsers[name]
+        if parse is None or value is None:
+            snapshot[name] = value
+            continue
+        # Empty typed values (e.g. a date from a form) are missing ones
+        if value == "":
+            snapshot[name] = None
+            continue
+        try:
+            snapshot[name] = parse(value)
+        except ValueError as error:
+            errors[name] = str(error)
+    if errors:
+        raise ValueError(errors)
+    return snapshot
+
+
+def same_value(previous, new):
+    if previous == new:
+        return True
+    # Lists (e.g. underlying currencies) are compared regardless of order
+    if isinstance(previous, list) and isinstance(new, list):
+        try:
+            return set(previous) == set(new)
+        except TypeError:
+            pass
+    return False
+
+
+def snapshot_diff(snapshot_1, snapshot_2):
+    diff = {}
+    for field, previous in snapshot_1.items():
+        new = snapshot_2.get(field)
+        if not same_value(previous, new):
+            diff[field] = {"previous": previous, "new": new}
+    for field, new in snapshot_2.items():
+        if field not in snapshot_1:
+            diff[field] = {"previous": None, "new": new}
+    return diff
+
+
+def apply_diff(snapshot, diff):
+    """State reached by applying a diff of snapshot_diff to a snapshot"""
+    state = dict(snapshot)
+    for field, change in diff.items():
+        state[field] = change["new"]
+    return state
+
+
+def compose_diffs(diffs):
+    """Diff equivalent to the diffs of snapshot_diff applied in order: each field
+    goes from its first previous value to its last new one, the fields back to
+    their first value are left out"""
+    changes = {}
+    for diff in diffs:
+        for field, change in diff.items():
+            if field in changes:
+                changes[field][1] = change["new"]
+            else:
+                changes[field] = [change["previous"], change["new"]]
+    return {
+        field: {"previous": previous, "new": new}
+        for field, (previous, new) in changes.items()
+        if not same_value(previous, new)
+    }
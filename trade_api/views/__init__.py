@@ -1,2 +1,4 @@
+from . import async_view, metrics_view
+from .health_view import HealthView
 from .trade_log_view import TradeLogView
 from .trade_view import TradeView
@@ -0,0 +1,140 @@
+"""Async variants of the read endpoints, for ASGI servers.
+
+DRF views are sync and hold a thread for every query, these are plain Django
+async views returning the same payloads as TradeView.list, TradeView.get and
+TradeLogView.get, with the same filters and pagination, under the '/async/'
+prefix.
+"""
+
+import functools
+
+from django.http import HttpResponseNotAllowed, JsonResponse
+from django.utils.cache import get_conditional_response
+from rest_framework.exceptions import APIException
+
+from ..serializers import TradeLogDiffSerializer, TradeLogSerializer, TradeSerializer
+from ..services import TradeLogService, TradeService
+from .trade_log_view import get_log_filters
+from .trade_view import (
+    get_etag,
+    get_fields,
+    get_last_modified,
+    get_per_page,
+    set_etag,
+)
+
+
+def async_api_view(view):
+    """Restricts an async view to GET and renders the API exceptions as DRF does"""
+
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method != "GET":
+            return HttpResponseNotAllowed(["GET"])
+        try:
+            return await view(request, *args, **kwargs)
+        except APIException as exception:
+            return JsonResponse(
+                exception.detail, status=exception.status_code, safe=False
+            )
+
+    return wrapper
+
+
+@async_api_view
+async def list_trades(request):
+    state = request.GET.get("state") or None
+    per_page = get_per_page(request)
+    fields = get_fields(request)
+
+    if "cursor" in request.GET or request.GET.get("pagination") == "cursor":
+        cursor = request.GET.get("cursor")
+        with_total = request.GET.get("with_total") == "true"
+
+        async def build_page():
+            next_cursor, previous_cursor, total, trades = (
+                await TradeService.aget_projected_by_cursor(
+                    cursor=cursor,
+                    per_page=per_page,
+                    state=state,
+                    with_total=with_total,
+                    fields=fields,
+                )
+            )
+            data = {"next": next_cursor, "previous": previous_cursor}
+            if total is not None:
+                data["total"] = total
+            data["trades"] = trades
+            return data
+
+        return JsonResponse(
+            await TradeService.aget_list_page_cached(
+                state, ("cursor", cursor, per_page, with_total, fields), build_page
+            )
+        )
+
+    page = request.GET.get("page")
+    if page is None:
+        page = 1
+
+    async def build_page():
+        number, total_pages, trades = await TradeService.aget_projected_page(
+            page=page, per_page=per_page, state=state, fields=fields
+        )
+        return {
+            "page": number,
+            "total_pages": total_pages,
+            "trades": trades,
+        }
+
+    return JsonResponse(
+        await TradeService.aget_list_page_cached(
+            state, ("page", str(page), per_page, fields), build_page
+        )
+    )
+
+
+@async_api_view
+async def get_trade(request, trade_id):
+    trade = await TradeService.aget_by_id(trade_id)
+
+    response = get_conditional_response(
+        request,
+        etag=get_etag(trade),
+        last_modified=get_last_modified(trade),
+    )
+    if response is None:
+        response = JsonResponse(TradeSerializer(trade).data)
+
+    return set_etag(response, trade)
+
+
+@async_api_view
+async def list_trade_logs(request, trade_id):
+    filters = get_log_filters(request)
+    diff_only = request.GET.get("diff_only") == "true"
+    serializer_class = TradeLogDiffSerializer if diff_only else TradeLogSerializer
+
+    if "cursor" in request.GET or request.GET.get("pagination") == "cursor":
+        next_cursor, previous_cursor, logs = await TradeLogService.aget_by_trade_id(
+            trade_id,
+            cursor=request.GET.get("cursor"),
+            per_page=get_per_page(request),
+            diff_only=diff_only,
+            **filters,
+        )
+        return JsonResponse(
+            {
+                "next": next_cursor,
+                "previous": previous_cursor,
+                "logs": serializer_class(logs, many=True).data,
+            }
+        )
+
+    if diff_only or any(value is not None for value in filters.values()):
+        _, _, logs = await TradeLogService.aget_by_trade_id(
+            trade_id, per_page=None, diff_only=diff_only, **filters
+        )
+    else:
+        logs = await TradeLogService.aget_all_by_trade_id_ordered_by_timestamp(trade_id)
+    return JsonResponse(serializer_class(logs, many=True).data, safe=False)
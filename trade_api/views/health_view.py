@@ -0,0 +1,50 @@
+from drf_spectacular.utils import OpenApiExample, extend_schema
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from ..services import HealthService
+
+
+class HealthView(viewsets.GenericViewSet):
+    @extend_schema(
+        summary="Database health",
+        description="Checks the database with a round trip and reports the connections "
+        "of this process ('pool') and of the database server. Returns a 503 when the "
+        "database can't be reached.",
+        responses={200: dict, 503: dict},
+        examples=[
+            OpenApiExample(
+                "Success",
+                value={
+                    "status": "ok",
+                    "vendor": "postgresql",
+                    "conn_max_age": 60,
+                    "conn_health_checks": True,
+                    "pool": {
+                        "max_size": 20,
+                        "timeout": 10.0,
+                        "open": 4,
+                        "opened": 9,
+                        "closed": 5,
+                        "waits": 0,
+                        "timeouts": 0,
+                        "reclaimed": 0,
+                    },
+                    "latency_ms": 0.215,
+                    "server": {
+                        "connections": 5,
+                        "active": 1,
+                        "idle": 4,
+                        "max_connections": 100,
+                    },
+                },
+            ),
+        ],
+    )
+    @action(detail=False, methods=["get"], url_path="db", url_name="db")
+    def db(self, request):
+        health = HealthService.get_database_health()
+        if health["status"] != "ok":
+            return Response(health, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        return Response(health)
@@ -0,0 +1,17 @@
+"""Request metrics in the Prometheus text format, for scraping.
+
+The histograms are those of the process serving the request, each worker of a
+multi-process server has its own.
+"""
+
+from django.http import HttpResponse, HttpResponseNotAllowed
+
+from ..utils.metrics import render_metrics
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def metrics(request):
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
+    return HttpResponse(render_metrics(), content_type=CONTENT_TYPE)
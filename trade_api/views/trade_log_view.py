@@ -1,23 +1,156 @@
-from django.http import HttpResponse
-from drf_spectacular.utils import OpenApiExample, extend_schema
+from django.http import StreamingHttpResponse
+from drf_spectacular.utils import OpenApiExample, OpenApiParameter, extend_schema
 from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
-from ..models import TradeLog
-from ..serializers import TradeLogSerializer
+from ..models import Action, TradeLog
+from ..serializers import TradeLogDiffSerializer, TradeLogSerializer
 from ..services import TradeLogService
+from ..utils import MAX_PAGE_SIZE, get_timestamp
+from .trade_view import EXPORT_PARAMETERS, export_response, get_per_page
+
+
+def get_log_filters(request):
+    filters = {
+        "action": request.GET.get("action") or None,
+        "user_id": request.GET.get("user_id") or None,
+    }
+    for name in ("since", "until"):
+        value = request.GET.get(name)
+        filters[name] = get_timestamp(value, name) if value else None
+    return filters
 
 
 class TradeLogView(viewsets.GenericViewSet):
     queryset = TradeLog.objects.all()
     serializer_class = TradeLogSerializer
 
+    @extend_schema(
+        summary="Audit logs of every trade",
+        description="Returns the logs of every trade from the latest, in pages on "
+        "(timestamp, id), filtered by user, action and time window, e.g. everything a "
+        "user approved last month or all the cancels of today. The logs only carry "
+        "their diff, the full states are given by the logs of each trade.",
+        parameters=[
+            OpenApiParameter("user_id", str, description="Filter by user"),
+            OpenApiParameter(
+                "action", str, enum=Action.values, description="Filter by action"
+            ),
+            OpenApiParameter(
+                "since", str, description="Logs at or after this ISO 8601 date and time"
+            ),
+            OpenApiParameter(
+                "until",
+                str,
+                description="Logs at or before this ISO 8601 date and time",
+            ),
+            OpenApiParameter(
+                "cursor", str, description="Opaque 'next'/'previous' token"
+            ),
+            OpenApiParameter(
+                "per_page", int, description=f"Page size (max {MAX_PAGE_SIZE})"
+            ),
+        ],
+        responses=TradeLogDiffSerializer(many=True),
+        examples=[
+            OpenApiExample(
+                "Success",
+                value={
+                    "next": "eyJjcmVhdGVkX2F0IjoiMjAyNS0xMS0yNVQyMDo1NToxNS4xMjA4MDArMDA6MDAiLCJpZCI6ImQxNjUxM2I2LWJhZDgtNDM0OS04NTc2LTRlNTJhZjU3YTgyZCJ9",
+                    "previous": None,
+                    "logs": [
+                        {
+                            "id": "d16513b6-bad8-4349-8576-4e52af57a82d",
+                            "user_id": "fc2d178d-2810-4291-a63e-b5f04201f7d3",
+                            "action": "approve",
+                            "timestamp": "2025-11-25T20:55:15.120800Z",
+                            "diff": {
+                                "state": {
+                                    "new": "approved",
+                                    "previous": "pending approval",
+                                },
+                            },
+                            "trade": "fc2d178d-2810-4291-a63e-b5f04201f7d3",
+                        },
+                    ],
+                },
+            ),
+        ],
+    )
+    def list(self, request):
+        next_cursor, previous_cursor, logs = TradeLogService.get_audit_page(
+            cursor=request.GET.get("cursor"),
+            per_page=get_per_page(request),
+            **get_log_filters(request),
+        )
+        return Response(
+            {
+                "next": next_cursor,
+                "previous": previous_cursor,
+                "logs": TradeLogDiffSerializer(logs, many=True).data,
+            }
+        )
+
     @extend_schema(
         summary="List logs of trade",
-        description="Returns a list of all the logs of a trade",
+        description="Returns the logs of a trade from the latest, all of them by default. "
+        "Passing 'cursor' (or 'pagination=cursor' for the first page) returns them in pages "
+        "on (timestamp, id). 'diff_only=true' leaves out 'previous_state' and 'new_state' for "
+        "a lighter history.",
+        parameters=[
+            OpenApiParameter(
+                "action", str, enum=Action.values, description="Filter by action"
+            ),
+            OpenApiParameter("user_id", str, description="Filter by user"),
+            OpenApiParameter(
+                "since", str, description="Logs at or after this ISO 8601 date and time"
+            ),
+            OpenApiParameter(
+                "until",
+                str,
+                description="Logs at or before this ISO 8601 date and time",
+            ),
+            OpenApiParameter(
+                "diff_only", bool, description="Only the diff of each log"
+            ),
+            OpenApiParameter(
+                "pagination",
+                str,
+                enum=["all", "cursor"],
+                description="Pagination mode",
+            ),
+            OpenApiParameter(
+                "cursor", str, description="Opaque 'next'/'previous' token"
+            ),
+            OpenApiParameter(
+                "per_page", int, description=f"Page size (max {MAX_PAGE_SIZE})"
+            ),
+        ],
         responses=TradeLogSerializer(many=True),
         examples=[
+            OpenApiExample(
+                "Success (cursor mode, diff only)",
+                value={
+                    "next": "eyJjcmVhdGVkX2F0IjoiMjAyNS0xMS0yNVQyMDo1NTowNy4yMTIwNzErMDA6MDAiLCJpZCI6IjVkOWEzMDg4LWNlYmYtNDQwMy1iNDMzLTEzMjI2YzA5ZGU3NCJ9",
+                    "previous": None,
+                    "logs": [
+                        {
+                            "id": "5d9a3088-cebf-4403-b433-13226c09de74",
+                            "user_id": "fc2d178d-2810-4291-a63e-b5f04201f7d3",
+                            "action": "submit",
+                            "timestamp": "2025-11-25T20:55:07.212071Z",
+                            "diff": {
+                                "state": {
+                                    "new": "pending approval",
+                                    "previous": "draft",
+                                }
+                            },
+                            "trade": "fc2d178d-2810-4291-a63e-b5f04201f7d3",
+                        },
+                    ],
+                },
+            ),
             OpenApiExample(
                 "Success",
                 value=[
@@ -34,8 +167,8 @@ class TradeLogView(viewsets.GenericViewSet):
                                 "previous": "pending approval",
                             },
                             "trade_date": {
-                                "new": "2025-11-25 20:55:15.113853",
-                                "previous": "None",
+                                "new": "2025-11-25T20:55:15.113853Z",
+                                "previous": None,
                             },
                         },
                         "trade": "fc2d178d-2810-4291-a63e-b5f04201f7d3",
@@ -63,8 +196,62 @@ class TradeLogView(viewsets.GenericViewSet):
         url_name="by-trade",
     )
     def get(self, request, trade_id=None):
-        logs = TradeLogService.get_all_by_trade_id_ordered_by_timestamp(trade_id)
-        return Response(TradeLogSerializer(logs, many=True).data)
+        filters = get_log_filters(request)
+        diff_only = request.GET.get("diff_only") == "true"
+        serializer_class = TradeLogDiffSerializer if diff_only else TradeLogSerializer
+
+        if "cursor" in request.GET or request.GET.get("pagination") == "cursor":
+            next_cursor, previous_cursor, logs = TradeLogService.get_by_trade_id(
+                trade_id,
+                cursor=request.GET.get("cursor"),
+                per_page=get_per_page(request),
+                diff_only=diff_only,
+                **filters,
+            )
+            return Response(
+                {
+                    "next": next_cursor,
+                    "previous": previous_cursor,
+                    "logs": serializer_class(logs, many=True).data,
+                }
+            )
+
+        if diff_only or any(value is not None for value in filters.values()):
+            _, _, logs = TradeLogService.get_by_trade_id(
+                trade_id, per_page=None, diff_only=diff_only, **filters
+            )
+        else:
+            logs = TradeLogService.get_all_by_trade_id_ordered_by_timestamp(trade_id)
+        return Response(serializer_class(logs, many=True).data)
+
+    @extend_schema(
+        summary="Export the logs of every trade",
+        description="Streams every log event matching the filters as NDJSON (one event "
+        "per line) or CSV, optionally gzip-compressed, from the oldest. The events only "
+        "carry their diff and 'state' filters on the current state of their trade. They "
+        "are read in chunks by a server-side cursor so exports of any size use the same "
+        "memory.",
+        parameters=EXPORT_PARAMETERS
+        + [
+            OpenApiParameter(
+                "since", str, description="Logs at or after this ISO 8601 date and time"
+            ),
+            OpenApiParameter(
+                "until",
+                str,
+                description="Logs at or before this ISO 8601 date and time",
+            ),
+        ],
+        responses="ndjson, csv or gzip file",
+    )
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="export",
+        url_name="bulk-export",
+    )
+    def bulk_export(self, request):
+        return export_response(request, "logs")
 
     @extend_schema(
         summary="Export csv",
@@ -78,10 +265,9 @@ class TradeLogView(viewsets.GenericViewSet):
         url_name="csv",
     )
     def export(self, request, trade_id=None):
-        csv_buffer = TradeLogService.export_trade_logs_to_csv(trade_id)
-        csv = csv_buffer.getvalue().encode("utf-8")
+        rows = TradeLogService.export_trade_logs_to_csv(trade_id)
 
-        response = HttpResponse(csv, content_type="text/csv")
+        response = StreamingHttpResponse(rows, content_type="text/csv")
         response["Content-Disposition"] = (
             f'attachment; filename="trade_{trade_id}_logs.csv"'
         )
@@ -1,11 +1,128 @@
-from drf_spectacular.utils import OpenApiExample, extend_schema
+import uuid
+
+from django.http import StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from drf_spectacular.utils import OpenApiExample, OpenApiParameter, extend_schema
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 
+from ..exceptions import BadRequestException, NotFoundException
 from ..models import Trade
 from ..serializers import TradeSerializer
-from ..services import TradeService
+from ..services import ExportService, TradeLogService, TradeService, TradeStatsService
+from ..utils import (
+    AS_OF_MAX_SIZE,
+    BATCH_ACTION_MAX_SIZE,
+    BULK_CREATE_MAX_SIZE,
+    DEFAULT_PAGE_SIZE,
+    DIFF_MAX_PAIRWISE_VERSIONS,
+    DIFF_MAX_VERSIONS,
+    DIFF_MODES,
+    MAX_PAGE_SIZE,
+    get_timestamp,
+)
+
+
+def get_if_match_version(request):
+    if_match = request.headers.get("If-Match")
+    if if_match is None or if_match == "*":
+        return None
+    try:
+        return int(if_match.removeprefix("W/").strip('"'))
+    except ValueError:
+        raise BadRequestException(
+            {"error": "'If-Match' must be the ETag returned for the trade"}
+        )
+
+
+def get_etag(trade):
+    return f'"{trade.version}"'
+
+
+def get_last_modified(trade):
+    return int(trade.updated_at.timestamp())
+
+
+def set_etag(response, trade):
+    response["ETag"] = get_etag(trade)
+    response["Last-Modified"] = http_date(get_last_modified(trade))
+    return response
+
+
+def get_version(request, name):
+    """Log id or datetime of a version of a trade, None when not given"""
+    value = request.GET.get(name)
+    if not value:
+        return None
+    try:
+        return uuid.UUID(value)
+    except ValueError:
+        pass
+    try:
+        return get_timestamp(value, name)
+    except BadRequestException:
+        raise BadRequestException(
+            {"error": f"'{name}' must be a log id or an ISO 8601 date and time"}
+        )
+
+
+def get_per_page(request):
+    per_page = request.GET.get("per_page")
+    if per_page is None:
+        return DEFAULT_PAGE_SIZE
+    try:
+        per_page = int(per_page)
+    except ValueError:
+        raise BadRequestException({"error": "'per_page' must be an integer"})
+    if not 1 <= per_page <= MAX_PAGE_SIZE:
+        raise BadRequestException(
+            {"error": f"'per_page' must be between 1 and {MAX_PAGE_SIZE}"}
+        )
+    return per_page
+
+
+def get_fields(request):
+    fields = request.GET.get("fields")
+    if not fields:
+        return None
+    return tuple(
+        dict.fromkeys(field.strip() for field in fields.split(",") if field.strip())
+    )
+
+
+def export_response(request, kind):
+    """Streamed download of an export, the parameters are checked before the
+    response starts"""
+    output = request.GET.get("output", "ndjson")
+    compress = request.GET.get("gzip") == "true"
+    filters = {"state": request.GET.get("state") or None}
+    for name in ("since", "until"):
+        value = request.GET.get(name)
+        filters[name] = get_timestamp(value, name) if value else None
+
+    chunks = ExportService.export(kind, output, compress, **filters)
+    response = StreamingHttpResponse(
+        chunks, content_type=ExportService.get_content_type(output, compress)
+    )
+    response["Content-Disposition"] = (
+        f'attachment; filename="{ExportService.get_filename(kind, output, compress)}"'
+    )
+    return response
+
+
+EXPORT_PARAMETERS = [
+    OpenApiParameter(
+        "output",
+        str,
+        enum=["ndjson", "csv"],
+        description="File format, NDJSON by default",
+    ),
+    OpenApiParameter("gzip", bool, description="Compress the file with gzip"),
+    OpenApiParameter("state", str, description="Filter by the state of the trades"),
+]
 
 
 class TradeView(viewsets.GenericViewSet):
@@ -14,9 +131,68 @@ class TradeView(viewsets.GenericViewSet):
 
     @extend_schema(
         summary="List trades (can filter by state)",
-        description="Returns a list of all the trades paginated and potentially filtered by state",
+        description="Returns a list of all the trades paginated and potentially filtered by state. "
+        "Passing 'cursor' (or 'pagination=cursor' for the first page) switches to keyset pagination, "
+        "which costs the same for every page and only counts the trades when 'with_total=true'. "
+        "'fields' restricts the trades to the listed fields, e.g. 'id,state,counterparty,amount'.",
+        parameters=[
+            OpenApiParameter(
+                "state",
+                str,
+                description="Filter by trade state ('active' for every non-terminal state)",
+            ),
+            OpenApiParameter("page", int, description="Page number (page mode)"),
+            OpenApiParameter(
+                "per_page", int, description=f"Page size (max {MAX_PAGE_SIZE})"
+            ),
+            OpenApiParameter(
+                "pagination",
+                str,
+                enum=["page", "cursor"],
+                description="Pagination mode",
+            ),
+            OpenApiParameter(
+                "cursor",
+                str,
+                description="Opaque 'next'/'previous' token (cursor mode)",
+            ),
+            OpenApiParameter(
+                "with_total", bool, description="Include the total count (cursor mode)"
+            ),
+            OpenApiParameter(
+                "fields",
+                str,
+                description="Comma separated fields of the trades to return (all by default)",
+            ),
+        ],
         responses=TradeSerializer(many=True),
         examples=[
+            OpenApiExample(
+                "Success (cursor mode)",
+                value={
+                    "next": "eyJjcmVhdGVkX2F0IjoiMjAyNS0xMS0yNVQyMDo1MzozNi42MTU2MDcrMDA6MDAiLCJpZCI6ImZjMmQxNzhkLTI4MTAtNDI5MS1hNjNlLWI1ZjA0MjAxZjdkMyJ9",
+                    "previous": None,
+                    "trades": [
+                        {
+                            "id": "fc2d178d-2810-4291-a63e-b5f04201f7d3",
+                            "trading_entity": "Trading entity",
+                            "counterparty": "Counterpart",
+                            "direction": "sell",
+                            "style": "forward",
+                            "currency": "CAD",
+                            "amount": "10000.00",
+                            "underlying": ["CAD"],
+                            "trade_date": None,
+                            "value_date": None,
+                            "delivery_date": None,
+                            "strike": None,
+                            "state": "draft",
+                            "created_at": "2025-11-25T20:53:36.615607Z",
+                            "updated_at": "2025-11-25T20:53:36.615607Z",
+                        },
+                    ],
+                },
+            ),
             OpenApiExample(
                 "Success",
                 value={
@@ -63,53 +239,137 @@ class TradeView(viewsets.GenericViewSet):
         ],
     )
     def list(self, request):
+        state = request.GET.get("state") or None
+        per_page = get_per_page(request)
+        fields = get_fields(request)
+
+        if "cursor" in request.GET or request.GET.get("pagination") == "cursor":
+            cursor = request.GET.get("cursor")
+            with_total = request.GET.get("with_total") == "true"
+
+            def build_page():
+                next_cursor, previous_cursor, total, trades = (
+                    TradeService.get_projected_by_cursor(
+                        cursor=cursor,
+                        per_page=per_page,
+                        state=state,
+                        with_total=with_total,
+                        fields=fields,
+                    )
+                )
+                data = {"next": next_cursor, "previous": previous_cursor}
+                if total is not None:
+                    data["total"] = total
+                data["trades"] = trades
+                return data
+
+            return Response(
+                TradeService.get_list_page_cached(
+                    state, ("cursor", cursor, per_page, with_total, fields), build_page
+                )
+            )
+
         page = request.GET.get("page")
         if page is None:
             page = 1
 
-        state = request.GET.get("state")
-
-        page, total_pages, trades = TradeService.get_all_ordered_by_created_at(
-            page=page, state=state
-        )
-        return Response(
-            {
-                "page": page,
+        def build_page():
+            number, total_pages, trades = TradeService.get_projected_page(
+                page=page, per_page=per_page, state=state, fields=fields
+            )
+            return {
+                "page": number,
                 "total_pages": total_pages,
-                "trades": TradeSerializer(trades, many=True).data,
+                "trades": trades,
             }
+
+        return Response(
+            TradeService.get_list_page_cached(
+                state, ("page", str(page), per_page, fields), build_page
+            )
         )
 
     @extend_schema(
-        summary="Get trade by id",
-        description="Returns a list of all the trades",
-        responses=TradeSerializer(many=True),
+        summary="List cache statistics",
+        description="Hits and misses of the trade list page cache since the counters were "
+        "created, to tune TRADE_LIST_CACHE_TIMEOUT.",
+        examples=[
+            OpenApiExample(
+                "Success",
+                value={"hits": 180, "misses": 20, "hit_ratio": 0.9, "timeout": 30},
+            ),
+        ],
+    )
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="cache-stats",
+        url_name="list-cache-stats",
+    )
+    def list_cache_stats(self, request):
+        return Response(TradeService.get_list_cache_stats())
+
+    @extend_schema(
+        summary="Number of trades per state",
+        description="Returns the number of trades in each state, in the workflow "
+        "('active') and in total. The counters are updated with every creation and "
+        "transition, so reading them costs the same whatever the number of trades.",
         examples=[
             OpenApiExample(
                 "Success",
                 value={
-                    "id": "c3cfc74d-99dd-47cb-b39c-e8fc9f2dd36c",
-                    "trading_entity": "Example entity",
-                    "counterparty": "Example counterparty",
-                    "direction": "buy",
-                    "style": "forward",
-                    "currency": "CAD",
-                    "amount": "10000.00",
-                    "underlying": ["CAD"],
-                    "trade_date": None,
-                    "value_date": None,
-                    "delivery_date": None,
-                    "strike": None,
-                    "state": "needs reapproval",
-                    "created_at": "2025-11-25T21:27:21.846508Z",
-                    "updated_at": "2025-11-25T22:24:18.760284Z",
+                    "states": {
+                        "draft": 12,
+                        "pending approval": 4,
+                        "needs reapproval": 1,
+                        "approved": 3,
+                        "sent": 2,
+                        "executed": 40,
+                        "cancelled": 6,
+                    },
+                    "active": 22,
+                    "total": 68,
                 },
             ),
         ],
     )
-    def get(self, request, id):
-        trade = TradeService.get_by_id(id)
-        return Response(TradeSerializer(trade).data)
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="stats",
+        url_name="stats",
+    )
+    def stats(self, request):
+        return Response(TradeStatsService.get_state_counts())
+
+    @extend_schema(
+        summary="Export trades",
+        description="Streams every trade matching the filters as NDJSON (one trade per "
+        "line) or CSV, optionally gzip-compressed, from the oldest. The trades are read "
+        "in chunks by a server-side cursor so exports of any size use the same memory.",
+        parameters=EXPORT_PARAMETERS
+        + [
+            OpenApiParameter(
+                "since",
+                str,
+                description="Trades updated at or after this ISO 8601 date and time",
+            ),
+            OpenApiParameter(
+                "until",
+                str,
+                description="Trades updated at or before this ISO 8601 date and time",
+            ),
+        ],
+        responses="ndjson, csv or gzip file",
+    )
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="export",
+        url_name="bulk-export",
+    )
+    def bulk_export(self, request):
+        return export_response(request, "trades")
 
     @extend_schema(
         summary="Create trade",
@@ -164,9 +424,118 @@ class TradeView(viewsets.GenericViewSet):
         trade = TradeService.create_trade(trade)
         return Response(TradeSerializer(trade).data, status=status.HTTP_201_CREATED)
 
+    @extend_schema(
+        summary="Create trades in bulk",
+        description="Creates a list of trades as drafts. Valid trades are inserted in batches, "
+        "invalid ones are reported by their index in the request.",
+        request=TradeSerializer(many=True),
+        examples=[
+            OpenApiExample(
+                "Request",
+                request_only=True,
+                value=[
+                    {
+                        "trading_entity": "Trading entity",
+                        "counterparty": "Counterpart",
+                        "direction": "sell",
+                        "currency": "CAD",
+                        "amount": 10000,
+                        "underlying": ["USD"],
+                    },
+                    {
+                        "trading_entity": "Trading entity",
+                        "counterparty": "Counterpart",
+                        "currency": "CAD",
+                    },
+                ],
+            ),
+            OpenApiExample(
+                "Partial success",
+                response_only=True,
+                status_codes=["207"],
+                value={
+                    "created": 1,
+                    "failed": 1,
+                    "results": [
+                        {
+                            "index": 0,
+                            "status": "created",
+                            "id": "a0aa98ff-89e9-46d7-9917-06df2f2abbe9",
+                        },
+                        {
+                            "index": 1,
+                            "status": "error",
+                            "details": {
+                                "direction": ["This field is required."],
+                                "amount": ["This field is required."],
+                            },
+                        },
+                    ],
+                },
+            ),
+        ],
+    )
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path=r"bulk",
+    )
+    def bulk_create(self, request):
+        payloads = request.data
+        if not isinstance(payloads, list) or not payloads:
+            raise BadRequestException({"error": "Expected a non-empty list of trades"})
+        if len(payloads) > BULK_CREATE_MAX_SIZE:
+            raise BadRequestException(
+                {
+                    "error": f"At most {BULK_CREATE_MAX_SIZE} trades can be created at once"
+                }
+            )
+
+        # One serializer validates every payload so its fields are only built once
+        serializer = TradeSerializer()
+        trades = []
+        results = []
+        for index, payload in enumerate(payloads):
+            try:
+                trade = Trade(**serializer.run_validation(payload))
+            except ValidationError as error:
+                results.append(
+                    {"index": index, "status": "error", "details": error.detail}
+                )
+                continue
+            trades.append(trade)
+            results.append({"index": index, "status": "created", "id": trade.id})
+
+        if trades:
+            TradeService.bulk_create_trades(trades)
+
+        if not trades:
+            response_status = status.HTTP_400_BAD_REQUEST
+        elif len(trades) < len(payloads):
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_201_CREATED
+        return Response(
+            {
+                "created": len(trades),
+                "failed": len(payloads) - len(trades),
+                "results": results,
+            },
+            status=response_status,
+        )
+
     @extend_schema(
         summary="Change trade",
-        description="Change certain attributes of the trade",
+        description="Change certain attributes of the trade. Sending the trade's ETag in 'If-Match' "
+        "makes the change fail with a 409 if the trade was modified since it was read.",
+        parameters=[
+            OpenApiParameter(
+                "If-Match",
+                str,
+                OpenApiParameter.HEADER,
+                description="ETag of the trade version the change is based on",
+            ),
+        ],
         request=TradeSerializer,
         responses={200: TradeSerializer},
         examples=[
@@ -204,6 +573,7 @@ class TradeView(viewsets.GenericViewSet):
                     "delivery_date": None,
                     "strike": None,
                     "state": "needs reapproval",
+                    "version": 2,
                     "created_at": "2025-11-25T21:27:21.846508Z",
                     "updated_at": "2025-11-26T08:48:41.903746Z",
                 },
@@ -213,19 +583,366 @@ class TradeView(viewsets.GenericViewSet):
     @action(
         detail=False,
         methods=["patch"],
-        url_path=r"(?P<id>[0-9a-fA-F-]{36})",
+        url_path=r"(?P<trade_id>[0-9a-fA-F-]{36})",
     )
-    def modify(self, request, id=None):
+    def modify(self, request, trade_id=None):
         action = request.data.get("action")
         fields = request.data.get("fields")
         user_id = request.data.get("user_id")
-        trade = TradeService.update_trade(id, action, user_id, fields)
+        trade = TradeService.update_trade(
+            trade_id,
+            action,
+            user_id,
+            fields,
+            expected_version=get_if_match_version(request),
+        )
 
-        return Response(TradeSerializer(trade).data)
+        return set_etag(Response(TradeSerializer(trade).data), trade)
 
     @extend_schema(
-        summary="List diiferences between trades",
-        description="Returns a the differences between 2 trades",
+        summary="Get trade by id",
+        description="Returns the trade. Sending its ETag in 'If-None-Match' (or its 'Last-Modified' "
+        "in 'If-Modified-Since') returns a 304 without a body if it hasn't changed since.",
+        parameters=[
+            OpenApiParameter(
+                "If-None-Match",
+                str,
+                OpenApiParameter.HEADER,
+                description="ETag of the trade version already held by the client",
+            ),
+            OpenApiParameter(
+                "If-Modified-Since",
+                str,
+                OpenApiParameter.HEADER,
+                description="Last-Modified date of the trade already held by the client",
+            ),
+        ],
+        responses={200: TradeSerializer, 304: None},
+        examples=[
+            OpenApiExample(
+                "Success",
+                value={
+                    "id": "c3cfc74d-99dd-47cb-b39c-e8fc9f2dd36c",
+                    "trading_entity": "Example entity",
+                    "counterparty": "Example counterparty",
+                    "direction": "buy",
+                    "style": "forward",
+                    "currency": "CAD",
+                    "amount": "10000.00",
+                    "underlying": ["CAD"],
+                    "trade_date": None,
+                    "value_date": None,
+                    "delivery_date": None,
+                    "strike": None,
+                    "state": "needs reapproval",
+                    "version": 2,
+                    "created_at": "2025-11-25T21:27:21.846508Z",
+                    "updated_at": "2025-11-25T22:24:18.760284Z",
+                },
+            ),
+        ],
+    )
+    @modify.mapping.get
+    def get(self, request, trade_id=None):
+        trade = TradeService.get_by_id(trade_id)
+
+        # The trade is only serialized when the client's copy is outdated
+        response = get_conditional_response(
+            request,
+            etag=get_etag(trade),
+            last_modified=get_last_modified(trade),
+        )
+        if response is None:
+            response = Response(TradeSerializer(trade).data)
+
+        return set_etag(response, trade)
+
+    @extend_schema(
+        summary="Change trades in batch",
+        description="Applies a field-less action (submit, approve, send, cancel) to a list of trades "
+        "in one transaction. Trades that cannot take the action are rejected individually.",
+        examples=[
+            OpenApiExample(
+                "Request approve",
+                request_only=True,
+                value={
+                    "user_id": "26920541-6415-4ce3-85bb-167ea52e4b49",
+                    "action": "approve",
+                    "ids": [
+                        "2728e5b5-8830-4a94-8f3d-4fde9e1aa6ae",
+                        "c3cfc74d-99dd-47cb-b39c-e8fc9f2dd36c",
+                    ],
+                },
+            ),
+            OpenApiExample(
+                "Partial success",
+                response_only=True,
+                status_codes=["207"],
+                value={
+                    "updated": 1,
+                    "failed": 1,
+                    "results": [
+                        {
+                            "id": "2728e5b5-8830-4a94-8f3d-4fde9e1aa6ae",
+                            "status": "updated",
+                            "state": "approved",
+                        },
+                        {
+                            "id": "c3cfc74d-99dd-47cb-b39c-e8fc9f2dd36c",
+                            "status": "rejected",
+                            "error": "Invalid action 'approve' for state 'draft'",
+                        },
+                    ],
+                },
+            ),
+        ],
+    )
+    @action(
+        detail=False,
+        methods=["patch"],
+        url_path=r"actions",
+    )
+    def modify_batch(self, request):
+        ids = request.data.get("ids")
+        if not isinstance(ids, list) or not ids:
+            raise BadRequestException({"error": "Expected a non-empty list of 'ids'"})
+        if len(ids) > BATCH_ACTION_MAX_SIZE:
+            raise BadRequestException(
+                {
+                    "error": f"At most {BATCH_ACTION_MAX_SIZE} trades can be changed at once"
+                }
+            )
+
+        action = request.data.get("action")
+        user_id = request.data.get("user_id")
+        results = TradeService.update_trades(ids, action, user_id)
+
+        updated = sum(1 for result in results if result["status"] == "updated")
+        if not updated:
+            response_status = status.HTTP_400_BAD_REQUEST
+        elif updated < len(results):
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_200_OK
+        return Response(
+            {
+                "updated": updated,
+                "failed": len(results) - updated,
+                "results": results,
+            },
+            status=response_status,
+        )
+
+    @extend_schema(
+        summary="Diff between versions of a trade",
+        description="Returns the changes of a trade from the version 'from' to the "
+        "version 'to', each given by a log id (the version after that log) or an ISO "
+        "8601 date and time (the version at that time), from its creation and to its "
+        "latest version by default. The stored diffs of the events in between are "
+        "composed, so only the changed fields are read and returned. Versions given "
+        "the other way round give the inverse diff.",
+        parameters=[
+            OpenApiParameter(
+                "from", str, description="Log id or ISO 8601 date and time"
+            ),
+            OpenApiParameter("to", str, description="Log id or ISO 8601 date and time"),
+        ],
+        examples=[
+            OpenApiExample(
+                "Success",
+                value={
+                    "id": "fc2d178d-2810-4291-a63e-b5f04201f7d3",
+                    "from": "5d9a3088-cebf-4403-b433-13226c09de74",
+                    "to": "2025-11-25T21:00:00Z",
+                    "events": 2,
+                    "diff": {
+                        "state": {"previous": "pending approval", "new": "sent"},
+                        "trade_date": {
+                            "previous": None,
+                            "new": "2025-11-25T20:55:15.113853Z",
+                        },
+                        "updated_at": {
+                            "previous": "2025-11-25T20:55:07.212071Z",
+                            "new": "2025-11-25T20:58:02.420101Z",
+                        },
+                    },
+                },
+            ),
+        ],
+    )
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path=r"(?P<trade_id>[0-9a-fA-F-]{36})/diff",
+        url_name="version-diff",
+    )
+    def version_diff(self, request, trade_id=None):
+        start = get_version(request, "from")
+        end = get_version(request, "to")
+        try:
+            id = uuid.UUID(trade_id)
+        except ValueError:
+            raise NotFoundException({"error": "Trade not found"})
+
+        events, diff = TradeLogService.get_diff_between_versions(id, start, end)
+        return Response(
+            {
+                "id": id,
+                "from": request.GET.get("from") or None,
+                "to": request.GET.get("to") or None,
+                "events": events,
+                "diff": diff,
+            }
+        )
+
+    @extend_schema(
+        summary="Get trade at a point in time",
+        description="Returns the state of the trade at the given time, taken from the latest log at that time",
+        parameters=[
+            OpenApiParameter(
+                "ts", str, required=True, description="ISO 8601 date and time"
+            ),
+        ],
+        examples=[
+            OpenApiExample(
+                "Success",
+                value={
+                    "id": "fc2d178d-2810-4291-a63e-b5f04201f7d3",
+                    "as_of": "2025-11-25T21:00:00Z",
+                    "log_id": "d16513b6-bad8-4349-8576-4e52af57a82d",
+                    "state": {
+                        "id": "fc2d178d-2810-4291-a63e-b5f04201f7d3",
+                        "trading_entity": "Trading entity",
+                        "counterparty": "Counterpart",
+                        "direction": "sell",
+                        "style": "forward",
+                        "currency": "CAD",
+                        "amount": "10000.00",
+                        "underlying": ["CAD"],
+                        "trade_date": "2025-11-25T20:55:15.113853Z",
+                        "value_date": None,
+                        "delivery_date": None,
+                        "strike": None,
+                        "state": "approved",
+                        "created_at": "2025-11-25T20:53:36.615607Z",
+                        "updated_at": "2025-11-25T20:55:15.113853Z",
+                    },
+                },
+            ),
+        ],
+    )
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path=r"(?P<trade_id>[0-9a-fA-F-]{36})/as-of",
+        url_name="as-of",
+    )
+    def as_of(self, request, trade_id=None):
+        timestamp = get_timestamp(request.GET.get("ts"))
+        try:
+            id = uuid.UUID(trade_id)
+        except ValueError:
+            raise NotFoundException({"error": "Trade not found"})
+
+        trades = TradeLogService.get_trades_as_of([id], timestamp)
+        if id not in trades:
+            raise NotFoundException({"error": "Trade not found at this time"})
+        return Response({"id": id, "as_of": timestamp, **trades[id]})
+
+    @extend_schema(
+        summary="Get trades at a point in time",
+        description="Returns the state of each trade at the given time (e.g. end of day snapshots)",
+        examples=[
+            OpenApiExample(
+                "Request",
+                request_only=True,
+                value={
+                    "ts": "2025-11-25T23:59:59Z",
+                    "ids": [
+                        "fc2d178d-2810-4291-a63e-b5f04201f7d3",
+                        "c3cfc74d-99dd-47cb-b39c-e8fc9f2dd36c",
+                    ],
+                },
+            ),
+            OpenApiExample(
+                "Success",
+                response_only=True,
+                value={
+                    "as_of": "2025-11-25T23:59:59Z",
+                    "trades": [
+                        {
+                            "id": "fc2d178d-2810-4291-a63e-b5f04201f7d3",
+                            "log_id": "d16513b6-bad8-4349-8576-4e52af57a82d",
+                            "state": {
+                                "id": "fc2d178d-2810-4291-a63e-b5f04201f7d3",
+                                "trading_entity": "Trading entity",
+                                "counterparty": "Counterpart",
+                                "direction": "sell",
+                                "style": "forward",
+                                "currency": "CAD",
+                                "amount": "10000.00",
+                                "underlying": ["CAD"],
+                                "trade_date": "2025-11-25T20:55:15.113853Z",
+                                "value_date": None,
+                                "delivery_date": None,
+                                "strike": None,
+                                "state": "approved",
+                                "created_at": "2025-11-25T20:53:36.615607Z",
+                                "updated_at": "2025-11-25T20:55:15.113853Z",
+                            },
+                        },
+                        {
+                            "id": "c3cfc74d-99dd-47cb-b39c-e8fc9f2dd36c",
+                            "error": "Trade not found at this time",
+                        },
+                    ],
+                },
+            ),
+        ],
+    )
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path=r"as-of",
+        url_name="as-of-batch",
+    )
+    def as_of_batch(self, request):
+        timestamp = get_timestamp(request.data.get("ts"))
+        ids = request.data.get("ids")
+        if not isinstance(ids, list) or not ids:
+            raise BadRequestException({"error": "Expected a non-empty list of 'ids'"})
+        if len(ids) > AS_OF_MAX_SIZE:
+            raise BadRequestException(
+                {"error": f"At most {AS_OF_MAX_SIZE} trades can be requested at once"}
+            )
+
+        trade_ids = {}
+        for id in ids:
+            try:
+                trade_ids[str(id)] = uuid.UUID(str(id))
+            except ValueError:
+                trade_ids[str(id)] = None
+
+        trades = TradeLogService.get_trades_as_of(
+            [id for id in trade_ids.values() if id is not None], timestamp
+        )
+        results = []
+        for id, trade_id in trade_ids.items():
+            if trade_id in trades:
+                results.append({"id": id, **trades[trade_id]})
+            else:
+                results.append({"id": id, "error": "Trade not found at this time"})
+        return Response({"as_of": timestamp, "trades": results})
+
+    @extend_schema(
+        summary="List differences between trades",
+        description="Returns the differences between versions of trades: 'trade1' and "
+        "'trade2' on the fields of a trade creation, or a list of 'versions' (every "
+        "field) compared each with the next one "
+        "('mode=consecutive', the default) or every pair ('mode=pairwise', at most "
+        f"{DIFF_MAX_PAIRWISE_VERSIONS} versions). Only the types of the fields are "
+        "checked, 'underlying' is compared regardless of order, amounts on their value "
+        "and dates on their instant. Values are given like in the trade logs.",
         examples=[
             OpenApiExample(
                 "Request diff",
@@ -238,29 +955,29 @@ class TradeView(viewsets.GenericViewSet):
                         "amount": "10000.00",
                         "currency": "CAD",
                         "direction": "sell",
-                        "created_at": "2025-11-26 12:04:33.574273+00:00",
-                        "trade_date": "None",
+                        "created_at": "2025-11-26T12:04:33.574273Z",
+                        "trade_date": None,
                         "underlying": ["USD", "CAD"],
-                        "updated_at": "2025-11-26 12:04:33.574314+00:00",
-                        "value_date": "None",
+                        "updated_at": "2025-11-26T12:04:33.574314Z",
+                        "value_date": None,
                         "counterparty": "Counterpart",
-                        "delivery_date": "None",
+                        "delivery_date": None,
                         "trading_entity": "Trading entity",
                     },
                     "trade2": {
                         "id": "756e561a-0d43-4c94-b0bb-7283bfd49eab",
                         "state": "draft",
                         "style": "style",
-                        "amount": "10000.00",
+                        "amount": 10000,
                         "currency": "CAD",
                         "direction": "sell",
-                        "created_at": "2025-11-26 12:04:33.574273+00:00",
-                        "trade_date": "None",
+                        "created_at": "2025-11-26T07:04:33.574273-05:00",
+                        "trade_date": None,
                         "underlying": ["CAD"],
-                        "updated_at": "2025-11-26 12:04:57.661321+00:00",
-                        "value_date": "None",
+                        "updated_at": "2025-11-26T12:04:57.661321Z",
+                        "value_date": None,
                         "counterparty": "Counterpart",
-                        "delivery_date": "None",
+                        "delivery_date": None,
                         "trading_entity": "Trading entity",
                     },
                 },
@@ -268,7 +985,42 @@ class TradeView(viewsets.GenericViewSet):
             OpenApiExample(
                 "Success",
                 response_only=True,
-                value={"underlying": {"previous": "['USD', 'CAD']", "new": "['CAD']"}},
+                value={
+                    "underlying": {"previous": ["USD", "CAD"], "new": ["CAD"]},
+                },
+            ),
+            OpenApiExample(
+                "Request versions diff",
+                request_only=True,
+                value={
+                    "mode": "consecutive",
+                    "versions": [
+                        {"amount": "10000.00", "underlying": ["USD", "CAD"]},
+                        {"amount": 10000, "underlying": ["CAD", "USD"]},
+                        {"amount": "12000.5", "underlying": ["CAD"]},
+                    ],
+                },
+            ),
+            OpenApiExample(
+                "Success (versions)",
+                response_only=True,
+                value={
+                    "mode": "consecutive",
+                    "diffs": [
+                        {"from": 0, "to": 1, "diff": {}},
+                        {
+                            "from": 1,
+                            "to": 2,
+                            "diff": {
+                                "amount": {"previous": "10000.00", "new": "12000.50"},
+                                "underlying": {
+                                    "previous": ["CAD", "USD"],
+                                    "new": ["CAD"],
+                                },
+                            },
+                        },
+                    ],
+                },
             ),
         ],
     )
@@ -278,20 +1030,31 @@ class TradeView(viewsets.GenericViewSet):
         url_path=r"diff",
     )
     def highlight_changes(self, request):
-        trade1 = request.data.get("trade1")
-        trade1 = TradeSerializer(data=trade1)
-        trade2 = request.data.get("trade2")
-        trade2 = TradeSerializer(data=trade2)
-        if not trade1.is_valid():
-            return Response(
-                {"error": "Invalid Trade 'trade1'", "details": trade1.errors},
-                status=status.HTTP_400_BAD_REQUEST,
+        versions = request.data.get("versions")
+        if versions is None:
+            diff = TradeService.get_diff_between_two_trades(
+                request.data.get("trade1"), request.data.get("trade2")
             )
-        if not trade2.is_valid():
-            return Response(
-                {"error": "Invalid Trade 'trade2'", "details": trade2.errors},
-                status=status.HTTP_400_BAD_REQUEST,
+            return Response(diff)
+
+        mode = request.data.get("mode", "consecutive")
+        if mode not in DIFF_MODES:
+            raise BadRequestException(
+                {"error": f"'mode' should be one of these options: {DIFF_MODES}"}
+            )
+        if not isinstance(versions, list) or len(versions) < 2:
+            raise BadRequestException(
+                {"error": "'versions' must be a list of at least 2 trades"}
+            )
+        max_versions = (
+            DIFF_MAX_PAIRWISE_VERSIONS if mode == "pairwise" else DIFF_MAX_VERSIONS
+        )
+        if len(versions) > max_versions:
+            raise BadRequestException(
+                {
+                    "error": f"At most {max_versions} versions can be compared at once in '{mode}' mode"
+                }
             )
 
-        diff = TradeService.get_diff_between_trades(trade1, trade2)
-        return Response(diff)
+        diffs = TradeService.get_diff_between_trades(versions, mode)
+        return Response({"mode": mode, "diffs": diffs})